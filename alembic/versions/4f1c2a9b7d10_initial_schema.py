@@ -0,0 +1,170 @@
+"""initial schema
+
+Schema as created by Base.metadata.create_all before migrations were
+introduced. Databases that were created by the application at startup
+already have it and should be stamped instead of upgraded:
+
+    alembic stamp 4f1c2a9b7d10
+
+Revision ID: 4f1c2a9b7d10
+Revises:
+Create Date: 2025-06-02 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1c2a9b7d10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'currencies',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('code', sa.String(length=3), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code'),
+    )
+    op.create_index('ix_currencies_id', 'currencies', ['id'])
+
+    op.create_table(
+        'users',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('password', sa.String(), nullable=False),
+        sa.Column('phone', sa.String(), nullable=False),
+        sa.Column('is_blocked', sa.Boolean(), nullable=False),
+        sa.Column('is_admin', sa.Boolean(), nullable=False),
+        sa.Column('is_verified', sa.Boolean(), nullable=False),
+        sa.Column('is_activated', sa.Boolean(), nullable=False),
+        sa.Column('avatar', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id'),
+        sa.UniqueConstraint('username'),
+        sa.UniqueConstraint('email'),
+    )
+
+    op.create_table(
+        'balances',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('currency_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('amount', sa.Numeric(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['currency_id'], ['currencies.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id'),
+        sa.UniqueConstraint('user_id', 'currency_id', name='uix_user_currency'),
+    )
+
+    op.create_table(
+        'categories',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('is_default', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name', 'user_id', name='uq_category_name_per_user'),
+    )
+    op.create_index('ix_categories_id', 'categories', ['id'])
+
+    op.create_table(
+        'contacts',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('contact_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['contact_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id'),
+        sa.UniqueConstraint('user_id', 'contact_id', name='uix_user_contact'),
+    )
+
+    op.create_table(
+        'recurring_transactions',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('sender_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('receiver_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('currency_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('amount', sa.Numeric(), nullable=False),
+        sa.Column('interval_type', sa.Enum('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY', name='intervaltype'), nullable=False),
+        sa.Column('next_execution_date', sa.Date(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('last_run_date', sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['receiver_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['currency_id'], ['currencies.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_recurring_transactions_id', 'recurring_transactions', ['id'])
+
+    op.create_table(
+        'cards',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('balance_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('card_number', sa.String(length=16), nullable=False),
+        sa.Column('expiration_date', sa.Date(), nullable=False),
+        sa.Column('cardholder_name', sa.String(length=30), nullable=False),
+        sa.Column('cvv', sa.String(length=3), nullable=False),
+        sa.Column('design_image', sa.String(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['balance_id'], ['balances.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('id'),
+        sa.UniqueConstraint('card_number', name='uq_cards_card_number'),
+    )
+
+    op.create_table(
+        'transactions',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('sender_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('currency_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('receiver_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('category_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('amount', sa.Numeric(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('is_recurring', sa.Boolean(), nullable=False),
+        sa.Column('created_date', sa.Date(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('sender_card_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('receiver_card_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('is_internal_transfer', sa.Boolean(), nullable=False),
+        sa.Column('transaction_type', sa.Enum('USER_TO_USER', 'USER_TO_ANOTHER_USER', name='transactiontype'), nullable=False),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['currency_id'], ['currencies.id']),
+        sa.ForeignKeyConstraint(['receiver_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.ForeignKeyConstraint(['sender_card_id'], ['cards.id']),
+        sa.ForeignKeyConstraint(['receiver_card_id'], ['cards.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_transactions_id', 'transactions', ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('transactions')
+    op.drop_table('cards')
+    op.drop_table('recurring_transactions')
+    op.drop_table('contacts')
+    op.drop_table('categories')
+    op.drop_table('balances')
+    op.drop_table('users')
+    op.drop_table('currencies')
+    sa.Enum(name='transactiontype').drop(op.get_bind())
+    sa.Enum(name='intervaltype').drop(op.get_bind())
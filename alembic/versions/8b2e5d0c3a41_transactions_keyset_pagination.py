@@ -0,0 +1,47 @@
+"""keyset pagination for transaction listings
+
+Adds transactions.created_at (backfilled from created_date) and the
+composite indexes behind the cursor-paginated listings.
+
+Revision ID: 8b2e5d0c3a41
+Revises: 4f1c2a9b7d10
+Create Date: 2025-06-02 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e5d0c3a41'
+down_revision: Union[str, None] = '4f1c2a9b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'transactions',
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    )
+    op.execute("UPDATE transactions SET created_at = created_date::timestamptz")
+    op.alter_column('transactions', 'created_at', nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_transactions_created_at_id', 'transactions', ['created_at', 'id'],
+                        postgresql_concurrently=True)
+        op.create_index('ix_transactions_amount_id', 'transactions', ['amount', 'id'],
+                        postgresql_concurrently=True)
+        op.create_index('ix_recurring_transactions_next_execution_date_id', 'recurring_transactions',
+                        ['next_execution_date', 'id'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recurring_transactions_next_execution_date_id', table_name='recurring_transactions')
+    op.drop_index('ix_transactions_amount_id', table_name='transactions')
+    op.drop_index('ix_transactions_created_at_id', table_name='transactions')
+    op.drop_column('transactions', 'created_at')
@@ -0,0 +1,34 @@
+"""recurring transactions start date
+
+Monthly and yearly occurrences are counted from the start date, so a
+schedule keeps its day of the month after a short month. Existing
+templates start from their next execution date.
+
+Revision ID: a9e3c7f15d42
+Revises: e8c1a5f72d36
+Create Date: 2025-06-27 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e3c7f15d42'
+down_revision: Union[str, None] = 'e8c1a5f72d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('recurring_transactions', sa.Column('start_date', sa.Date(), nullable=True))
+    op.execute('UPDATE recurring_transactions SET start_date = next_execution_date')
+    op.alter_column('recurring_transactions', 'start_date', nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recurring_transactions', 'start_date')
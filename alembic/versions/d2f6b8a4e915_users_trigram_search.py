@@ -0,0 +1,39 @@
+"""trigram search for the admin user listing
+
+Enables pg_trgm and adds GIN trigram indexes on users.username, email and
+phone, which serve the case-insensitive substring search of
+GET /admin/registered_users.
+
+Revision ID: d2f6b8a4e915
+Revises: c5e9a3d71f40
+Create Date: 2025-06-23 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6b8a4e915'
+down_revision: Union[str, None] = 'c5e9a3d71f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ('username', 'email', 'phone')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for column in COLUMNS:
+            op.create_index(f'ix_users_{column}_trgm', 'users', [column],
+                            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+                            postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in reversed(COLUMNS):
+        op.drop_index(f'ix_users_{column}_trgm', table_name='users')
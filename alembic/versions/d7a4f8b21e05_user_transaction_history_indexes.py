@@ -0,0 +1,35 @@
+"""indexes for per-user transaction history
+
+Revision ID: d7a4f8b21e05
+Revises: c3d9e1f47a22
+Create Date: 2025-06-05 14:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a4f8b21e05'
+down_revision: Union[str, None] = 'c3d9e1f47a22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_transactions_sender_id_created_at_id', 'transactions',
+                        ['sender_id', 'created_at', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_transactions_receiver_id_created_at_id', 'transactions',
+                        ['receiver_id', 'created_at', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_transactions_category_id', 'transactions', ['category_id'],
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_category_id', table_name='transactions')
+    op.drop_index('ix_transactions_receiver_id_created_at_id', table_name='transactions')
+    op.drop_index('ix_transactions_sender_id_created_at_id', table_name='transactions')
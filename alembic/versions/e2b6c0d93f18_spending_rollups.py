@@ -0,0 +1,44 @@
+"""spending rollups by user, category, currency and month
+
+Revision ID: e2b6c0d93f18
+Revises: d7a4f8b21e05
+Create Date: 2025-06-09 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b6c0d93f18'
+down_revision: Union[str, None] = 'd7a4f8b21e05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'spending_rollups',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('category_id', sa.UUID(), nullable=False),
+        sa.Column('currency_id', sa.UUID(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('amount', sa.Numeric(), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+        sa.ForeignKeyConstraint(['currency_id'], ['currencies.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'month', 'category_id', 'currency_id', name='uix_spending_rollup_key'),
+    )
+    # Populate the table with: python -m app.services.utils.rebuild_spending_rollups
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('spending_rollups')
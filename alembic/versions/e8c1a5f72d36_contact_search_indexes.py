@@ -0,0 +1,36 @@
+"""ranked contact search and autocomplete
+
+Adds a text_pattern_ops index on lower(users.username) for the
+case-insensitive prefix lookups of contact autocomplete. A user's
+contacts are found through the uix_user_contact (user_id, contact_id)
+index. Substring and similarity matches use the trigram indexes from
+d2f6b8a4e915.
+
+Revision ID: e8c1a5f72d36
+Revises: d2f6b8a4e915
+Create Date: 2025-06-24 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c1a5f72d36'
+down_revision: Union[str, None] = 'd2f6b8a4e915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_username_lower_prefix', 'users',
+                        [sa.text('lower(username) text_pattern_ops')], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_username_lower_prefix', table_name='users')
@@ -0,0 +1,67 @@
+"""append-only ledger and balance snapshots
+
+Creates ledger_entries and balance_snapshots and opens the ledger with one
+"opening" entry per non-empty balance, so every balance equals the sum of
+its entries from here on.
+
+Revision ID: f5a8d2e64b97
+Revises: e2b6c0d93f18
+Create Date: 2025-06-12 16:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a8d2e64b97'
+down_revision: Union[str, None] = 'e2b6c0d93f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'ledger_entries',
+        sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column('entry_group_id', sa.UUID(), nullable=False),
+        sa.Column('transaction_id', sa.UUID(), nullable=True),
+        sa.Column('balance_id', sa.UUID(), nullable=False),
+        sa.Column('amount', sa.Numeric(), nullable=False),
+        sa.Column('balance_after', sa.Numeric(), nullable=False),
+        sa.Column('entry_type', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('clock_timestamp()'), nullable=False),
+        sa.ForeignKeyConstraint(['balance_id'], ['balances.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_ledger_entries_balance_id_created_at', 'ledger_entries', ['balance_id', 'created_at'], unique=False)
+    op.create_index('ix_ledger_entries_created_at', 'ledger_entries', ['created_at'], unique=False)
+    op.create_index('ix_ledger_entries_transaction_id', 'ledger_entries', ['transaction_id'], unique=False)
+
+    op.create_table(
+        'balance_snapshots',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('balance_id', sa.UUID(), nullable=False),
+        sa.Column('taken_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('amount', sa.Numeric(), nullable=False),
+        sa.ForeignKeyConstraint(['balance_id'], ['balances.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('balance_id', 'taken_at', name='uix_balance_snapshot_taken_at'),
+    )
+
+    op.execute(
+        "INSERT INTO ledger_entries (entry_group_id, balance_id, amount, balance_after, entry_type) "
+        "SELECT gen_random_uuid(), id, amount, amount, 'opening' FROM balances WHERE amount <> 0"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('balance_snapshots')
+    op.drop_index('ix_ledger_entries_transaction_id', table_name='ledger_entries')
+    op.drop_index('ix_ledger_entries_created_at', table_name='ledger_entries')
+    op.drop_index('ix_ledger_entries_balance_id_created_at', table_name='ledger_entries')
+    op.drop_table('ledger_entries')
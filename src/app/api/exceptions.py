@@ -21,6 +21,10 @@ class UserUnauthorized(CustomException):
     def __init__(self, detail: str = "Unauthorized access! You don't have sufficient rights to access this page!"):
         super().__init__(detail=detail, status_code=status.HTTP_401_UNAUTHORIZED)
 
+class UserForbidden(CustomException):
+    def __init__(self, detail: str = "Your account is not allowed to perform this action!"):
+        super().__init__(detail=detail, status_code=status.HTTP_403_FORBIDDEN)
+
 class UserVerificationError(CustomException):
     def __init__(self, detail: str = "An error occured during verification. User not found / login expired or other error. Please contact an administrator"):
         super().__init__(detail=detail, status_code=status.HTTP_400_BAD_REQUEST)
@@ -72,3 +76,48 @@ class ContactNotFound(CustomException):
 class ContactAlreadyExists(CustomException):
     def __init__(self, detail: str = "Contact has already been added."):
         super().__init__(detail=detail, status_code=status.HTTP_409_CONFLICT)
+
+
+class InsufficientFunds(CustomException):
+    def __init__(self, detail: str = "Insufficient funds"):
+        super().__init__(detail=detail, status_code=status.HTTP_400_BAD_REQUEST)
+
+
+class IdempotencyKeyMismatch(CustomException):
+    def __init__(self, detail: str = "Idempotency-Key was already used with a different request"):
+        super().__init__(detail=detail, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+class IdempotencyRequestInProgress(CustomException):
+    def __init__(self, detail: str = "A request with this Idempotency-Key is still in progress"):
+        super().__init__(detail=detail, status_code=status.HTTP_409_CONFLICT)
+
+class VerificationJobNotFound(CustomException):
+    def __init__(self, detail: str = "Verification not found"):
+        super().__init__(detail=detail, status_code=status.HTTP_404_NOT_FOUND)
+
+class VerificationDocumentTooLarge(CustomException):
+    def __init__(self, detail: str = "Verification document is too large"):
+        super().__init__(detail=detail, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+class AvatarInvalid(CustomException):
+    def __init__(self, detail: str = "Avatar must be an image"):
+        super().__init__(detail=detail, status_code=status.HTTP_400_BAD_REQUEST)
+
+class PaymentProcessorUnavailable(CustomException):
+    def __init__(self, retry_after: int, detail: str = "Card payments are temporarily unavailable, please try again later"):
+        super().__init__(detail=detail, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.headers = {"Retry-After": str(retry_after)}
+
+class TooManyLoginAttempts(CustomException):
+    def __init__(self, retry_after: int, detail: str = "Too many login attempts, please try again later"):
+        super().__init__(detail=detail, status_code=status.HTTP_429_TOO_MANY_REQUESTS)
+        self.headers = {"Retry-After": str(retry_after)}
+
+class IdempotentReplay(Exception):
+    """
+    Raised when a request repeats a completed Idempotency-Key. It carries the
+    stored response, which the application handler sends back unchanged.
+    """
+    def __init__(self, status_code: int, body: dict):
+        self.status_code = status_code
+        self.body = body
@@ -10,6 +10,8 @@ from app.api.v1.routes.admin_route import router as admin_route
 from app.api.v1.routes.categories_router import router as category_router
 from app.api.v1.routes.transaction_router import router as transaction_router
 from app.api.v1.routes.balance_router import router as balance_router
+from app.api.v1.routes.user_transactions_route import router as user_transactions_route
+from app.api.v1.routes.analytics_route import router as analytics_route
 
 api_router = APIRouter()
 
@@ -20,4 +22,6 @@ api_router.include_router(contact_route)
 api_router.include_router(admin_route)
 api_router.include_router(category_router)
 api_router.include_router(transaction_router)
-api_router.include_router(balance_router)
\ No newline at end of file
+api_router.include_router(balance_router)
+api_router.include_router(user_transactions_route)
+api_router.include_router(analytics_route)
\ No newline at end of file
@@ -1,31 +1,46 @@
 from datetime import date
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.exceptions import UserUnauthorized
 from app.schemas.transaction import AdminTransactionResponse
 from app.services.utils.token_functions import admin_status
-from app.persistence.db import get_session
-from app.schemas.user import AdminUserResponse
+from app.persistence.db import get_read_session, get_session
 from app.services.admins_service import block_user, read_users, read_transactions, unblock_user
+from app.services.utils.metrics import collect_metrics
 
 router = APIRouter(prefix="/admin", tags=["Admin panel"])
 
 
 @router.get(
-    "/registered_users",
-    response_model=List[AdminUserResponse]
+    "/registered_users"
 )
 async def get_users(
     admin_status: bool = Depends(admin_status),
-    db: AsyncSession = Depends(get_session)
-) -> List[AdminUserResponse]:
+    db: AsyncSession = Depends(get_read_session),
+    is_blocked: bool | None = None,
+    is_verified: bool | None = None,
+    is_activated: bool | None = None,
+    is_admin: bool | None = None,
+    search: str | None = Query(None, min_length=1, max_length=100, description="Part of the username, email or phone"),
+    cursor: str | None = Query(None, description="next_cursor returned by the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+) -> dict:
     if not admin_status:
         raise UserUnauthorized()
-    return await read_users(db=db)
+    return await read_users(
+        db=db,
+        is_blocked=is_blocked,
+        is_verified=is_verified,
+        is_activated=is_activated,
+        is_admin=is_admin,
+        search=search,
+        cursor=cursor,
+        limit=limit,
+    )
 
 @router.get(
     "/created_transactions",
@@ -33,7 +48,7 @@ async def get_users(
 )
 async def get_transactions(
     admin_status: bool = Depends(admin_status),
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
     start_date: date | None = None,
     end_date: date | None = None,
     sender_username: str | None = None,
@@ -76,4 +91,14 @@ async def unblock_user_transactions(
 ):
     if not admin_status:
         raise UserUnauthorized()
-    return await unblock_user(db, user_id)
\ No newline at end of file
+    return await unblock_user(db, user_id)
+
+@router.get(
+    "/metrics"
+)
+async def get_metrics(
+    admin_status: bool = Depends(admin_status),
+) -> dict:
+    if not admin_status:
+        raise UserUnauthorized()
+    return collect_metrics()
@@ -0,0 +1,34 @@
+from datetime import date
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.persistence.db import get_read_session
+from app.schemas.analytics import SpendingRollupResponse
+from app.schemas.user import UserResponse
+from app.services.spending_rollups_service import read_spending_rollups
+from app.services.utils.token_functions import get_current_user
+
+router = APIRouter(prefix="/users/me/analytics", tags=["analytics"])
+
+
+@router.get(
+    "/spending",
+    response_model=List[SpendingRollupResponse]
+)
+async def get_spending_by_category(
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_session),
+    start_month: date | None = None,
+    end_month: date | None = None,
+    currency_id: UUID | None = None,
+) -> List[SpendingRollupResponse]:
+    return await read_spending_rollups(
+        db,
+        user_id=current_user.id,
+        start_month=start_month,
+        end_month=end_month,
+        currency_id=currency_id,
+    )
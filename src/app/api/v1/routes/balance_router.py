@@ -1,11 +1,15 @@
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from app.persistence.db import get_session
 
 from app.persistence.balances.balance import Balance
-from app.schemas.balance import BalanceCreate, BalanceResponse
-from app.services.balances_service import _create_balance
+from app.schemas.balance import BalanceAsOfResponse, BalanceCreate, BalanceResponse
+from app.schemas.user import UserResponse
+from app.services.balances_service import _create_balance, _get_balance_id_by_user_id_and_currency_code
+from app.services.ledger_service import get_balance_as_of
+from app.services.utils.token_functions import get_current_user
 
 router = APIRouter(prefix="/balances", tags=["balances"])
 
@@ -16,4 +20,17 @@ async def create_balance_endpoint(
     balance_in: BalanceCreate,
     db: AsyncSession = Depends(get_session)
 ):
-    return await _create_balance(db, user_id, currency_id, balance_in)
\ No newline at end of file
+    return await _create_balance(db, user_id, currency_id, balance_in)
+
+@router.get("/as-of", response_model=BalanceAsOfResponse)
+async def get_balance_as_of_endpoint(
+    currency_code: str,
+    at: datetime,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session)
+):
+    balance_id = await _get_balance_id_by_user_id_and_currency_code(db, current_user.id, currency_code)
+    if not balance_id:
+        raise HTTPException(status_code=404, detail="No balance in this currency")
+    amount = await get_balance_as_of(db, balance_id, at)
+    return BalanceAsOfResponse(currency_code=currency_code, as_of=at, amount=amount)
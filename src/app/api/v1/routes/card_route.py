@@ -2,16 +2,17 @@ from decimal import Decimal
 from uuid import UUID
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.persistence.users.users import User
-from app.schemas.balance import BalanceResponse
+from app.schemas.balance import BalanceLoaded, BalanceResponse
 from app.services.utils.token_functions import get_current_user
 from app.persistence.db import get_session
 from app.schemas.card import CardCreate, CardResponse
 from app.schemas.user import UserResponse
 from app.services.cards_service import create_card, delete_card, load_balance_from_card, read_cards, _card_is_expired
+from app.services.idempotency_service import idempotent_request
 
 router = APIRouter(prefix="/users/me/cards", tags=["cards"])
 
@@ -55,11 +56,14 @@ async def is_card_expired(card_id: UUID, current_user: UserResponse = Depends(ge
 async def load_balance(
     request: BalanceResponse,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
 ):
+    idempotency = idempotent_request(f"top_up:{current_user.id}", idempotency_key, request)
     success = await load_balance_from_card(
-        db, current_user.id, request.card_number, request.amount, request.currency_code
+        db, current_user.id, request.card_number, request.amount, request.currency_code,
+        idempotency=idempotency,
     )
     if success:
-        return {"detail": "Balance loaded successfully."}
+        return BalanceLoaded()
     raise HTTPException(status_code=400, detail="Failed to load balance from card.")
\ No newline at end of file
@@ -5,10 +5,10 @@ from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.utils.token_functions import get_current_user
-from app.persistence.db import get_session
-from app.schemas.contact import ContactResponse, ContactCreate
+from app.persistence.db import get_read_session, get_session
+from app.schemas.contact import ContactResponse, ContactCreate, ContactImport, ContactImportResponse
 from app.schemas.user import UserResponse, User as CurrentUser
-from app.services.contacts_service import create_contact, read_contacts, delete_contact, search_contact
+from app.services.contacts_service import create_contact, read_contacts, delete_contact, search_contact, autocomplete_contacts, import_contacts
 
 router = APIRouter(prefix="/users/me/contacts", tags=["contacts"])
 
@@ -29,13 +29,29 @@ async def add_contact(
         email=contact.email,
         )
 
+@router.post(
+    "/import",
+    response_model=ContactImportResponse
+)
+async def import_address_book(
+    address_book: ContactImport,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    return await import_contacts(
+        db=db,
+        user_id=current_user.id,
+        phones=address_book.phones,
+        emails=address_book.emails,
+        )
+
 @router.get(
     "/",
     response_model=List[ContactResponse]
 )
 async def get_contacts(
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     return await read_contacts(
         db=db,
@@ -58,8 +74,18 @@ async def remove_contact(
 
 @router.get("/search", response_model=List[ContactResponse])
 async def search_contacts(
-    search_by: str = Query(..., min_length=1),
-    db: AsyncSession = Depends(get_session),
+    search_by: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    return await search_contact(db=db, user_id=current_user.id, search_by=search_by, limit=limit)
+
+@router.get("/autocomplete", response_model=List[str])
+async def autocomplete(
+    prefix: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=25),
+    db: AsyncSession = Depends(get_read_session),
     current_user: CurrentUser = Depends(get_current_user),
 ):
-    return await search_contact(db=db, user_id=current_user.id, search_by=search_by)
\ No newline at end of file
+    return await autocomplete_contacts(db=db, user_id=current_user.id, prefix=prefix, limit=limit)
\ No newline at end of file
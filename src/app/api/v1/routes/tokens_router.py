@@ -1,8 +1,8 @@
-from app.services.tokens_service import login_user
+from app.services.tokens_service import login_user, refresh_user_tokens
 from app.schemas.user import UserLogin
 from app.persistence.db import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Cookie, Depends, Request
 from fastapi.responses import JSONResponse
 from typing import Annotated
 from fastapi.security import OAuth2PasswordRequestForm
@@ -37,11 +37,13 @@ token_router = APIRouter()
 
 @token_router.post("/")
 async def _login_user(
+    request: Request,
     login_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: AsyncSession = Depends(get_session),
 ) -> JSONResponse:
     usr = UserLogin.from_oauth2_form_data(login_data)
-    user_tokens = await login_user(session=session, usr=usr)
+    client_ip = request.client.host if request.client else None
+    user_tokens = await login_user(session=session, usr=usr, client_ip=client_ip)
     
     if user_tokens:
         response = JSONResponse(content={
@@ -63,3 +65,25 @@ async def _login_user(
         response = JSONResponse(content={"result": "failure"})
     
     return response
+
+
+@token_router.post("/refresh")
+async def _refresh_tokens(
+    refresh_token: Annotated[str | None, Cookie()] = None,
+    session: AsyncSession = Depends(get_session),
+) -> JSONResponse:
+    user_tokens = await refresh_user_tokens(session=session, refresh_token=refresh_token)
+    response = JSONResponse(content={"result": "success"})
+    response.set_cookie(
+        key="access_token",
+        value=user_tokens.access.access_token,
+        expires=user_tokens.access.expiry,
+        httponly=True,
+    )
+    response.set_cookie(
+        key="refresh_token",
+        value=user_tokens.refresh.access_token,
+        expires=user_tokens.refresh.expiry,
+        httponly=True,
+    )
+    return response
@@ -1,11 +1,14 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, Header, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.utils.token_functions import get_current_user
-from app.persistence.db import get_session
+from app.persistence.db import get_read_session, get_session
 from app.persistence.users.users import User
-from app.schemas.transaction import CardToCardTransaction, CardToCardTransactionIn, CardToCardTransactionOut, TransactionCreate, TransactionResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.schemas.transaction import BatchTransferRequest, BatchTransferResponse, CardToCardTransaction, CardToCardTransactionIn, CardToCardTransactionOut, TransactionCreate, TransactionResponse
 from app.services.transactions_service import *
+from app.services.idempotency_service import idempotent_request
+from app.services.exports_service import EXPORT_MEDIA_TYPES, build_export_query, stream_transactions_export
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
@@ -13,9 +16,11 @@ router = APIRouter(prefix="/transactions", tags=["transactions"])
 async def user_to_user_transaction(
     transaction_data: TransactionCreate,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session) 
+    db: AsyncSession = Depends(get_session),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255)
 ):
-    transaction = await create_user_to_user_transaction(db, current_user.id, transaction_data)
+    idempotency = idempotent_request(f"user-to-user:{current_user.id}", idempotency_key, transaction_data)
+    transaction = await create_user_to_user_transaction(db, current_user.id, transaction_data, idempotency)
     return transaction
 
 @router.delete("/recurring/{transaction_id}")
@@ -50,22 +55,48 @@ async def reject_transaction_endpoint(transaction_id: UUID, db: AsyncSession = D
 
 @router.get("/")
 async def get_all_transactions(
-    db: AsyncSession = Depends(get_session),
-    skip: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_session),
+    cursor: str | None = Query(None, description="next_cursor returned by the previous page"),
     limit: int = Query(5, ge=1, le=100),
     sort_by: str = Query("date", pattern="^(date|amount)$"),
-    sort_order: str = Query("asc", pattern="^(asc|desc)$")
+    sort_order: str = Query("asc", pattern="^(asc|desc)$"),
+    total: str | None = Query(None, pattern="^(exact|estimate)$", description="Include an exact or estimated total")
 ):
-    all_transactions = await view_all_transactions(db, skip=skip, limit=limit,sort_by=sort_by, sort_order=sort_order)
+    all_transactions = await view_all_transactions(db, cursor=cursor, limit=limit, sort_by=sort_by, sort_order=sort_order, total=total)
     if not all_transactions["transactions"]:
         raise HTTPException(status_code=404, detail="No available transactions")
     return all_transactions
 
+@router.get("/export")
+async def export_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start_date: date | None = None,
+    end_date: date | None = None,
+    sender_username: str | None = None,
+    receiver_username: str | None = None,
+    direction: str | None = Query(None, pattern="^(incoming|outgoing)$"),
+    user_id: UUID | None = None,
+    current_user = Depends(get_current_user),
+):
+    stmt = build_export_query(current_user,
+                              start_date=start_date,
+                              end_date=end_date,
+                              sender_username=sender_username,
+                              receiver_username=receiver_username,
+                              direction=direction,
+                              user_id=user_id)
+    return StreamingResponse(
+        stream_transactions_export(stmt, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
+
 @router.get("/recurring")
-async def get_all_recurring_transactions(db: AsyncSession = Depends(get_session),
-                                         skip: int = Query(0, ge=0),
-                                         limit: int = Query(5, ge=1, le=100)):
-    all_recurring_transactions = await view_all_recurring_transactions(db, skip=skip, limit=limit)
+async def get_all_recurring_transactions(db: AsyncSession = Depends(get_read_session),
+                                         cursor: str | None = Query(None, description="next_cursor returned by the previous page"),
+                                         limit: int = Query(5, ge=1, le=100),
+                                         total: str | None = Query(None, pattern="^(exact|estimate)$", description="Include an exact or estimated total")):
+    all_recurring_transactions = await view_all_recurring_transactions(db, cursor=cursor, limit=limit, total=total)
     if not all_recurring_transactions["recurring_transactions"]:
         raise HTTPException(status_code=404, detail="No available recurring transacations")
     return all_recurring_transactions
@@ -73,17 +104,37 @@ async def get_all_recurring_transactions(db: AsyncSession = Depends(get_session)
 @router.post("/between_cards", response_model=CardToCardTransactionOut, status_code=status.HTTP_201_CREATED)
 async def transaction_between_cards(
     transaction_data: CardToCardTransactionIn,
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_session),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255)
 ):
+    idempotency = idempotent_request(f"between_cards:{transaction_data.sender_card_number}",
+                                     idempotency_key, transaction_data)
     transaction = await transfer_between_cards(
         db,
         sending_card_number=transaction_data.sender_card_number,
         receiving_card_number=transaction_data.receiver_card_number,
         amount=transaction_data.amount,
-        description=transaction_data.description
+        description=transaction_data.description,
+        idempotency=idempotency
     )
     
     transaction.sender_card_number = transaction_data.sender_card_number
     transaction.receiver_card_number = transaction_data.receiver_card_number
     
     return transaction
+
+@router.post("/batch", response_model=BatchTransferResponse, status_code=status.HTTP_201_CREATED)
+async def batch_transactions_between_cards(
+    batch: BatchTransferRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session)
+):
+    outcome = await transfer_batch_between_cards(
+        db,
+        sender_id=current_user.id,
+        transfers=batch.transfers,
+        all_or_nothing=batch.all_or_nothing
+    )
+    if not outcome.committed:
+        return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=outcome.model_dump(mode="json"))
+    return outcome
@@ -1,6 +1,7 @@
 from typing import Any,Annotated
-from fastapi import APIRouter,Depends,UploadFile,File
-from app.api.exceptions import UserUnauthorized,UserActivationError,UserVerificationError,UserAlreadyExists
+from uuid import UUID
+from fastapi import APIRouter,Depends,UploadFile,File,status
+from app.api.exceptions import UserUnauthorized,UserActivationError,UserAlreadyExists
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.persistence.db import get_session
 from app.schemas.user import (UserResponse,
@@ -10,7 +11,6 @@ from app.schemas.user import (UserResponse,
                               UserSettingsResponse)
 from app.services.users_service import (create_user,
                                         activate_user,
-                                        verify_user,
                                         update_user_settings_contacts,
                                         update_user_settings_avatar,
                                         update_user_settings_password,
@@ -18,7 +18,10 @@ from app.services.users_service import (create_user,
 from app.services.utils.token_functions import (get_current_user,
                                             user_can_interact,
                                             user_can_make_transactions)
-from app.schemas.service_result import ServiceResult
+from app.schemas.service_result import AvatarUpdateResult, ServiceResult
+from app.schemas.verification import VerificationJobResponse
+from app.services.verification_service import get_verification_job, submit_verification
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -53,18 +56,23 @@ async def _activate_user(current_user:Annotated[UserResponse,Depends(get_current
         raise UserActivationError()
     return activation_result
 
-@router.post("/verifications")
+@router.post("/verifications", status_code=status.HTTP_202_ACCEPTED)
 async def _verify_user(current_user:Annotated[UserResponse,Depends(get_current_user)],
                        id_document:Annotated[UploadFile,File()],
                        selfie:Annotated[UploadFile,File()],
-                       session: AsyncSession = Depends(get_session))->ServiceResult:
-    verification_result = await verify_user(current_user=current_user,
-                             id_document=await id_document.read(),
-                             selfie=await selfie.read(),
-                             session=session)
-    if not isinstance(verification_result,ServiceResult):
-        raise UserVerificationError()
-    return verification_result
+                       session: AsyncSession = Depends(get_session))->VerificationJobResponse:
+    return await submit_verification(session=session,
+                                     current_user=current_user,
+                                     id_document=id_document,
+                                     selfie=selfie)
+
+@router.get("/verifications/{job_id}")
+async def _get_verification(job_id:UUID,
+                            current_user:Annotated[UserResponse,Depends(get_current_user)],
+                            session: AsyncSession = Depends(get_session))->VerificationJobResponse:
+    return await get_verification_job(session=session,
+                                      current_user=current_user,
+                                      job_id=job_id)
 
 @router.get("/current/settings")
 async def _get_user_settings(current_user:Annotated[UserResponse,Depends(get_current_user)],
@@ -103,10 +111,11 @@ async def _update_user_settings_password(current_user:Annotated[UserResponse,Dep
 @router.post("/current/settings/avatar")
 async def _update_user_settings_avatar(current_user:Annotated[UserResponse,Depends(get_current_user)],
                                 avatar:Annotated[UploadFile|None,File()] = None,
-                                session: AsyncSession = Depends(get_session))->ServiceResult:
+                                session: AsyncSession = Depends(get_session))->AvatarUpdateResult:
+    content = await avatar.read(settings.AVATAR_MAX_BYTES + 1) if avatar else None
     update_settings_result = await update_user_settings_avatar(current_user=current_user,
                                                         session=session,
-                                                        avatar=avatar.file.read())
+                                                        avatar=content)
     if not isinstance(update_settings_result,ServiceResult):
         raise UserUnauthorized()
     return update_settings_result
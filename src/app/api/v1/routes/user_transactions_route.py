@@ -0,0 +1,37 @@
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.persistence.db import get_read_session
+from app.schemas.user import UserResponse
+from app.services.user_transactions_service import read_user_transactions
+from app.services.utils.token_functions import get_current_user
+
+router = APIRouter(prefix="/users/me/transactions", tags=["transactions"])
+
+
+@router.get("/")
+async def get_my_transactions(
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_session),
+    direction: str = Query("all", pattern="^(all|incoming|outgoing)$"),
+    currency_id: UUID | None = None,
+    category_id: UUID | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    cursor: str | None = Query(None, description="next_cursor returned by the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    return await read_user_transactions(
+        db,
+        user_id=current_user.id,
+        direction=direction,
+        currency_id=currency_id,
+        category_id=category_id,
+        start_date=start_date,
+        end_date=end_date,
+        cursor=cursor,
+        limit=limit,
+    )
@@ -1,14 +1,38 @@
+import logging
+import time
 from contextlib import asynccontextmanager
 from urllib.parse import urljoin
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles
 
+from app.api.exceptions import IdempotentReplay
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.persistence.db import AsyncSessionLocal, initialize_database
-from app.persistence.initial_data import create_predefined_categories, load_initial_currencies
+from app.persistence.db import AsyncSessionLocal, database_routing_scope
+from app.persistence.initial_data import bootstrap_database
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.services.utils.init_admin_user import create_admin_user
+from app.services.utils.background_tasks import BackgroundJobs
+from app.services.utils.recurring_executor import recurring_executor
+from app.services.idempotency_service import run_idempotency_purge
+from app.services.tokens_service import run_refresh_token_purge
+from app.services.ledger_service import run_balance_snapshots
+from app.services.avatar_service import avatar_pipeline
+from app.services.verification_service import verification_runner
+from app.services.mail_outbox_service import run_mail_dispatcher
+from app.services.utils.mail.sendmail import mail_sender
+from app.services.utils.metrics import register_metrics
+from app.services.utils.notifications import notification_listener
+from app.services.utils.principal_cache import PRINCIPAL_CHANNEL, principal_cache
+from app.services.utils.security import password_hasher
+from app.services.utils.payment_processor import payment_processor
+from app.services.utils.reference_cache import REFERENCE_DATA_CHANNEL, reference_cache
+
+logger = logging.getLogger(__name__)
+
+_startup_timings: dict[str, float] = {}
+register_metrics("startup", lambda: dict(_startup_timings))
 
 def _create_app() -> FastAPI:
     app_ = FastAPI(
@@ -23,6 +47,16 @@ def _create_app() -> FastAPI:
         prefix=settings.API_V1_STR,
     )
 
+    if settings.AVATAR_STORAGE_BACKEND == "local":
+        app_.mount(
+            settings.AVATAR_LOCAL_BASE_URL,
+            StaticFiles(directory=settings.AVATAR_LOCAL_DIR, check_dir=False),
+            name="avatars",
+        )
+
+    app_.add_exception_handler(IdempotentReplay, _replay_idempotent_response)
+    app_.middleware("http")(_database_routing_scope)
+
     allowed_origins = [
         "http://localhost:3000"
     ]
@@ -37,18 +71,86 @@ def _create_app() -> FastAPI:
     return app_
 
 
+async def _database_routing_scope(request: Request, call_next):
+    with database_routing_scope():
+        return await call_next(request)
+
+
+async def _replay_idempotent_response(request: Request, exc: IdempotentReplay) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.status_code,
+        content=exc.body,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Context manager to handle the lifespan of the FastAPI application.
+    The schema must be up to date ("alembic upgrade head").
     """
-    await initialize_database()
-
-    await load_initial_currencies()
+    started = time.perf_counter()
     async with AsyncSessionLocal() as session:
-        await create_predefined_categories(session)
-        await create_admin_user(session)
+        await bootstrap_database(session)
+    _startup_timings["bootstrap_seconds"] = round(time.perf_counter() - started, 3)
+
+    await reference_cache.reload()
+    payment_processor.start()
+    notification_listener.subscribe(REFERENCE_DATA_CHANNEL, reference_cache.on_notification)
+    notification_listener.subscribe(PRINCIPAL_CHANNEL, principal_cache.on_notification)
+    notification_listener.start()
+
+    background_jobs = BackgroundJobs()
+    background_jobs.start(
+        "reference-data-refresh",
+        reference_cache.reload,
+        settings.REFERENCE_CACHE_REFRESH_SECONDS,
+    )
+    if settings.RECURRING_EXECUTOR_IN_APP:
+        background_jobs.start(
+            "recurring-transactions",
+            recurring_executor.run_once,
+            settings.RECURRING_EXECUTOR_INTERVAL_SECONDS,
+        )
+    background_jobs.start(
+        "idempotency-key-purge",
+        run_idempotency_purge,
+        settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+    )
+    background_jobs.start(
+        "refresh-token-purge",
+        run_refresh_token_purge,
+        settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS,
+    )
+    background_jobs.start(
+        "balance-snapshots",
+        run_balance_snapshots,
+        settings.BALANCE_SNAPSHOT_INTERVAL_SECONDS,
+    )
+    background_jobs.start(
+        "mail-outbox",
+        run_mail_dispatcher,
+        settings.MAIL_OUTBOX_INTERVAL_SECONDS,
+    )
+    background_jobs.start(
+        "verification-jobs",
+        verification_runner.run_due,
+        settings.VERIFICATION_INTERVAL_SECONDS,
+    )
+    _startup_timings["startup_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"Startup finished in {_startup_timings['startup_seconds']:.3f}s "
+        f"(bootstrap {_startup_timings['bootstrap_seconds']:.3f}s)"
+    )
     yield
+    await background_jobs.stop()
+    await verification_runner.shutdown()
+    await mail_sender.close()
+    await payment_processor.close()
+    await avatar_pipeline.shutdown()
+    await notification_listener.stop()
+    password_hasher.shutdown()
 
 
 app = _create_app()
@@ -11,6 +11,13 @@ from app.persistence.users.users import User
 from app.persistence.balances.balance import Balance
 from app.persistence.contacts.contact import Contact
 from app.persistence.cards.card import Card
+from app.persistence.idempotency_keys.idempotency_key import IdempotencyKey
+from app.persistence.spending_rollups.spending_rollup import SpendingRollup
+from app.persistence.ledger_entries.ledger_entry import LedgerEntry
+from app.persistence.balance_snapshots.balance_snapshot import BalanceSnapshot
+from app.persistence.mail_outbox.mail_outbox_message import MailOutboxMessage
+from app.persistence.verification_jobs.verification_job import VerificationJob
+from app.persistence.refresh_tokens.refresh_token import RefreshToken
 
 
 __all__ = [
@@ -22,4 +29,11 @@ __all__ = [
     "Category",
     "Transaction",
     "RecurringTransaction",
+    "IdempotencyKey",
+    "SpendingRollup",
+    "LedgerEntry",
+    "BalanceSnapshot",
+    "MailOutboxMessage",
+    "VerificationJob",
+    "RefreshToken",
 ]
\ No newline at end of file
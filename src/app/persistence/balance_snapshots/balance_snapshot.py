@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, Numeric, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.persistence.db import Base
+
+
+class BalanceSnapshot(Base):
+    """
+    Represents the amount of a Balance at a point in time, taken from the
+    ledger. A point-in-time balance is the nearest snapshot plus the ledger
+    entries written after it.
+
+    Attributes:
+        id (uuid.UUID): Unique identifier of the snapshot.
+        balance_id (uuid.UUID): FK to the Balance.
+        taken_at (datetime): Ledger entries up to this time are included.
+        amount (Decimal): Balance amount at taken_at.
+    """
+
+    __tablename__ = "balance_snapshots"
+
+    __table_args__ = (
+        UniqueConstraint("balance_id", "taken_at", name="uix_balance_snapshot_taken_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    balance_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("balances.id"), nullable=False)
+    taken_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric, nullable=False)
@@ -1,6 +1,10 @@
-from typing import Any, AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncAttrs
-from sqlalchemy.orm import DeclarativeBase
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Iterator
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncAttrs
+from sqlalchemy import Select, event
+from sqlalchemy.orm import DeclarativeBase, Session
 from sqlalchemy.ext.asyncio import async_sessionmaker,AsyncSession
 from app.core.config import settings
 # from app.persistence.balances.balance import Balance
@@ -14,18 +18,110 @@ from app.core.config import settings
 
 DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
 
-engine = create_async_engine(DATABASE_URL, echo=True)
 
-AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+def create_engine_from_settings(url: str) -> AsyncEngine:
+    """
+    Creates an engine with the pool and driver options from Settings.
+    The statement cache size applies to both asyncpg and SQLAlchemy's
+    prepared statement cache, so 0 turns prepared statements off entirely.
+    """
+    return create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        connect_args={
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "server_settings": {"statement_timeout": str(settings.DATABASE_STATEMENT_TIMEOUT_MS)},
+        },
+    )
 
-class Base(DeclarativeBase, AsyncAttrs):
-    pass
+
+engine = create_engine_from_settings(DATABASE_URL)
+replica_engine = (
+    create_engine_from_settings(settings.SQLALCHEMY_REPLICA_DATABASE_URI)
+    if settings.SQLALCHEMY_REPLICA_DATABASE_URI else None
+)
+
+
+@dataclass
+class RoutingState:
+    """Shared by every session of one request; pinned once any of them writes."""
+    pinned: bool = False
+
+
+_routing_state: ContextVar[RoutingState | None] = ContextVar("database_routing_state", default=None)
+
+
+@contextmanager
+def database_routing_scope() -> Iterator[RoutingState]:
+    """Opens the read-your-writes scope of one request."""
+    state = RoutingState()
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+def _pin_to_primary(session: Session) -> None:
+    session.info["pinned"] = True
+    state = _routing_state.get()
+    if state is not None:
+        state.pinned = True
 
 
-async def initialize_database():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs of read-only sessions to the replica. Everything
+    else, and every statement after the session or any other session of
+    the same request has written, goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            replica_engine is not None
+            and self.info.get("read_only")
+            and not self.info.get("pinned")
+            and not getattr(_routing_state.get(), "pinned", False)
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return replica_engine.sync_engine
+        return engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _pin_on_write(orm_execute_state) -> None:
+    if not orm_execute_state.is_select or getattr(orm_execute_state.statement, "_for_update_arg", None) is not None:
+        _pin_to_primary(orm_execute_state.session)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_on_flush(session, flush_context) -> None:
+    _pin_to_primary(session)
+
+
+AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, sync_session_class=RoutingSession)
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=engine, expire_on_commit=False, sync_session_class=RoutingSession, info={"read_only": True}
+)
+
+class Base(DeclarativeBase, AsyncAttrs):
+    pass
 
 async def get_session() -> AsyncGenerator[Any, Any]:
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_read_session() -> AsyncGenerator[Any, Any]:
+    """
+    Session for read-only endpoints: its SELECTs go to the replica, if one
+    is configured, until something in the request writes.
+    """
+    async with AsyncReadSessionLocal() as session:
+        yield session
@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.persistence.db import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Represents a client supplied Idempotency-Key for a money-moving request.
+
+    Attributes:
+        id (uuid.UUID): Unique identifier of the record.
+        scope (str): Endpoint and caller the key belongs to.
+        key (str): Value of the Idempotency-Key header.
+        request_hash (str): SHA-256 of the request payload.
+        status (str): "in_progress" or "completed".
+        response_code (int): Status code of the stored response.
+        response_body (dict): Stored response, replayed for duplicates.
+        created_at (datetime): When the key was claimed.
+        expires_at (datetime): After this the key can be purged or reused.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uix_idempotency_scope_key"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    scope: Mapped[str] = mapped_column(String(100), nullable=False)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    response_code: Mapped[int] = mapped_column(Integer, nullable=True)
+    response_body: Mapped[dict] = mapped_column(JSONB, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
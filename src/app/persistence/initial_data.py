@@ -1,14 +1,19 @@
 import asyncio
+import logging
 import uuid
 
-from sqlalchemy import select
-from app.core.config import settings
-from app.persistence.db import initialize_database, get_session
-from app.persistence.db import Base 
-from app.persistence.db import engine  
-from app.persistence.currencies.currency import Currency 
-from app.persistence.categories.categories import Category 
+from sqlalchemy import String, column, exists, false, func, select, true, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.persistence.db import AsyncSessionLocal
+from app.persistence.currencies.currency import Currency
+from app.persistence.categories.categories import Category
 from app.core.enums.enums import AvailableCurrency
+from app.services.utils.init_admin_user import create_admin_user
+from app.services.utils.reference_cache import notify_reference_data_changed
+
+logger = logging.getLogger(__name__)
 
 PREDEFINED_CATEGORIES = [
     "groceries",
@@ -17,56 +22,87 @@ PREDEFINED_CATEGORIES = [
     "entertainment",
     "User Transfer"
 ]
-async def create_predefined_categories(session):
-    result = await session.execute(select(Category.name))
-    existing_names = {row[0] for row in result.all()}
-
-    to_add = []
-    for name in PREDEFINED_CATEGORIES:
-        if name not in existing_names:
-            to_add.append(Category(id=uuid.uuid4(), name=name, is_default = True))
-
-    if to_add:
-        session.add_all(to_add)
-        await session.commit()
-        print(f"Inserted categories: {[c.name for c in to_add]}")
-    else:
-        print("All categories already present; no inserts performed.")
-
-async def load_initial_currencies():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    async for session in get_session():
-        result = await session.execute(select(Currency.code))
-        existing_codes = {row[0] for row in result.all()}
-
-        to_add = []
-        for cur in AvailableCurrency:
-            code = cur.value.upper()
-            name = cur.name.title() 
-            if code not in existing_codes:
-                to_add.append(
-                    Currency(
-                        id=uuid.uuid4(),
-                        code=code,
-                        name=name
-                    )
-                )
-
-        if to_add:
-            session.add_all(to_add)
-            await session.commit()
-            print(f"Inserted currencies: {[c.code for c in to_add]}")
-        else:
-            print("All currencies already present; no inserts performed.")
 
+# Key of the transaction-level advisory lock that serializes bootstrap
+# across workers and instances.
+BOOTSTRAP_LOCK_KEY = 7_403_115_921
+
+
+async def create_predefined_categories(session: AsyncSession) -> list[str]:
+    """
+    Inserts the missing default categories in one statement.
+
+    Default categories have no user_id, and NULLs never collide on
+    uq_category_name_per_user, so the NOT EXISTS does the deduplication;
+    the bootstrap lock makes it race-free.
+
+    Returns:
+        Names of the inserted categories.
+    """
+    predefined = values(column("name", String), name="predefined").data(
+        [(name,) for name in PREDEFINED_CATEGORIES]
+    )
+    missing = select(func.gen_random_uuid(), predefined.c.name, true(), false()).where(
+        ~exists().where(Category.user_id.is_(None), Category.name == predefined.c.name)
+    )
+    result = await session.execute(
+        insert(Category)
+        .from_select(["id", "name", "is_default", "is_deleted"], missing)
+        .on_conflict_do_nothing()
+        .returning(Category.name)
+    )
+    return list(result.scalars().all())
 
-async def main():
-    await load_initial_currencies()
 
-    async for session in get_session():
-        await create_predefined_categories(session)
+async def load_initial_currencies(session: AsyncSession) -> list[str]:
+    """
+    Inserts the missing AvailableCurrency rows in one statement.
+
+    Returns:
+        Codes of the inserted currencies.
+    """
+    result = await session.execute(
+        insert(Currency)
+        .values([
+            {"id": uuid.uuid4(), "code": currency.value.upper(), "name": currency.name.title()}
+            for currency in AvailableCurrency
+        ])
+        .on_conflict_do_nothing(index_elements=["code"])
+        .returning(Currency.code)
+    )
+    return list(result.scalars().all())
+
+
+async def bootstrap_database(session: AsyncSession) -> dict[str, list[str]]:
+    """
+    Seeds currencies, default categories and the admin user in a single
+    transaction. A Postgres advisory lock held until the commit makes
+    concurrent workers run it one after another; the ones that come later
+    find everything in place and insert nothing. The schema itself is
+    managed by Alembic.
+
+    Returns:
+        What was inserted, per kind.
+    """
+    await session.execute(select(func.pg_advisory_xact_lock(BOOTSTRAP_LOCK_KEY)))
+    inserted = {
+        "currencies": await load_initial_currencies(session),
+        "categories": await create_predefined_categories(session),
+        "admin": await create_admin_user(session),
+    }
+    if inserted["currencies"] or inserted["categories"]:
+        await notify_reference_data_changed(session)
+    await session.commit()
+    for kind, names in inserted.items():
+        if names:
+            logger.info(f"Bootstrap inserted {kind}: {names}")
+    return inserted
+
+
+async def main():
+    async with AsyncSessionLocal() as session:
+        await bootstrap_database(session)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Identity, Index, Numeric, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.persistence.db import Base
+
+
+class LedgerEntry(Base):
+    """
+    Represents one append-only movement of a Balance.
+
+    Every debit and credit writes an entry in the same database transaction
+    as the balance update. Entries of one movement share entry_group_id and,
+    for transfers, sum up to zero.
+
+    Attributes:
+        id (int): Monotonic identifier. The balance row is locked before the
+                  entry is written, so per balance it follows the order in
+                  which the amounts changed.
+        entry_group_id (uuid.UUID): Groups the entries of one movement.
+        transaction_id (uuid.UUID): Transaction that caused the movement, if any.
+        balance_id (uuid.UUID): FK to the Balance that moved.
+        amount (Decimal): Signed change, negative for debits.
+        balance_after (Decimal): Balance amount right after this entry.
+        entry_type (str): "transfer", "deposit" or "opening".
+        created_at (datetime): Wall clock time of the write (clock_timestamp()).
+    """
+
+    __tablename__ = "ledger_entries"
+
+    __table_args__ = (
+        Index("ix_ledger_entries_balance_id_created_at", "balance_id", "created_at"),
+        Index("ix_ledger_entries_created_at", "created_at"),
+        Index("ix_ledger_entries_transaction_id", "transaction_id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    entry_group_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    transaction_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=True)
+    balance_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("balances.id"), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric, nullable=False)
+    balance_after: Mapped[Decimal] = mapped_column(Numeric, nullable=False)
+    entry_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.clock_timestamp(), nullable=False
+    )
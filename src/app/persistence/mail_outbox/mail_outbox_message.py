@@ -0,0 +1,46 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.persistence.db import Base
+
+
+class MailOutboxMessage(Base):
+    """
+    Represents an e-mail waiting to be sent.
+
+    Rows are written in the same database transaction as the change that
+    triggers the mail and are drained by the mail dispatcher.
+
+    Attributes:
+        id (uuid.UUID): Unique identifier of the message.
+        kind (str): Kind of mail, e.g. "activation".
+        payload (dict): Mailjet message (From, To, Subject, TextPart, HTMLPart).
+        status (str): "pending", "sent" or "failed".
+        attempts (int): Number of delivery attempts so far.
+        next_attempt_at (datetime): The message is not retried before this time.
+        last_error (str): Error of the last failed attempt.
+        created_at (datetime): When the message was queued.
+        sent_at (datetime): When Mailjet accepted the message.
+    """
+
+    __tablename__ = "mail_outbox"
+
+    __table_args__ = (
+        Index("ix_mail_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending", server_default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
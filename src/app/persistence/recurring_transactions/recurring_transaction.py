@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, Column, ForeignKey, Numeric, Boolean, Enum, DateTime, String
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Numeric, Boolean, Enum, DateTime, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import uuid 
 from app.persistence.db import Base
@@ -18,6 +18,8 @@ class RecurringTransaction(Base):
     amount: Mapped[Decimal] = mapped_column(Numeric, nullable=False)
     interval_type: Mapped[IntervalType] = mapped_column(Enum(IntervalType), nullable=False)
     next_execution_date: Mapped[date] = mapped_column(Date, nullable=False)
+    # Monthly and yearly occurrences are counted from it, so they keep its day.
+    start_date: Mapped[date] = mapped_column(Date, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     description: Mapped[str] = mapped_column(String, nullable=True)
     last_run_date: Mapped[date] = mapped_column(Date, nullable=True)
@@ -25,3 +27,7 @@ class RecurringTransaction(Base):
     sender = relationship("User", foreign_keys=[sender_id], back_populates="sent_recurring_transactions")
     receiver = relationship("User", foreign_keys=[receiver_id], back_populates="received_recurring_transactions")
     currency = relationship("Currency", back_populates="recurring_transactions")
+
+    __table_args__ = (
+        Index("ix_recurring_transactions_next_execution_date_id", "next_execution_date", "id"),
+    )
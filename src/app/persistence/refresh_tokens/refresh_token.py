@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.persistence.db import Base
+
+
+class RefreshToken(Base):
+    """
+    Represents an issued refresh token. Each token can be exchanged once;
+    the exchange issues the next token of the same family.
+
+    Attributes:
+        jti (uuid.UUID): The token's "jti" claim.
+        family_id (uuid.UUID): Shared by all tokens rotated from one login.
+        user_id (uuid.UUID): FK to the User the token was issued to.
+        created_at (datetime): When the token was issued.
+        expires_at (datetime): The token's "exp" claim.
+        used_at (datetime): When the token was exchanged or revoked.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    jti: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    family_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,45 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.persistence.db import Base
+
+
+class SpendingRollup(Base):
+    """
+    Pre-aggregated outgoing spending of a user, per category, currency and month.
+
+    Maintained in the same database transaction that completes a transfer, so
+    the rollups never drift from `transactions`.
+
+    Attributes:
+        id (uuid.UUID): Unique identifier of the rollup row.
+        user_id (uuid.UUID): FK to the User who spent the money.
+        category_id (uuid.UUID): FK to the Category of the transactions.
+        currency_id (uuid.UUID): FK to the Currency of the transactions.
+        month (date): First day of the month.
+        amount (Decimal): Total amount spent.
+        transaction_count (int): Number of completed transactions.
+        updated_at (datetime): Last time the row changed.
+    """
+
+    __tablename__ = "spending_rollups"
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", "category_id", "currency_id", name="uix_spending_rollup_key"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
+    category_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("categories.id"), nullable=False)
+    currency_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("currencies.id"), nullable=False)
+    month: Mapped[date] = mapped_column(Date, nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric, nullable=False, default=Decimal("0"))
+    transaction_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -1,6 +1,6 @@
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, Numeric, Boolean, Date, String
+from sqlalchemy import ForeignKey, Numeric, Boolean, Date, DateTime, Index, String, func
 from app.core.enums.enums import TransactionType
 from app.persistence.users.users import User
 from app.persistence.currencies.currency import Currency
@@ -8,6 +8,7 @@ from app.persistence.db import Base
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
 from decimal import Decimal
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -27,6 +28,7 @@ class Transaction(Base):
     status: Mapped[str] = mapped_column(String, nullable=False)
     is_recurring: Mapped[bool] = mapped_column(Boolean, default=False)
     created_date: Mapped[Date] = mapped_column(Date)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     description: Mapped[str] = mapped_column(String, nullable=True)
     sender_card_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("cards.id"), nullable=True)
     receiver_card_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("cards.id"), nullable=True)
@@ -38,3 +40,10 @@ class Transaction(Base):
     currency: Mapped["Currency"] = relationship("Currency", backref="transactions")
     category: Mapped["Category"] = relationship("Category", back_populates="transactions")
 
+    __table_args__ = (
+        Index("ix_transactions_created_at_id", "created_at", "id"),
+        Index("ix_transactions_amount_id", "amount", "id"),
+        Index("ix_transactions_sender_id_created_at_id", "sender_id", "created_at", "id"),
+        Index("ix_transactions_receiver_id_created_at_id", "receiver_id", "created_at", "id"),
+        Index("ix_transactions_category_id", "category_id"),
+    )
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, List
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Boolean, String
+from sqlalchemy import Boolean, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -51,6 +51,14 @@ class User(Base):
     is_activated : Mapped[bool] = mapped_column(Boolean, default=False,nullable=False)
     avatar: Mapped[str] = mapped_column(String, nullable=True)
 
+    __table_args__ = (
+        Index("ix_users_username_trgm", "username", postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_users_phone_trgm", "phone", postgresql_using="gin", postgresql_ops={"phone": "gin_trgm_ops"}),
+        Index("ix_users_username_lower_prefix", func.lower(username).label("username_lower"),
+              postgresql_ops={"username_lower": "text_pattern_ops"}),
+    )
+
     balances: Mapped[List["Balance"]] = relationship(
         "Balance", back_populates="user", cascade="all, delete-orphan"
     )
@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.persistence.db import Base
+
+
+class VerificationJob(Base):
+    """
+    Represents an identity verification submitted by a user and sent to the
+    verification provider in the background.
+
+    Attributes:
+        id (uuid.UUID): Unique identifier of the job, polled by the client.
+        user_id (uuid.UUID): FK to the User being verified.
+        status (str): "pending", "processing", "verified", "rejected" or "failed".
+        attempts (int): Number of calls made to the provider.
+        next_attempt_at (datetime): The job is not picked up before this time.
+        last_error (str): Error of the last failed attempt.
+        created_at (datetime): When the documents were submitted.
+        updated_at (datetime): Last status change.
+        completed_at (datetime): When the job reached a final status.
+    """
+
+    __tablename__ = "verification_jobs"
+
+    __table_args__ = (
+        Index("ix_verification_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending", server_default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,14 @@
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class SpendingRollupResponse(BaseModel):
+    month: date
+    category_id: UUID
+    category_name: str
+    currency_code: str
+    amount: Decimal
+    transaction_count: int
@@ -1,3 +1,4 @@
+from datetime import datetime
 from uuid import UUID
 from decimal import Decimal
 from pydantic import BaseModel, Field
@@ -20,3 +21,10 @@ class BalanceResponse(BaseModel):
             currency_code=obj.currency.code
         )
 
+class BalanceLoaded(BaseModel):
+    detail: str = "Balance loaded successfully."
+
+class BalanceAsOfResponse(BaseModel):
+    currency_code: str
+    as_of: datetime
+    amount: Decimal
@@ -1,4 +1,7 @@
-from pydantic import BaseModel, model_validator
+import re
+from typing import List
+
+from pydantic import BaseModel, Field, field_validator, model_validator
 from app.persistence.contacts.contact import Contact
 
 class ContactCreate(BaseModel):
@@ -21,4 +24,35 @@ class ContactResponse(BaseModel):
     def create(cls, obj: Contact) -> "ContactResponse":
         return ContactResponse(
             username=obj.contact.username
-        )
\ No newline at end of file
+        )
+
+
+CONTACT_IMPORT_MAX_ENTRIES = 5000
+_PHONE_SEPARATORS = re.compile(r"[\s\-().]")
+_PHONE = re.compile(r"^(\d{10}|\d{12})$")
+
+
+def normalize_phone(value: str) -> str | None:
+    """
+    Brings an address-book phone to the stored form: separators and the
+    leading "+" are dropped, as UserSettings does. Returns None if what is
+    left is not a phone number users can register with.
+    """
+    phone = _PHONE_SEPARATORS.sub("", value).replace("+", "")
+    return phone if _PHONE.match(phone) else None
+
+
+class ContactImport(BaseModel):
+    phones: List[str] = Field(default_factory=list, max_length=CONTACT_IMPORT_MAX_ENTRIES)
+    emails: List[str] = Field(default_factory=list, max_length=CONTACT_IMPORT_MAX_ENTRIES)
+
+    @field_validator("emails")
+    @classmethod
+    def _strip_emails(cls, values: List[str]) -> List[str]:
+        return [value.strip() for value in values if "@" in value]
+
+
+class ContactImportResponse(BaseModel):
+    added: List[ContactResponse]
+    matched: int
+    unmatched: int
@@ -1,4 +1,8 @@
 from pydantic import BaseModel
 
 class ServiceResult(BaseModel):
-    result:bool
\ No newline at end of file
+    result:bool
+
+class AvatarUpdateResult(ServiceResult):
+    status:str
+    content_hash:str|None=None
@@ -1,7 +1,9 @@
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from uuid import UUID
 
+from typing import List
+
 from pydantic import BaseModel, Field, model_validator
 
 from app.core.enums.enums import AvailableCategory, AvailableCurrency, IntervalType
@@ -72,6 +74,10 @@ class RecurringTransactionCreate(BaseModel):
     occurrences: int | None = Field(None, gt=0, description="Optional number of occurrences, alternative to end_date")
     is_active: bool = True
 
+class UserTransactionResponse(TransactionResponse):
+    created_at: datetime
+    direction: str | None = None
+
 class CardToCardTransaction(BaseModel):
     sender_card_number: str = Field(..., min_length=16, max_length=16)
     receiver_card_number: str = Field(..., min_length=16, max_length=16)
@@ -105,3 +111,18 @@ class CardToCardTransactionOut(BaseModel):
     class Config:
         orm_mode = True
 
+class BatchTransferRequest(BaseModel):
+    transfers: List[CardToCardTransactionIn] = Field(..., min_length=1, max_length=5000)
+    all_or_nothing: bool = Field(True, description="Reject the whole batch if any transfer fails")
+
+class BatchTransferItemResult(BaseModel):
+    index: int
+    status: str
+    transaction_id: UUID | None = None
+    detail: str | None = None
+
+class BatchTransferResponse(BaseModel):
+    committed: bool
+    completed: int
+    failed: int
+    results: List[BatchTransferItemResult]
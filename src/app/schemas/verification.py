@@ -0,0 +1,11 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class VerificationJobResponse(BaseModel):
+    id: UUID
+    status: str
+    created_at: datetime
+    completed_at: datetime | None = None
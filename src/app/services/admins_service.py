@@ -10,42 +10,131 @@ from app.persistence.currencies.currency import Currency
 from app.schemas.transaction import AdminTransactionResponse
 from app.schemas.user import AdminUserResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import UUID, select
+from sqlalchemy import UUID, Select, or_, select
 from sqlalchemy.orm import aliased
 
 from app.services.users_service import _get_user_by_id
+from app.services.utils.pagination import decode_cursor, encode_cursor, keyset_paginate
+from app.services.utils.principal_cache import notify_principal_changed, principal_cache
+from app.services.utils.text_search import LIKE_ESCAPE, contains_pattern
+
+
+ADMIN_USER_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.phone,
+    User.is_blocked,
+    User.is_activated,
+    User.is_verified,
+    User.is_admin,
+    User.avatar,
+)
+
+
+def build_users_query(
+    is_blocked: bool | None = None,
+    is_verified: bool | None = None,
+    is_activated: bool | None = None,
+    is_admin: bool | None = None,
+    search: str | None = None,
+) -> Select:
+    """
+    Builds the filtered admin user listing. Only the AdminUserResponse
+    columns are selected, so password hashes are never loaded and no ORM
+    entities are built.
+
+    search matches anywhere in username, email or phone (case-insensitive);
+    each ILIKE is answered by the column's pg_trgm GIN index.
+    """
+    stmt = select(*ADMIN_USER_COLUMNS)
+    for column, value in (
+        (User.is_blocked, is_blocked),
+        (User.is_verified, is_verified),
+        (User.is_activated, is_activated),
+        (User.is_admin, is_admin),
+    ):
+        if value is not None:
+            stmt = stmt.where(column == value)
+    if search:
+        pattern = contains_pattern(search)
+        stmt = stmt.where(or_(
+            User.username.ilike(pattern, escape=LIKE_ESCAPE),
+            User.email.ilike(pattern, escape=LIKE_ESCAPE),
+            User.phone.ilike(pattern, escape=LIKE_ESCAPE),
+        ))
+    return stmt
 
 
 async def read_users(
-        db: AsyncSession
-) -> List[AdminUserResponse]:
-    stmt   = select(User)
+        db: AsyncSession,
+        is_blocked: bool | None = None,
+        is_verified: bool | None = None,
+        is_activated: bool | None = None,
+        is_admin: bool | None = None,
+        search: str | None = None,
+        cursor: str | None = None,
+        limit: int = 20,
+) -> dict:
+    """
+    Returns one page of registered users ordered by username.
+
+    Args:
+        db: Database session.
+        is_blocked: Only blocked or only unblocked users.
+        is_verified: Only verified or only unverified users.
+        is_activated: Only activated or only inactive users.
+        is_admin: Only admins or only regular users.
+        search: Substring of the username, email or phone.
+        cursor: next_cursor of the previous page.
+        limit: Page size.
+
+    Returns:
+        The page of users, the cursor of the next page and whether it exists.
+    """
+    scope = "username:asc"
+    after = decode_cursor(cursor, scope, (str, UUID)) if cursor else None
+    stmt = keyset_paginate(
+        build_users_query(is_blocked, is_verified, is_activated, is_admin, search),
+        (User.username, User.id), after, descending=False, limit=limit,
+    )
     result = await db.execute(stmt)
-    users  = result.scalars().all()
+    rows = result.all()
 
-    if not users:
+    if not rows and not cursor:
         raise UserNotFound()
 
-    return users
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        next_cursor = encode_cursor(scope, (last.username, last.id))
+
+    return {
+        "users": [AdminUserResponse(**row._mapping) for row in rows],
+        "next_cursor": next_cursor,
+        "has_next": has_next,
+        "per_page": limit,
+    }
 
 
 from datetime import date
 from uuid import UUID
 from typing import List
 
-async def read_transactions(
-    db: AsyncSession,
+def build_transactions_query(
     start_date: date | None = None,
     end_date: date | None = None,
     sender_username: str | None = None,
     receiver_username: str | None = None,
     direction: str | None = None,
     user_id: UUID | None = None,
-    limit: int = 20,
-    offset: int = 0,
-) -> List[AdminTransactionResponse]:
-
-
+) -> Select:
+    """
+    Builds the filtered transaction history query shared by the admin panel
+    and the export endpoint. Rows carry the AdminTransactionResponse fields.
+    """
     Sender = aliased(User)
     Receiver = aliased(User)
 
@@ -82,6 +171,28 @@ async def read_transactions(
         elif direction == "outgoing":
             stmt = stmt.where(Transaction.sender_id == user_id)
 
+    return stmt
+
+async def read_transactions(
+    db: AsyncSession,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    sender_username: str | None = None,
+    receiver_username: str | None = None,
+    direction: str | None = None,
+    user_id: UUID | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[AdminTransactionResponse]:
+
+    stmt = build_transactions_query(
+        start_date=start_date,
+        end_date=end_date,
+        sender_username=sender_username,
+        receiver_username=receiver_username,
+        direction=direction,
+        user_id=user_id,
+    )
     stmt = stmt.limit(limit).offset(offset)
 
     result = await db.execute(stmt)
@@ -99,7 +210,9 @@ async def block_user(
 ) -> UserBlocked:
     user_obj = await _get_user_by_id(db, user_id)
     user_obj.is_blocked = True
+    await notify_principal_changed(db, user_id)
     await db.commit()
+    principal_cache.invalidate(user_id)
     return UserBlocked()
 
 async def unblock_user(
@@ -108,7 +221,9 @@ async def unblock_user(
 ) -> UserUnblocked:
     user_obj = await _get_user_by_id(db, user_id)
     user_obj.is_blocked = False
+    await notify_principal_changed(db, user_id)
     await db.commit()
+    principal_cache.invalidate(user_id)
     return UserUnblocked()
 
 async def get_transaction_by_id(db: AsyncSession, transaction_id: UUID) -> Transaction:
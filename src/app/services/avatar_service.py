@@ -0,0 +1,197 @@
+import asyncio
+import functools
+import hashlib
+import io
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor
+from uuid import UUID
+
+from PIL import Image, ImageOps
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.exceptions import AvatarInvalid
+from app.core.config import settings
+from app.persistence.db import AsyncSessionLocal
+from app.persistence.users.users import User
+from app.services.utils.avatar_storage import AvatarStorage, create_avatar_storage
+from app.services.utils.metrics import register_metrics
+from app.services.utils.principal_cache import notify_principal_changed, principal_cache
+
+logger = logging.getLogger(__name__)
+
+# Renditions remembered per worker for deduplication.
+STORED_AVATARS_LIMIT = 1024
+
+
+class AvatarImageError(Exception):
+    """Raised in the worker when the upload is not a usable image."""
+
+
+def render_avatar(content: bytes, sizes: tuple[int, ...], max_pixels: int) -> dict[int, bytes]:
+    """
+    Decodes an upload and renders square WebP avatars of the given sizes.
+    Runs in the avatar worker pool.
+
+    Returns:
+        The encoded image per size.
+    """
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            if image.width * image.height > max_pixels:
+                raise AvatarImageError(f"Image has more than {max_pixels} pixels")
+            image = ImageOps.exif_transpose(image).convert("RGB")
+    except (OSError, Image.DecompressionBombError, SyntaxError) as e:
+        raise AvatarImageError(str(e))
+    side = min(image.size)
+    image = ImageOps.fit(image, (side, side))
+    rendered = {}
+    for size in sizes:
+        buffer = io.BytesIO()
+        image.resize((size, size), Image.Resampling.LANCZOS).save(buffer, format="WEBP", quality=85)
+        rendered[size] = buffer.getvalue()
+    return rendered
+
+
+class AvatarPipeline:
+    """
+    Processes avatar uploads after the request has returned.
+
+    The upload is rendered to AVATAR_SIZES in a process pool, the renditions
+    are saved under keys derived from the content hash and the user's avatar
+    is pointed at the largest one once everything is stored. Uploads with a
+    hash already processed by this worker skip rendering and storage. Only
+    the latest upload of a user is applied, and none after cancel().
+    """
+
+    def __init__(
+        self,
+        storage: AvatarStorage | None = None,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        workers: int | None = None,
+    ):
+        self._storage = storage
+        self._session_factory = session_factory
+        self.workers = settings.AVATAR_WORKERS if workers is None else workers
+        self._executor: Executor | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._latest: dict[UUID, str] = {}
+        self._pending: dict[UUID, asyncio.Task] = {}
+        self._stored: dict[str, str] = {}
+        self.completed = 0
+        self.deduplicated = 0
+        self.failed = 0
+
+    @property
+    def storage(self) -> AvatarStorage:
+        if self._storage is None:
+            self._storage = create_avatar_storage()
+        return self._storage
+
+    def _get_executor(self) -> Executor | None:
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, user_id: UUID, content: bytes) -> str:
+        """
+        Schedules processing of an upload.
+
+        Returns:
+            The content hash identifying the upload.
+        """
+        if len(content) > settings.AVATAR_MAX_BYTES:
+            raise AvatarInvalid(f"Avatar must not exceed {settings.AVATAR_MAX_BYTES} bytes")
+        try:
+            # Only parses the header; decoding happens in the worker pool.
+            Image.open(io.BytesIO(content)).close()
+        except (OSError, SyntaxError):
+            raise AvatarInvalid()
+        content_hash = hashlib.sha256(content).hexdigest()
+        self._latest[user_id] = content_hash
+        task = asyncio.create_task(self._process(user_id, content, content_hash))
+        self._tasks.add(task)
+        self._pending[user_id] = task
+        task.add_done_callback(functools.partial(self._task_done, user_id))
+        return content_hash
+
+    def _task_done(self, user_id: UUID, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if self._pending.get(user_id) is task:
+            del self._pending[user_id]
+
+    def cancel(self, user_id: UUID) -> None:
+        """
+        Drops the user's pending upload, so an upload still rendering is not
+        applied after the avatar was removed.
+        """
+        self._latest.pop(user_id, None)
+        task = self._pending.pop(user_id, None)
+        if task is not None:
+            task.cancel()
+
+    async def _store(self, content: bytes, content_hash: str) -> str:
+        if content_hash in self._stored:
+            self.deduplicated += 1
+            return self._stored[content_hash]
+        sizes = tuple(sorted(settings.AVATAR_SIZES, reverse=True))
+        loop = asyncio.get_running_loop()
+        rendered = await loop.run_in_executor(
+            self._get_executor(), render_avatar, content, sizes, settings.AVATAR_MAX_PIXELS
+        )
+        urls = await asyncio.gather(*(
+            self.storage.save(f"avatars/{content_hash}_{size}", image) for size, image in rendered.items()
+        ))
+        self._stored[content_hash] = urls[0]
+        while len(self._stored) > STORED_AVATARS_LIMIT:
+            del self._stored[next(iter(self._stored))]
+        return urls[0]
+
+    async def _process(self, user_id: UUID, content: bytes, content_hash: str) -> None:
+        try:
+            avatar_url = await self._store(content, content_hash)
+            if self._latest.get(user_id) != content_hash:
+                return
+            async with self._session_factory() as session:
+                await session.execute(update(User).where(User.id == user_id).values(avatar=avatar_url))
+                # Checked again with the row locked: a removal from before
+                # this point is seen here, a later one waits for the commit.
+                if self._latest.get(user_id) != content_hash:
+                    await session.rollback()
+                    return
+                await notify_principal_changed(session, user_id)
+                await session.commit()
+            principal_cache.invalidate(user_id)
+            self.completed += 1
+        except Exception:
+            self.failed += 1
+            logger.exception(f"Processing avatar {content_hash} of user {user_id} failed")
+        finally:
+            if self._latest.get(user_id) == content_hash:
+                del self._latest[user_id]
+
+    async def drain(self) -> None:
+        """Waits for every scheduled upload to finish."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def shutdown(self, timeout: float = 10) -> None:
+        try:
+            await asyncio.wait_for(self.drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {len(self._tasks)} avatar uploads still in progress")
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def metrics_snapshot(self) -> dict:
+        return {
+            "pending": len(self._tasks),
+            "completed": self.completed,
+            "deduplicated": self.deduplicated,
+            "failed": self.failed,
+        }
+
+
+avatar_pipeline = AvatarPipeline()
+register_metrics("avatar_pipeline", avatar_pipeline.metrics_snapshot)
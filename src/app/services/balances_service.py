@@ -1,3 +1,4 @@
+import uuid
 from decimal import Decimal
 from typing import List
 from uuid import UUID
@@ -9,6 +10,8 @@ from app.api.exceptions import BalanceAlreadyExists, BalanceNotFound
 from app.schemas.balance import BalanceResponse
 from app.persistence.balances.balance import Balance
 from .currencies_service import _get_currency_id_by_currency_code
+from .ledger_service import DEPOSIT, OPENING, ledger_entry, post_ledger_entries
+from .utils.transfer_engine import credit_balance
 
 async def _create_balance(
     db: AsyncSession,
@@ -24,6 +27,10 @@ async def _create_balance(
     db.add(balance)
     try:
         await db.flush()
+        if balance.amount:
+            await post_ledger_entries(db, [
+                ledger_entry(balance.id, balance.amount, balance.amount, uuid.uuid4(), entry_type=OPENING)
+            ])
         await db.refresh(balance, attribute_names=["currency"])
         await db.commit()
     except IntegrityError:
@@ -81,7 +88,8 @@ async def update_user_balance(db: AsyncSession,user_id: UUID,amount: Decimal,cur
     balance = await get_balance_by_user_and_currency(db, user_id, currency)
 
     if balance:
-        balance.amount += amount
+        # Atomic increment; also refreshes balance.amount for the ledger entry
+        balance.amount = await credit_balance(db, balance.id, amount)
     else:
         currency_id = await _get_currency_id_by_currency_code(db, currency)
         balance = Balance(
@@ -90,6 +98,10 @@ async def update_user_balance(db: AsyncSession,user_id: UUID,amount: Decimal,cur
             amount=amount
         )
         db.add(balance)
+        await db.flush()
 
+    await post_ledger_entries(db, [
+        ledger_entry(balance.id, amount, balance.amount, uuid.uuid4(), entry_type=DEPOSIT)
+    ])
     await db.commit()
     return balance
\ No newline at end of file
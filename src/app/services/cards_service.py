@@ -1,6 +1,6 @@
 from typing import List
 from uuid import UUID
-from fastapi import HTTPException
+from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,14 +8,21 @@ from sqlalchemy.orm import selectinload
 from app.api.exceptions import CardAlreadyExists, NoCards
 from app.api.success_responses import CardDeleted
 from app.persistence.balances.balance import Balance
-from app.schemas.balance import BalanceCreate
+from app.schemas.balance import BalanceCreate, BalanceLoaded
 from app.services.currencies_service import get_currency_id_by_code
 from .balances_service import _get_balance_ids_by_user_id, _get_balance_id_by_user_id_and_currency_code, _create_balance, update_user_balance
 from datetime import *
 from app.persistence.cards.card import Card
 from app.schemas.card import CardCreate, CardResponse
-import httpx
 from decimal import Decimal
+from uuid import uuid4
+from app.services.idempotency_service import (
+    IdempotentRequest,
+    claim_idempotency_key,
+    complete_idempotency_key,
+    release_idempotency_key,
+)
+from app.services.utils.payment_processor import payment_processor
 
 async def create_card(
     db: AsyncSession,
@@ -121,21 +128,42 @@ async def _card_is_expired(db: AsyncSession, user_id: UUID, card_id: UUID):
         return False
     
 
-async def load_balance_from_card(db: AsyncSession, user_id: UUID, card_number:str, amount: str, currency:str):
-    payload = {
-        "sender": card_number,
-        "number": card_number,
-        "incoming_amount": str(amount),
-        "currency": currency
-    }
-    async with httpx.AsyncClient() as client:
-        response = await client.post("http://localhost:8002/payments/", json=payload)
-
-    if response.status_code == 200 and response.json() is True:
-        await update_user_balance(db, user_id, Decimal(amount), currency)
-        return True
+async def load_balance_from_card(db: AsyncSession, user_id: UUID, card_number:str, amount: str, currency:str, idempotency: IdempotentRequest | None = None):
+    """
+    Charges the card through the payment processor and credits the balance
+    if the payment was approved.
+
+    The client's key is claimed and committed before the card is charged, so
+    a repeated top-up replays the stored response instead of crediting again.
+    The processor gets the key namespaced by its scope, which carries the
+    user, or a new key when the client sent none; it is sent with every
+    attempt so retries never charge twice.
+    """
+    if idempotency:
+        await claim_idempotency_key(db, idempotency)
+        await db.commit()
+        processor_key = f"{idempotency.scope}:{idempotency.key}"
     else:
-        return False
+        processor_key = str(uuid4())
+
+    try:
+        approved = await payment_processor.charge(
+            card_number=card_number,
+            amount=amount,
+            currency=currency,
+            idempotency_key=processor_key,
+        )
+        if not approved:
+            await release_idempotency_key(db, idempotency)
+            return False
+        # Completed in the transaction update_user_balance commits.
+        await complete_idempotency_key(db, idempotency, status.HTTP_200_OK, BalanceLoaded())
+        await update_user_balance(db, user_id, Decimal(amount), currency)
+    except Exception:
+        await db.rollback()
+        await release_idempotency_key(db, idempotency)
+        raise
+    return True
 
 
 async def get_card_by_number(db: AsyncSession, card_number: str) -> Card | None:
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.persistence.categories.categories import Category
 from app.schemas.category import CategoryCreate
 from fastapi import HTTPException
+from app.services.utils.reference_cache import DefaultCategory, notify_reference_data_changed, reference_cache
 
 async def get_all_categories(session: AsyncSession, user_id: uuid.UUID) -> List[Category]:
     result = await session.execute(
@@ -28,6 +29,22 @@ async def get_category_by_name(session: AsyncSession, category_name:str) -> Cate
     result = await session.execute(select(Category).where(Category.name == category_name, Category.is_deleted.is_(False)))
     return result.scalar_one_or_none()
 
+async def get_default_category(session: AsyncSession, category_name: str) -> DefaultCategory | Category | None:
+    """
+    Looks up one of the predefined categories (e.g. "User Transfer"), served
+    from the reference-data cache when it is warm.
+    """
+    category = reference_cache.default_category(category_name)
+    if category:
+        return category
+    result = await session.execute(select(Category).where(
+        Category.name == category_name,
+        Category.is_default.is_(True),
+        Category.user_id.is_(None),
+        Category.is_deleted.is_(False),
+    ))
+    return result.scalars().first()
+
 async def _get_category_id_by_name(session: AsyncSession, category_name:str) -> Category | None:
     result = await session.execute(select(Category).where(Category.name == category_name, Category.is_deleted.is_(False)))
     return result.id
@@ -45,6 +62,8 @@ async def soft_delete_category(session: AsyncSession, category_id: uuid.UUID):
     if category is None:
         raise HTTPException(status_code=404, detail="Category not found")
     category.is_deleted = True
+    if category.is_default:
+        await notify_reference_data_changed(session)
     await session.commit()
     await session.refresh(category)
     return category
@@ -1,7 +1,8 @@
 from typing import List
 from uuid import UUID
 from fastapi import HTTPException
-from sqlalchemy import select, update, or_
+from sqlalchemy import Select, String, any_, bindparam, case, false, func, literal, select, update, or_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.exceptions import UserNotFound, ContactAlreadyExists, ContactNotFound
@@ -9,8 +10,9 @@ from app.api.exceptions import UserNotFound, ContactAlreadyExists, ContactNotFou
 from app.api.success_responses import ContactDeleted
 from app.persistence.contacts.contact import Contact
 from app.persistence.users.users import User
-from app.schemas.contact import ContactResponse
+from app.schemas.contact import ContactImportResponse, ContactResponse, normalize_phone
 from app.services.users_service import _get_user_id_by_username, _get_user_id_by_email, _get_user_id_by_phone
+from app.services.utils.text_search import LIKE_ESCAPE, contains_pattern, prefix_pattern
 
 async def _find_user_id(
     db: AsyncSession,
@@ -107,29 +109,134 @@ async def delete_contact(
     await db.commit()
     return ContactDeleted()
 
-async def search_contact(db: AsyncSession, user_id: UUID, search_by: str):
-    stmt = (
-        select(User)
+def _active_contacts_of(user_id: UUID) -> Select:
+    return (
+        select(User.username)
         .join(Contact, Contact.contact_id == User.id)
         .where(
             Contact.user_id == user_id,
             Contact.is_deleted.is_(False),
-            or_(
-                User.username.ilike(f"%{search_by}%"),
-                User.phone.ilike(f"%{search_by}%"),
-                User.email.ilike(f"%{search_by}%"),
-            )
         )
     )
-    result = await db.execute(stmt)
-    users = result.scalars().all()
-    if not users:
-        raise HTTPException(status_code=404, detail="No contacts found matching this search")
-    
-    contacts = [ContactResponse(
-        username=user.username,
-        phone=user.phone,
-        email=user.email,
-    ) for user in users]
 
+def build_contact_search_query(user_id: UUID, search_by: str, limit: int) -> Select:
+    """
+    Ranks the user's contacts against search_by: exact matches on username,
+    email or phone first, then prefix matches, then substring and fuzzy
+    (pg_trgm similarity) matches by descending similarity.
+    """
+    term = search_by.strip()
+    lowered = term.lower()
+    prefix, contains = prefix_pattern(term), contains_pattern(term)
+    rank = case(
+        (or_(
+            func.lower(User.username) == lowered,
+            func.lower(User.email) == lowered,
+            User.phone == term,
+        ), 0),
+        (or_(
+            User.username.ilike(prefix, escape=LIKE_ESCAPE),
+            User.email.ilike(prefix, escape=LIKE_ESCAPE),
+            User.phone.like(prefix, escape=LIKE_ESCAPE),
+        ), 1),
+        else_=2,
+    )
+    similarity = func.greatest(
+        func.similarity(User.username, term),
+        func.similarity(User.email, term),
+        func.similarity(User.phone, term),
+    )
+    return (
+        _active_contacts_of(user_id)
+        .where(or_(
+            User.username.ilike(contains, escape=LIKE_ESCAPE),
+            User.email.ilike(contains, escape=LIKE_ESCAPE),
+            User.phone.like(contains, escape=LIKE_ESCAPE),
+            User.username.op("%")(term),
+        ))
+        .order_by(rank, similarity.desc(), User.username)
+        .limit(limit)
+    )
+
+async def search_contact(db: AsyncSession, user_id: UUID, search_by: str, limit: int = 20) -> List[ContactResponse]:
+    result = await db.execute(build_contact_search_query(user_id, search_by, limit))
+    contacts = [ContactResponse(username=row.username) for row in result.all()]
+    if not contacts:
+        raise HTTPException(status_code=404, detail="No contacts found matching this search")
     return contacts
+
+async def autocomplete_contacts(db: AsyncSession, user_id: UUID, prefix: str, limit: int = 10) -> List[str]:
+    """
+    Returns usernames of the user's contacts starting with prefix
+    (case-insensitive), alphabetically. Meant for type-ahead, so no match
+    is an empty list rather than an error.
+    """
+    stmt = (
+        _active_contacts_of(user_id)
+        .where(func.lower(User.username).like(prefix_pattern(prefix.strip().lower()), escape=LIKE_ESCAPE))
+        .order_by(func.lower(User.username))
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+async def _match_users(db: AsyncSession, user_id: UUID, column, values: list[str]) -> list:
+    """Returns (id, username, matched value) of the users whose column is one of values."""
+    if not values:
+        return []
+    result = await db.execute(
+        select(User.id, User.username, column.label("value"))
+        .where(column == any_(bindparam(column.key, values, type_=ARRAY(String))), User.id != user_id)
+    )
+    return result.all()
+
+async def import_contacts(
+        db: AsyncSession,
+        user_id: UUID,
+        phones: List[str],
+        emails: List[str],
+) -> ContactImportResponse:
+    """
+    Adds every registered user found in an address book as a contact.
+
+    Phones are normalized like in the user settings. Each field is matched
+    with a single "= ANY(array)" query and all new contacts are written by
+    one INSERT ... SELECT unnest(...) ON CONFLICT DO NOTHING, so the number of
+    round trips does not depend on the size of the address book. Existing
+    contacts, including deleted ones, are left untouched as in create_contact.
+
+    Returns:
+        The contacts that were added and how many address-book entries did
+        and did not match a user.
+    """
+    phones = list(dict.fromkeys(filter(None, map(normalize_phone, phones))))
+    emails = list(dict.fromkeys(emails))
+    rows = [
+        *await _match_users(db, user_id, User.phone, phones),
+        *await _match_users(db, user_id, User.email, emails),
+    ]
+    usernames = {row.id: row.username for row in rows}
+    matched = len({row.value for row in rows})
+
+    added = []
+    if usernames:
+        new_contacts = select(
+            func.gen_random_uuid(),
+            literal(user_id, PG_UUID(as_uuid=True)),
+            func.unnest(bindparam("contact_ids", list(usernames), type_=ARRAY(PG_UUID(as_uuid=True)))),
+            false(),
+        )
+        result = await db.execute(
+            insert(Contact)
+            .from_select(["id", "user_id", "contact_id", "is_deleted"], new_contacts)
+            .on_conflict_do_nothing(index_elements=["user_id", "contact_id"])
+            .returning(Contact.contact_id)
+        )
+        added = sorted(usernames[contact_id] for contact_id in result.scalars().all())
+        await db.commit()
+
+    return ContactImportResponse(
+        added=[ContactResponse(username=username) for username in added],
+        matched=matched,
+        unmatched=len(phones) + len(emails) - matched,
+    )
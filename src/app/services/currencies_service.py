@@ -6,6 +6,7 @@ from app.api.exceptions import CurrencyNotFound
 
 from app.core.enums.enums import AvailableCurrency
 from app.persistence.currencies.currency import Currency
+from app.services.utils.reference_cache import reference_cache
 
 
 async def _get_currency_id_by_currency_code(
@@ -20,7 +21,11 @@ async def _get_currency_id_by_currency_code(
 
     # 2) normalize (strip + lowercase)
     code = code.strip().upper()
-    
+
+    currency_id = reference_cache.currency_id(code)
+    if currency_id:
+        return currency_id
+
     result = await db.execute(
         select(Currency.id)
         .where(Currency.code == code)
@@ -34,6 +39,10 @@ async def _get_currency_code_by_currency_id(
     db: AsyncSession,
     currency_id: UUID
 ) -> UUID:
+    currency_code = reference_cache.currency_code(currency_id)
+    if currency_code:
+        return currency_code
+
     result = await db.execute(
         select(Currency.code)
         .where(Currency.id == currency_id)
@@ -44,5 +53,8 @@ async def _get_currency_code_by_currency_id(
     return currency_code
 
 async def get_currency_id_by_code(db: AsyncSession, code: str) -> UUID | None:
+    currency_id = reference_cache.currency_id(code)
+    if currency_id:
+        return currency_id
     result = await db.execute(select(Currency.id).where(Currency.code == code))
     return result.scalar_one_or_none()
\ No newline at end of file
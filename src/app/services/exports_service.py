@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import Select, or_
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.persistence.db import AsyncReadSessionLocal
+from app.persistence.transactions.transaction import Transaction
+from app.schemas.transaction import AdminTransactionResponse
+from app.schemas.user import UserResponse
+from app.services.admins_service import build_transactions_query
+
+EXPORT_COLUMNS = list(AdminTransactionResponse.model_fields)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def build_export_query(
+    current_user: UserResponse,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    sender_username: str | None = None,
+    receiver_username: str | None = None,
+    direction: str | None = None,
+    user_id: UUID | None = None,
+) -> Select:
+    """
+    Builds the export query with the admin panel filters. Admins can export
+    any user's history; everyone else is limited to transactions they sent
+    or received, and `direction` is applied to their own id.
+    """
+    if not current_user.is_admin:
+        user_id = current_user.id
+    stmt = build_transactions_query(
+        start_date=start_date,
+        end_date=end_date,
+        sender_username=sender_username,
+        receiver_username=receiver_username,
+        direction=direction,
+        user_id=user_id,
+    )
+    if not current_user.is_admin:
+        stmt = stmt.where(or_(Transaction.sender_id == user_id,
+                              Transaction.receiver_id == user_id))
+    return stmt.order_by(Transaction.created_at, Transaction.id)
+
+
+def _csv_chunk(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows([row._mapping[column] for column in EXPORT_COLUMNS] for row in rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows) -> str:
+    return "".join(
+        json.dumps({column: row._mapping[column] for column in EXPORT_COLUMNS}, default=str) + "\n"
+        for row in rows
+    )
+
+
+async def stream_transactions_export(
+    stmt: Select,
+    export_format: str,
+    session_factory: async_sessionmaker = AsyncReadSessionLocal,
+    yield_per: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yields the export body chunk by chunk.
+
+    The rows are read through a server-side cursor (AsyncSession.stream with
+    yield_per), so only one partition is held in memory no matter how many
+    rows match. The generator opens its own session because it runs after
+    the request dependencies have been torn down.
+
+    Args:
+        stmt: Query built by build_export_query.
+        export_format: "csv" or "ndjson".
+        session_factory: Factory for the streaming session.
+        yield_per: Rows fetched per round trip, defaults to EXPORT_YIELD_PER.
+    """
+    yield_per = yield_per or settings.EXPORT_YIELD_PER
+    if export_format == "csv":
+        yield _csv_chunk([], header=True).encode("utf-8")
+    async with session_factory() as session:
+        result = await session.stream(stmt.execution_options(yield_per=yield_per))
+        async for rows in result.partitions():
+            if export_format == "csv":
+                yield _csv_chunk(rows).encode("utf-8")
+            else:
+                yield _ndjson_chunk(rows).encode("utf-8")
@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.exceptions import IdempotencyKeyMismatch, IdempotencyRequestInProgress, IdempotentReplay
+from app.core.config import settings
+from app.persistence.db import AsyncSessionLocal
+from app.persistence.idempotency_keys.idempotency_key import IdempotencyKey
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+
+@dataclass(frozen=True)
+class IdempotentRequest:
+    scope: str
+    key: str
+    request_hash: str
+
+
+def idempotent_request(scope: str, key: str | None, payload: BaseModel) -> IdempotentRequest | None:
+    """
+    Builds the idempotency context of a request, or None when the client did
+    not send an Idempotency-Key header.
+    """
+    if not key:
+        return None
+    request_hash = hashlib.sha256(payload.model_dump_json().encode("utf-8")).hexdigest()
+    return IdempotentRequest(scope=scope, key=key, request_hash=request_hash)
+
+
+async def claim_idempotency_key(db: AsyncSession, request: IdempotentRequest | None) -> None:
+    """
+    Claims the key inside the caller's open transaction, before any money moves.
+
+    The INSERT ... ON CONFLICT takes the unique index entry, so a concurrent
+    duplicate blocks on it until the first transaction commits or rolls back,
+    instead of running the transfer a second time. Expired keys are reclaimed.
+
+    Raises:
+        IdempotentReplay: The key already completed; carries the stored response.
+        IdempotencyKeyMismatch: The key was used for a different payload.
+        IdempotencyRequestInProgress: The first request did not finish within
+                                      IDEMPOTENCY_WAIT_SECONDS.
+    """
+    if request is None:
+        return
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+    stmt = insert(IdempotencyKey).values(
+        scope=request.scope,
+        key=request.key,
+        request_hash=request.request_hash,
+        status=IN_PROGRESS,
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uix_idempotency_scope_key",
+        set_={
+            "request_hash": stmt.excluded.request_hash,
+            "status": IN_PROGRESS,
+            "response_code": None,
+            "response_body": None,
+            "created_at": func.now(),
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=IdempotencyKey.expires_at < func.now(),
+    ).returning(IdempotencyKey.id)
+    result = await db.execute(stmt)
+    if result.scalar_one_or_none() is not None:
+        return
+
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        result = await db.execute(
+            select(IdempotencyKey.request_hash, IdempotencyKey.status,
+                   IdempotencyKey.response_code, IdempotencyKey.response_body)
+            .where(IdempotencyKey.scope == request.scope, IdempotencyKey.key == request.key)
+        )
+        stored = result.one()
+        if stored.request_hash != request.request_hash:
+            raise IdempotencyKeyMismatch()
+        if stored.status == COMPLETED:
+            raise IdempotentReplay(stored.response_code, stored.response_body)
+        # The first request committed part of its work and is still running.
+        if time.monotonic() >= deadline:
+            raise IdempotencyRequestInProgress()
+        await asyncio.sleep(settings.IDEMPOTENCY_POLL_INTERVAL_SECONDS)
+
+
+async def complete_idempotency_key(
+    db: AsyncSession,
+    request: IdempotentRequest | None,
+    status_code: int,
+    response: BaseModel,
+) -> None:
+    """
+    Stores the response in the caller's transaction, so it is committed
+    together with the transfer it describes.
+    """
+    if request is None:
+        return
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.scope == request.scope, IdempotencyKey.key == request.key)
+        .values(status=COMPLETED, response_code=status_code, response_body=jsonable_encoder(response))
+    )
+
+
+async def release_idempotency_key(db: AsyncSession, request: IdempotentRequest | None) -> None:
+    """
+    Drops an unfinished key after a failed request so the client can retry it.
+    Only needed when the failed request committed part of its work.
+    """
+    if request is None:
+        return
+    await db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.scope == request.scope,
+            IdempotencyKey.key == request.key,
+            IdempotencyKey.status == IN_PROGRESS,
+        )
+    )
+    await db.commit()
+
+
+async def purge_expired_idempotency_keys(db: AsyncSession, batch_size: int | None = None) -> int:
+    """
+    Deletes expired keys in batches, committing after each one so the purge
+    never holds many row locks at once.
+
+    Returns:
+        Number of deleted keys.
+    """
+    batch_size = batch_size or settings.IDEMPOTENCY_PURGE_BATCH_SIZE
+    purged = 0
+    while True:
+        expired = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at < func.now())
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired)))
+        await db.commit()
+        purged += result.rowcount
+        if result.rowcount < batch_size:
+            return purged
+
+
+async def run_idempotency_purge() -> None:
+    async with AsyncSessionLocal() as session:
+        await purge_expired_idempotency_keys(session)
@@ -0,0 +1,123 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import func, insert as sa_insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.persistence.balance_snapshots.balance_snapshot import BalanceSnapshot
+from app.persistence.db import AsyncSessionLocal
+from app.persistence.ledger_entries.ledger_entry import LedgerEntry
+
+TRANSFER = "transfer"
+DEPOSIT = "deposit"
+OPENING = "opening"
+
+
+def ledger_entry(
+    balance_id: UUID,
+    amount: Decimal,
+    balance_after: Decimal,
+    entry_group_id: UUID,
+    transaction_id: UUID | None = None,
+    entry_type: str = TRANSFER,
+) -> dict:
+    return dict(
+        entry_group_id=entry_group_id,
+        transaction_id=transaction_id,
+        balance_id=balance_id,
+        amount=amount,
+        balance_after=balance_after,
+        entry_type=entry_type,
+    )
+
+
+async def post_ledger_entries(db: AsyncSession, entries: list[dict]) -> None:
+    """
+    Appends entries inside the caller's transaction. Callers write them right
+    after the balance update they describe, while the balance row is locked.
+    """
+    if entries:
+        await db.execute(sa_insert(LedgerEntry), entries)
+
+
+async def post_transfer(
+    db: AsyncSession,
+    sender_balance_id: UUID,
+    receiver_balance_id: UUID,
+    amount: Decimal,
+    sender_amount: Decimal,
+    receiver_amount: Decimal,
+    transaction_id: UUID | None = None,
+) -> None:
+    entry_group_id = transaction_id or uuid.uuid4()
+    await post_ledger_entries(db, [
+        ledger_entry(sender_balance_id, -amount, sender_amount, entry_group_id, transaction_id),
+        ledger_entry(receiver_balance_id, amount, receiver_amount, entry_group_id, transaction_id),
+    ])
+
+
+async def take_balance_snapshots(db: AsyncSession, taken_at: datetime | None = None) -> int:
+    """
+    Snapshots every balance that moved since the previous snapshot run, using
+    the balance_after of its latest ledger entry. Balances without movement
+    keep their previous snapshot, which is still exact.
+
+    taken_at defaults to BALANCE_SNAPSHOT_SETTLE_SECONDS ago, so entries of
+    transactions still in flight are not cut off.
+
+    Returns:
+        Number of snapshots written.
+    """
+    taken_at = taken_at or datetime.now(timezone.utc) - timedelta(seconds=settings.BALANCE_SNAPSHOT_SETTLE_SECONDS)
+    since = (await db.execute(select(func.max(BalanceSnapshot.taken_at)))).scalar_one_or_none()
+
+    latest = (
+        select(
+            func.gen_random_uuid(),
+            LedgerEntry.balance_id,
+            literal(taken_at, BalanceSnapshot.taken_at.type),
+            LedgerEntry.balance_after,
+        )
+        .where(LedgerEntry.created_at <= taken_at)
+        .distinct(LedgerEntry.balance_id)
+        .order_by(LedgerEntry.balance_id, LedgerEntry.id.desc())
+    )
+    if since is not None:
+        latest = latest.where(LedgerEntry.created_at > since)
+
+    result = await db.execute(
+        sa_insert(BalanceSnapshot).from_select(["id", "balance_id", "taken_at", "amount"], latest)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def get_balance_as_of(db: AsyncSession, balance_id: UUID, as_of: datetime) -> Decimal:
+    """
+    Returns the amount of a balance at `as_of`: the nearest snapshot taken at
+    or before that time plus the ledger entries written after it.
+    """
+    snapshot = (await db.execute(
+        select(BalanceSnapshot.taken_at, BalanceSnapshot.amount)
+        .where(BalanceSnapshot.balance_id == balance_id, BalanceSnapshot.taken_at <= as_of)
+        .order_by(BalanceSnapshot.taken_at.desc())
+        .limit(1)
+    )).one_or_none()
+
+    tail = select(func.coalesce(func.sum(LedgerEntry.amount), 0)).where(
+        LedgerEntry.balance_id == balance_id,
+        LedgerEntry.created_at <= as_of,
+    )
+    if snapshot is not None:
+        tail = tail.where(LedgerEntry.created_at > snapshot.taken_at)
+    tail_amount = (await db.execute(tail)).scalar_one()
+
+    return (snapshot.amount if snapshot is not None else Decimal("0")) + tail_amount
+
+
+async def run_balance_snapshots() -> None:
+    async with AsyncSessionLocal() as session:
+        await take_balance_snapshots(session)
@@ -0,0 +1,125 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.persistence.db import AsyncSessionLocal
+from app.persistence.mail_outbox.mail_outbox_message import MailOutboxMessage
+from app.services.utils.mail.mail_model import ActivationMailMessage, ActivationMessagesList
+from app.services.utils.mail.sendmail import MailDeliveryError, MailjetSender, mail_sender
+from app.services.utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+# Mailjet's Send API v3.1 accepts at most 50 messages per call.
+MAILJET_MAX_MESSAGES = 50
+
+_dispatch_stats = {"sent": 0, "retried": 0, "failed": 0}
+
+
+def enqueue_activation_mail(session: AsyncSession, to_email: str, to_username: str, to_user_id: str) -> MailOutboxMessage:
+    """
+    Queues an activation mail in the caller's transaction. It is sent by the
+    dispatcher only if that transaction commits.
+    """
+    message = ActivationMailMessage.fill_data(to_email=to_email, to_username=to_username, to_user_id=to_user_id)
+    outbox_message = MailOutboxMessage(kind="activation", payload=message.model_dump(mode="json"))
+    session.add(outbox_message)
+    return outbox_message
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    seconds = settings.MAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.MAIL_OUTBOX_RETRY_MAX_SECONDS))
+
+
+def _record_failure(message: MailOutboxMessage, error: str, now: datetime) -> None:
+    message.attempts += 1
+    message.last_error = error
+    if message.attempts >= settings.MAIL_OUTBOX_MAX_ATTEMPTS:
+        message.status = FAILED
+        _dispatch_stats["failed"] += 1
+        logger.error(f"Giving up on mail {message.id} after {message.attempts} attempts: {error}")
+    else:
+        message.next_attempt_at = now + _retry_delay(message.attempts)
+        _dispatch_stats["retried"] += 1
+
+
+async def dispatch_mail_outbox(db: AsyncSession, sender: MailjetSender, batch_size: int | None = None) -> int:
+    """
+    Sends one batch of due messages in a single Mailjet call.
+
+    The batch is locked with FOR UPDATE SKIP LOCKED until the outcome is
+    committed, so concurrent dispatchers never send the same message twice.
+    Messages Mailjet rejects, or whole batches that fail in transport, are
+    retried with exponential backoff until MAIL_OUTBOX_MAX_ATTEMPTS.
+
+    Returns:
+        Number of messages taken from the outbox.
+    """
+    batch_size = min(batch_size or settings.MAIL_OUTBOX_BATCH_SIZE, MAILJET_MAX_MESSAGES)
+    result = await db.execute(
+        select(MailOutboxMessage)
+        .where(MailOutboxMessage.status == PENDING, MailOutboxMessage.next_attempt_at <= datetime.now(timezone.utc))
+        .order_by(MailOutboxMessage.next_attempt_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    taken = list(result.scalars().all())
+    if not taken:
+        await db.commit()
+        return 0
+
+    now = datetime.now(timezone.utc)
+    batch, mails = [], []
+    for message in taken:
+        try:
+            mails.append(ActivationMailMessage.model_validate(message.payload))
+            batch.append(message)
+        except ValidationError as e:
+            message.attempts += 1
+            message.status = FAILED
+            message.last_error = str(e)
+            _dispatch_stats["failed"] += 1
+    if not batch:
+        await db.commit()
+        return len(taken)
+
+    messages = ActivationMessagesList(Messages=mails)
+    try:
+        errors = await sender.send(messages)
+    except MailDeliveryError as e:
+        logger.warning(f"Mail batch of {len(batch)} failed: {e}")
+        errors = [str(e)] * len(batch)
+
+    for message, error in zip(batch, errors):
+        if error is None:
+            message.status = SENT
+            message.sent_at = now
+            message.attempts += 1
+            _dispatch_stats["sent"] += 1
+        else:
+            _record_failure(message, error, now)
+    await db.commit()
+    return len(taken)
+
+
+async def run_mail_dispatcher(sender: MailjetSender = mail_sender) -> None:
+    """
+    Drains the due messages batch by batch; run periodically by the
+    application's background jobs.
+    """
+    batch_size = min(settings.MAIL_OUTBOX_BATCH_SIZE, MAILJET_MAX_MESSAGES)
+    async with AsyncSessionLocal() as session:
+        while await dispatch_mail_outbox(session, sender, batch_size) == batch_size:
+            pass
+
+
+register_metrics("mail_outbox", lambda: dict(_dispatch_stats))
@@ -0,0 +1,215 @@
+import calendar
+import uuid
+from dataclasses import dataclass
+from datetime import date, timedelta
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.exceptions import InsufficientFunds
+from app.core.enums.enums import IntervalType, TransactionType
+from app.persistence.balances.balance import Balance
+from app.persistence.recurring_transactions.recurring_transaction import RecurringTransaction
+from app.persistence.transactions.transaction import Transaction
+from app.services.categories_service import get_default_category
+from app.services.spending_rollups_service import record_spending
+from app.services.utils.transfer_engine import ensure_balance, lock_balances, move_funds, run_with_retries
+
+
+@dataclass
+class RecurringBatchResult:
+    claimed: int = 0
+    executed: int = 0
+    failed: int = 0
+    oldest_due_date: date | None = None
+
+
+def _add_months(value: date, months: int) -> date:
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def _months_between(start: date, value: date) -> int:
+    return (value.year - start.year) * 12 + value.month - start.month
+
+
+def advance_execution_date(value: date, interval_type: IntervalType, start_date: date | None = None) -> date:
+    """
+    Returns the occurrence after `value`.
+
+    Monthly and yearly occurrences are counted from start_date and only the
+    result is clamped to the length of its month, so a schedule started on
+    Jan 31 runs on Feb 28 and then on Mar 31 again instead of drifting to
+    the 28th. Without start_date, `value` is the start.
+    """
+    start_date = start_date or value
+    if interval_type == IntervalType.DAILY:
+        return value + timedelta(days=1)
+    if interval_type == IntervalType.WEEKLY:
+        return value + timedelta(weeks=1)
+    if interval_type == IntervalType.MONTHLY:
+        return _add_months(start_date, _months_between(start_date, value) + 1)
+    return _add_months(start_date, 12 * (value.year - start_date.year + 1))
+
+
+def due_run_dates(
+    recurring: RecurringTransaction,
+    as_of: date,
+    catch_up: bool,
+    max_runs: int,
+) -> tuple[list[date], date]:
+    """
+    Returns the occurrences to execute now and the next execution date.
+
+    With catch_up every missed occurrence is executed, at most `max_runs` per
+    call; the remaining ones stay due and are picked up by the next batch.
+    Without it only the latest missed occurrence is executed and the rest are
+    skipped.
+    """
+    run_dates = []
+    next_date = recurring.next_execution_date
+    while next_date <= as_of and (not catch_up or len(run_dates) < max_runs):
+        run_dates.append(next_date)
+        next_date = advance_execution_date(next_date, recurring.interval_type, recurring.start_date)
+    if not catch_up:
+        run_dates = run_dates[-1:]
+    return run_dates, next_date
+
+
+async def claim_due_recurring_transactions(
+    db: AsyncSession,
+    as_of: date,
+    batch_size: int,
+) -> list[RecurringTransaction]:
+    """
+    Locks up to `batch_size` due templates. Rows already claimed by another
+    executor are skipped (FOR UPDATE SKIP LOCKED), so several replicas can
+    drain the table concurrently without executing a template twice.
+    """
+    result = await db.execute(
+        select(RecurringTransaction)
+        .where(
+            RecurringTransaction.is_active.is_(True),
+            RecurringTransaction.next_execution_date <= as_of,
+        )
+        .order_by(RecurringTransaction.next_execution_date, RecurringTransaction.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return list(result.scalars().all())
+
+
+async def _lock_batch_balances(
+    db: AsyncSession,
+    claimed: list[RecurringTransaction],
+) -> dict[tuple[UUID, UUID], UUID]:
+    """
+    Resolves the sender and receiver balances of the whole batch and locks
+    them up front with lock_balances, in the ascending id order every
+    transfer writes in. The runs then only write rows the batch already
+    holds, so the batch cannot deadlock with live transfers.
+
+    Returns:
+        Balance ids keyed by (user_id, currency_id). A sender without a
+        balance in the template's currency is missing.
+    """
+    senders = {(recurring.sender_id, recurring.currency_id) for recurring in claimed}
+    receivers = {(recurring.receiver_id, recurring.currency_id) for recurring in claimed}
+    result = await db.execute(
+        select(Balance.id, Balance.user_id, Balance.currency_id)
+        .where(tuple_(Balance.user_id, Balance.currency_id).in_(list(senders)))
+    )
+    balance_ids = {(row.user_id, row.currency_id): row.id for row in result}
+    for user_id, currency_id in sorted(receivers - balance_ids.keys()):
+        balance_ids[(user_id, currency_id)] = await ensure_balance(db, user_id, currency_id)
+    await lock_balances(db, balance_ids.values())
+    return balance_ids
+
+
+async def _execute_run(
+    db: AsyncSession,
+    recurring: RecurringTransaction,
+    run_date: date,
+    category_id: UUID,
+    balance_ids: dict[tuple[UUID, UUID], UUID],
+) -> bool:
+    status = "completed"
+    transaction_id = uuid.uuid4()
+    try:
+        async with db.begin_nested():
+            sender_balance_id = balance_ids.get((recurring.sender_id, recurring.currency_id))
+            if not sender_balance_id:
+                raise InsufficientFunds("No balance in this currency")
+            receiver_balance_id = balance_ids[(recurring.receiver_id, recurring.currency_id)]
+            await move_funds(db, sender_balance_id, receiver_balance_id, recurring.amount, transaction_id)
+    except InsufficientFunds:
+        status = "failed"
+
+    transaction = Transaction(
+        id=transaction_id,
+        sender_id=recurring.sender_id,
+        receiver_id=recurring.receiver_id,
+        currency_id=recurring.currency_id,
+        category_id=category_id,
+        amount=recurring.amount,
+        status=status,
+        is_recurring=True,
+        created_date=run_date,
+        description=recurring.description,
+        transaction_type=TransactionType.USER_TO_ANOTHER_USER,
+        is_internal_transfer=False,
+    )
+    db.add(transaction)
+    await record_spending(db, [transaction])
+    return status == "completed"
+
+
+async def execute_due_recurring_transactions(
+    db: AsyncSession,
+    as_of: date,
+    batch_size: int,
+    catch_up: bool,
+    max_catch_up_runs: int,
+) -> RecurringBatchResult:
+    """
+    Claims one batch of due templates, creates a Transaction for every
+    occurrence that is executed and advances next_execution_date. The batch
+    is committed as one unit; a run that lacks funds is recorded with the
+    status "failed" and does not block the rest of the batch.
+
+    The batch locks all of its balances before moving any funds and is
+    retried from the claim on a serialization failure or a deadlock.
+    """
+    async def _execute_batch() -> RecurringBatchResult:
+        claimed = await claim_due_recurring_transactions(db, as_of, batch_size)
+        batch = RecurringBatchResult(claimed=len(claimed))
+        if not claimed:
+            await db.commit()
+            return batch
+        batch.oldest_due_date = claimed[0].next_execution_date
+
+        category = await get_default_category(db, "User Transfer")
+        if not category:
+            raise HTTPException(status_code=500, detail="Default category for user transfers not found")
+
+        balance_ids = await _lock_batch_balances(db, claimed)
+        for recurring in claimed:
+            run_dates, next_date = due_run_dates(recurring, as_of, catch_up, max_catch_up_runs)
+            for run_date in run_dates:
+                if await _execute_run(db, recurring, run_date, category.id, balance_ids):
+                    batch.executed += 1
+                else:
+                    batch.failed += 1
+            if run_dates:
+                recurring.last_run_date = run_dates[-1]
+            recurring.next_execution_date = next_date
+
+        await db.commit()
+        return batch
+
+    return await run_with_retries(db, _execute_batch)
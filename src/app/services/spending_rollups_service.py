@@ -0,0 +1,156 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import Date, cast, delete, func, insert as sa_insert, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.persistence.balances.balance import Balance
+from app.persistence.categories.categories import Category
+from app.persistence.currencies.currency import Currency
+from app.persistence.spending_rollups.spending_rollup import SpendingRollup
+from app.persistence.transactions.transaction import Transaction
+from app.persistence.users.users import User
+from app.schemas.analytics import SpendingRollupResponse
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _counts_as_spending(transaction: Transaction) -> bool:
+    return (
+        transaction.status == "completed"
+        and not transaction.is_internal_transfer
+        and transaction.category_id is not None
+    )
+
+
+async def record_spending(db: AsyncSession, transactions: Iterable[Transaction]) -> None:
+    """
+    Adds completed transactions to the sender's monthly rollups inside the
+    caller's transaction, with one INSERT ... ON CONFLICT DO UPDATE.
+
+    Rows are written in key order so that concurrent transfers touching the
+    same rollups lock them in the same order. Transfers between a user's own
+    cards are not spending and are skipped.
+    """
+    totals: dict[tuple, list] = defaultdict(lambda: [Decimal("0"), 0])
+    for transaction in transactions:
+        if not _counts_as_spending(transaction):
+            continue
+        key = (transaction.sender_id, month_start(transaction.created_date),
+               transaction.category_id, transaction.currency_id)
+        totals[key][0] += transaction.amount
+        totals[key][1] += 1
+    if not totals:
+        return
+
+    stmt = insert(SpendingRollup).values([
+        dict(user_id=user_id, month=month, category_id=category_id, currency_id=currency_id,
+             amount=amount, transaction_count=count)
+        for (user_id, month, category_id, currency_id), (amount, count)
+        in sorted(totals.items(), key=lambda item: tuple(map(str, item[0])))
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        constraint="uix_spending_rollup_key",
+        set_={
+            "amount": SpendingRollup.amount + stmt.excluded.amount,
+            "transaction_count": SpendingRollup.transaction_count + stmt.excluded.transaction_count,
+            "updated_at": func.now(),
+        },
+    ))
+
+
+async def read_spending_rollups(
+    db: AsyncSession,
+    user_id: UUID,
+    start_month: date | None = None,
+    end_month: date | None = None,
+    currency_id: UUID | None = None,
+) -> list[SpendingRollupResponse]:
+    """
+    Returns the user's spending per month and category. The cost depends on
+    months x categories, not on the number of transactions.
+    """
+    stmt = (
+        select(
+            SpendingRollup.month,
+            SpendingRollup.category_id,
+            Category.name.label("category_name"),
+            Currency.code.label("currency_code"),
+            SpendingRollup.amount,
+            SpendingRollup.transaction_count,
+        )
+        .join(Category, SpendingRollup.category_id == Category.id)
+        .join(Currency, SpendingRollup.currency_id == Currency.id)
+        .where(SpendingRollup.user_id == user_id)
+        .order_by(SpendingRollup.month, Category.name)
+    )
+    if start_month:
+        stmt = stmt.where(SpendingRollup.month >= month_start(start_month))
+    if end_month:
+        stmt = stmt.where(SpendingRollup.month <= month_start(end_month))
+    if currency_id:
+        stmt = stmt.where(SpendingRollup.currency_id == currency_id)
+    result = await db.execute(stmt)
+    return [SpendingRollupResponse(**row._mapping) for row in result]
+
+
+async def rebuild_spending_rollups(db: AsyncSession, chunk_size: int | None = None) -> int:
+    """
+    Recomputes all rollups from `transactions`, one chunk of users per
+    database transaction.
+
+    Each chunk first share-locks the users' balances. Every transfer debits
+    the sender's balance, so in-flight transfers of the chunk finish before
+    the recount and new ones wait for it to commit; the rebuild is safe to
+    run under live traffic.
+
+    Returns:
+        Number of users processed.
+    """
+    chunk_size = chunk_size or settings.SPENDING_ROLLUP_REBUILD_CHUNK_SIZE
+    month = cast(func.date_trunc("month", Transaction.created_date), Date)
+    processed = 0
+    last_user_id = None
+    while True:
+        stmt = select(User.id).order_by(User.id).limit(chunk_size)
+        if last_user_id is not None:
+            stmt = stmt.where(User.id > last_user_id)
+        user_ids = (await db.execute(stmt)).scalars().all()
+        if not user_ids:
+            return processed
+
+        await db.execute(
+            select(Balance.id).where(Balance.user_id.in_(user_ids)).order_by(Balance.id).with_for_update(read=True)
+        )
+        await db.execute(delete(SpendingRollup).where(SpendingRollup.user_id.in_(user_ids)))
+        await db.execute(
+            sa_insert(SpendingRollup).from_select(
+                ["id", "user_id", "month", "category_id", "currency_id", "amount", "transaction_count"],
+                select(
+                    func.gen_random_uuid(),
+                    Transaction.sender_id,
+                    month,
+                    Transaction.category_id,
+                    Transaction.currency_id,
+                    func.sum(Transaction.amount),
+                    func.count(),
+                )
+                .where(
+                    Transaction.sender_id.in_(user_ids),
+                    Transaction.status == "completed",
+                    Transaction.is_internal_transfer.is_not(True),
+                    Transaction.category_id.is_not(None),
+                )
+                .group_by(Transaction.sender_id, month, Transaction.category_id, Transaction.currency_id),
+            )
+        )
+        await db.commit()
+        processed += len(user_ids)
+        last_user_id = user_ids[-1]
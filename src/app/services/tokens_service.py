@@ -1,15 +1,25 @@
+import logging
+
+from app.api.exceptions import UserUnauthorized
+from app.core.config import settings
+from app.persistence.db import AsyncSessionLocal
+from app.persistence.refresh_tokens.refresh_token import RefreshToken
 from app.persistence.users.users import User
 from app.schemas.user import UserLogin
 from app.schemas.token import TokenCollection
-from app.services.utils.token_functions import create_tokens
+from app.services.utils.token_functions import create_tokens, decode_refresh_token
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.services.utils.security import verify_password
+from sqlalchemy import delete, func, select, update
+from app.services.utils.security import password_hasher
 from app.services.utils.processors import process_db_transaction
+from app.services.utils.rate_limiter import login_throttle
+
+logger = logging.getLogger(__name__)
 
-async def login_user(session:AsyncSession,usr:UserLogin)->TokenCollection|bool:
+async def login_user(session:AsyncSession,usr:UserLogin,client_ip:str|None=None)->TokenCollection|bool:
     if not usr.username or not usr.password:
         return False
+    await login_throttle.check(usr.username, client_ip)
     async def _login():
         statement = select(User).where(User.username==usr.username)
         result = await session.execute(statement)
@@ -18,11 +28,97 @@ async def login_user(session:AsyncSession,usr:UserLogin)->TokenCollection|bool:
         if not user_object:
             return False
 
-        if not verify_password(usr.password,user_object.password):
+        if not await password_hasher.verify(usr.password,user_object.password):
             return False
 
-        return await create_tokens(user_object.id,user_object.is_admin)
+        if password_hasher.needs_rehash(user_object.password):
+            new_password_hash = await password_hasher.hash(usr.password)
+            await session.execute(update(User).where(
+                User.id == user_object.id,
+                User.password == user_object.password,
+            ).values(password=new_password_hash))
+            await session.commit()
+            password_hasher.rehashed += 1
+
+        await login_throttle.reset_username(usr.username)
+        tokens = await create_tokens(user_object.id,user_object.is_admin,session)
+        await session.commit()
+        return tokens
 
     return await process_db_transaction(
         session=session,transaction_func=_login
     )
+
+async def refresh_user_tokens(session:AsyncSession,refresh_token:str|None)->TokenCollection:
+    """
+    Exchanges a refresh token for a new access and refresh token pair.
+
+    The token is marked used with a single conditional UPDATE, so of two
+    concurrent exchanges only one succeeds. Presenting a token that was
+    already used means it leaked: the whole family is revoked and the user
+    has to log in again. No password hashing is involved.
+
+    Raises:
+        UserUnauthorized: If the token is invalid, expired, already used or
+        its user no longer exists.
+    """
+    token_payload = await decode_refresh_token(refresh_token) if refresh_token else False
+    if not token_payload:
+        raise UserUnauthorized()
+
+    result = await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == token_payload["jti"],
+            RefreshToken.used_at.is_(None),
+            RefreshToken.expires_at > func.now(),
+        )
+        .values(used_at=func.now())
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+    )
+    exchanged = result.one_or_none()
+    if exchanged is None:
+        await session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == token_payload["fam"], RefreshToken.used_at.is_(None))
+            .values(used_at=func.now())
+        )
+        await session.commit()
+        logger.warning(f"Refresh token reuse detected, revoked token family {token_payload['fam']}")
+        raise UserUnauthorized()
+
+    user_id, family_id = exchanged
+    is_admin = (await session.execute(select(User.is_admin).where(User.id == user_id))).scalar_one_or_none()
+    if is_admin is None:
+        await session.rollback()
+        raise UserUnauthorized()
+
+    tokens = await create_tokens(user_id, is_admin, session, family_id=family_id)
+    await session.commit()
+    return tokens
+
+async def purge_expired_refresh_tokens(db:AsyncSession,batch_size:int|None=None)->int:
+    """
+    Deletes expired refresh tokens in batches, committing after each one.
+
+    Returns:
+        Number of deleted tokens.
+    """
+    batch_size = batch_size or settings.REFRESH_TOKEN_PURGE_BATCH_SIZE
+    purged = 0
+    while True:
+        expired = (
+            select(RefreshToken.jti)
+            .where(RefreshToken.expires_at < func.now())
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await db.execute(delete(RefreshToken).where(RefreshToken.jti.in_(expired)))
+        await db.commit()
+        purged += result.rowcount
+        if result.rowcount < batch_size:
+            return purged
+
+async def run_refresh_token_purge() -> None:
+    async with AsyncSessionLocal() as session:
+        await purge_expired_refresh_tokens(session)
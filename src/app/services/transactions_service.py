@@ -1,31 +1,71 @@
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import NoResultFound
-from fastapi import HTTPException
-from sqlalchemy import asc, desc, select, func
+from fastapi import HTTPException, status
+from sqlalchemy import asc, desc, insert, select, func
+from app.persistence.cards.card import Card
 from app.persistence.categories.categories import Category
 from app.persistence.contacts.contact import Contact
 from app.persistence.transactions.transaction import Transaction
 from app.persistence.recurring_transactions.recurring_transaction import RecurringTransaction
 from app.persistence.balances.balance import Balance
 from app.persistence.users.users import User
-from app.schemas.transaction import TransactionCreate
+from app.schemas.transaction import (
+    BatchTransferItemResult,
+    BatchTransferResponse,
+    CardToCardTransactionIn,
+    CardToCardTransactionOut,
+    TransactionCreate,
+    TransactionResponse,
+)
 from app.services.cards_service import get_card_by_number
 from app.services.currencies_service import get_currency_id_by_code
 from app.services.users_service import *
 from app.schemas.category import CategoryCreate
-from app.services.categories_service import _get_category_id_by_name, create_category, get_category_by_name
+from app.services.categories_service import _get_category_id_by_name, create_category, get_category_by_name, get_default_category
 from app.core.enums.enums import IntervalType, TransactionType
 from app.services.categories_service import create_category
 
 from uuid import UUID
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 
 from app.services.users_service import _get_user_by_id
+from app.services.utils.transfer_engine import (
+    apply_balance_deltas,
+    ensure_balance,
+    lock_balances,
+    move_funds,
+    run_with_retries,
+)
+from app.api.exceptions import InsufficientFunds
+from app.services.idempotency_service import (
+    IdempotentRequest,
+    claim_idempotency_key,
+    complete_idempotency_key,
+    release_idempotency_key,
+)
+from app.services.ledger_service import ledger_entry, post_ledger_entries
+from app.services.spending_rollups_service import record_spending
+from app.services.utils.pagination import decode_cursor, encode_cursor, estimate_row_count, keyset_paginate
+
+
+async def create_user_to_user_transaction(db: AsyncSession, sender_id: UUID, transaction_data: TransactionCreate, idempotency: IdempotentRequest | None = None):
+    if idempotency is None:
+        return await _create_user_to_user_transaction(db, sender_id, transaction_data)
+
+    # Creating a new category commits early, so a failure after that point
+    # has to drop the already committed key explicitly.
+    await claim_idempotency_key(db, idempotency)
+    try:
+        return await _create_user_to_user_transaction(db, sender_id, transaction_data, idempotency)
+    except Exception:
+        await db.rollback()
+        await release_idempotency_key(db, idempotency)
+        raise
 
 
-async def create_user_to_user_transaction(db: AsyncSession, sender_id: UUID, transaction_data: TransactionCreate):
+async def _create_user_to_user_transaction(db: AsyncSession, sender_id: UUID, transaction_data: TransactionCreate, idempotency: IdempotentRequest | None = None):
     sender = await _get_user_by_id(db, sender_id)
     if not sender.is_activated:
         raise HTTPException(403, "Sender account is not activated")
@@ -87,9 +127,9 @@ async def create_user_to_user_transaction(db: AsyncSession, sender_id: UUID, tra
         if not category:
             category_create = CategoryCreate(name=transaction_data.category_name, user_id=sender_id)
             category = await create_category(db, sender_id, category_create)
-            category_id = category.id
     else:
         raise HTTPException(400, "Category must be specified by id or name")
+    category_id = category.id
 
     if transaction_data.is_recurring:
         if not transaction_data.interval_days or not transaction_data.next_run_date:
@@ -123,6 +163,10 @@ async def create_user_to_user_transaction(db: AsyncSession, sender_id: UUID, tra
     )
 
     db.add(transaction)
+    if idempotency:
+        await db.flush()
+        await complete_idempotency_key(db, idempotency, status.HTTP_201_CREATED,
+                                       TransactionResponse.model_validate(transaction, from_attributes=True))
     await db.commit()
     await db.refresh(transaction)
 
@@ -130,47 +174,37 @@ async def create_user_to_user_transaction(db: AsyncSession, sender_id: UUID, tra
 
 
 async def accept_transaction(db: AsyncSession, transaction_id: UUID):
-    result = await db.execute(select(Transaction).where(Transaction.id == transaction_id))
-    transaction = result.scalar_one_or_none()
-    if not transaction:
-        raise HTTPException(status_code=404, detail="Transaction not found")
-    if transaction.status != "pending":
-        raise HTTPException(status_code=400, detail="Transaction already processed")
-    
-    stmt_sender = select(Balance).where(
-        Balance.user_id == transaction.sender_id, 
-        Balance.currency_id == transaction.currency_id)
-    result = await db.execute(stmt_sender)
-    sender_balance = result.scalar_one_or_none()
-    if not sender_balance:
-        raise HTTPException(status_code=404, detail="No balance in this currency")
-    
-    stmt_receiver = select(Balance).where(
-        Balance.user_id == transaction.receiver_id,
-        Balance.currency_id == transaction.currency_id
-    )
-    result = await db.execute(stmt_receiver)
-    receiver_balance = result.scalar_one_or_none()
-    if not receiver_balance:
-        receiver_balance = Balance(
-            user_id=transaction.receiver_id,
-            currency_id=transaction.currency_id,
-            amount=Decimal("0.0")
+    async def _accept():
+        result = await db.execute(
+            select(Transaction).where(Transaction.id == transaction_id).with_for_update()
         )
-        db.add(receiver_balance)
-        await db.flush()
-    
-    if sender_balance.amount < transaction.amount:
-        raise HTTPException(status_code=400, detail="Insufficient funds at approval time")
+        transaction = result.scalar_one_or_none()
+        if not transaction:
+            raise HTTPException(status_code=404, detail="Transaction not found")
+        if transaction.status != "pending":
+            raise HTTPException(status_code=400, detail="Transaction already processed")
 
-    sender_balance.amount -= transaction.amount
-    receiver_balance.amount += transaction.amount
+        result = await db.execute(select(Balance.id).where(
+            Balance.user_id == transaction.sender_id,
+            Balance.currency_id == transaction.currency_id))
+        sender_balance_id = result.scalar_one_or_none()
+        if not sender_balance_id:
+            raise HTTPException(status_code=404, detail="No balance in this currency")
 
-    transaction.status = "completed"
-    await db.commit()
-    await db.refresh(transaction)
+        receiver_balance_id = await ensure_balance(db, transaction.receiver_id, transaction.currency_id)
 
-    return transaction
+        try:
+            await move_funds(db, sender_balance_id, receiver_balance_id, transaction.amount, transaction.id)
+        except InsufficientFunds:
+            raise InsufficientFunds("Insufficient funds at approval time")
+
+        transaction.status = "completed"
+        await record_spending(db, [transaction])
+        await db.commit()
+        await db.refresh(transaction)
+        return transaction
+
+    return await run_with_retries(db, _accept)
 
 
 async def deactivate_recurring_transaction(db: AsyncSession, transaction_id: UUID):
@@ -185,44 +219,65 @@ async def deactivate_recurring_transaction(db: AsyncSession, transaction_id: UUI
     return recurring_transaction
 
 
-async def view_all_transactions(db:AsyncSession, skip: int = 0, limit: int = 5, sort_by: str = "date", sort_order: str = "asc"):
-    sort = {"date": Transaction.created_date,
-            "amount": Transaction.amount}[sort_by]
-    order_func = asc if sort_order == "asc" else desc
-    total_query = await db.execute(select(func.count()).select_from(Transaction))
-    total = total_query.scalar_one()
-    result = await db.execute(select(Transaction).order_by(order_func(sort)).offset(skip).limit(limit))
+async def view_all_transactions(db:AsyncSession, cursor: str | None = None, limit: int = 5, sort_by: str = "date", sort_order: str = "asc", total: str | None = None):
+    sort, parse_sort_value = {"date": (Transaction.created_at, datetime.fromisoformat),
+                              "amount": (Transaction.amount, Decimal)}[sort_by]
+    scope = f"{sort_by}:{sort_order}"
+    after = decode_cursor(cursor, scope, (parse_sort_value, UUID)) if cursor else None
+    stmt = keyset_paginate(select(Transaction), (sort, Transaction.id), after,
+                           descending=sort_order == "desc", limit=limit)
+    result = await db.execute(stmt)
     transactions = result.scalars().all()
 
-    current_page = (skip // limit) + 1
-    has_next = skip + limit < total
+    has_next = len(transactions) > limit
+    transactions = transactions[:limit]
+    next_cursor = None
+    if has_next:
+        last = transactions[-1]
+        next_cursor = encode_cursor(scope, (getattr(last, sort.key), last.id))
 
     return {
         "transactions":transactions,
-        "total":total,
+        "next_cursor": next_cursor,
         "has_next": has_next,
-        "page":current_page,
-        "per_page":limit
+        "per_page":limit,
+        "total": await _count_rows(db, Transaction, total),
         }
 
 
-async def view_all_recurring_transactions(db: AsyncSession, skip: int = 0, limit: int = 5):
-    total_query = await db.execute(select(func.count()).select_from(RecurringTransaction))
-    total = total_query.scalar_one()
-    result = await db.execute(select(RecurringTransaction).offset(skip).limit(limit))
+async def view_all_recurring_transactions(db: AsyncSession, cursor: str | None = None, limit: int = 5, total: str | None = None):
+    scope = "next_execution_date:asc"
+    after = decode_cursor(cursor, scope, (date.fromisoformat, UUID)) if cursor else None
+    stmt = keyset_paginate(select(RecurringTransaction),
+                           (RecurringTransaction.next_execution_date, RecurringTransaction.id),
+                           after, descending=False, limit=limit)
+    result = await db.execute(stmt)
     recurring_transactions = result.scalars().all()
 
-    current_page = (skip // limit) + 1
-    has_next = skip + limit < total
+    has_next = len(recurring_transactions) > limit
+    recurring_transactions = recurring_transactions[:limit]
+    next_cursor = None
+    if has_next:
+        last = recurring_transactions[-1]
+        next_cursor = encode_cursor(scope, (last.next_execution_date, last.id))
 
     return {
         "recurring_transactions": recurring_transactions,
-        "total": total,
+        "next_cursor": next_cursor,
         "has_next": has_next,
-        "page": current_page,
-        "per_page": limit
+        "per_page": limit,
+        "total": await _count_rows(db, RecurringTransaction, total),
     }
 
+
+async def _count_rows(db: AsyncSession, model, mode: str | None) -> int | None:
+    if mode == "exact":
+        result = await db.execute(select(func.count()).select_from(model))
+        return result.scalar_one()
+    if mode == "estimate":
+        return await estimate_row_count(db, model.__tablename__)
+    return None
+
 async def reject_transaction(db: AsyncSession, transaction_id: UUID):
     result = await db.execute(select(Transaction).where(Transaction.id == transaction_id))
     transaction = result.scalar_one_or_none()
@@ -307,13 +362,15 @@ async def create_recurring_transaction(
     next_run_date: date | None,
     description: str | None = None,
 ):
+    start_date = next_run_date or date.today()
     recurring_transaction = RecurringTransaction(
         sender_id=sender_id,
         receiver_id=receiver_id,
         amount=amount,
         currency_id=currency_id,
         interval_type=interval_type,
-        next_execution_date=next_run_date or date.today(),
+        next_execution_date=start_date,
+        start_date=start_date,
         description=description or "",
         is_active=True,
         last_run_date=None
@@ -322,53 +379,162 @@ async def create_recurring_transaction(
     await db.flush()
     return recurring_transaction
 
-async def transfer_between_cards(db: AsyncSession, sending_card_number: str, receiving_card_number: str, amount: Decimal, description: str | None = None):
+async def transfer_between_cards(db: AsyncSession, sending_card_number: str, receiving_card_number: str, amount: Decimal, description: str | None = None, idempotency: IdempotentRequest | None = None):
     if amount <= 0:
         raise HTTPException(status_code=400, detail="Amount must be positive")
-    sending_card = await get_card_by_number(db, sending_card_number)
-    if not sending_card:
-        raise HTTPException(status_code=404, detail=f"Sending card {sending_card_number} not found")
 
-    receiving_card = await get_card_by_number(db, receiving_card_number)
-    if not receiving_card:
-        raise HTTPException(status_code=404, detail=f"Receiving card {receiving_card_number} not found")
-
-    
-    sending_card = await get_card_by_number(db, sending_card_number)
-    receiving_card = await get_card_by_number(db, receiving_card_number)
-
-    sender_balance = sending_card.balance
-    receiver_balance = receiving_card.balance
+    async def _transfer():
+        await claim_idempotency_key(db, idempotency)
+
+        sending_card = await get_card_by_number(db, sending_card_number)
+        if not sending_card:
+            raise HTTPException(status_code=404, detail=f"Sending card {sending_card_number} not found")
+
+        receiving_card = await get_card_by_number(db, receiving_card_number)
+        if not receiving_card:
+            raise HTTPException(status_code=404, detail=f"Receiving card {receiving_card_number} not found")
+
+        default_category = await get_default_category(db, "User Transfer")
+        if not default_category:
+            raise HTTPException(status_code=500, detail="Default category for user transfers not found")
+
+        sender_balance = sending_card.balance
+        receiver_balance = receiving_card.balance
+        is_internal_transfer = sender_balance.user_id == receiver_balance.user_id
+
+        transaction_id = uuid.uuid4()
+        await move_funds(db, sender_balance.id, receiver_balance.id, amount, transaction_id)
+
+        transaction = Transaction(
+            id=transaction_id,
+            sender_id=sender_balance.user_id,
+            receiver_id=receiver_balance.user_id,
+            currency_id=sender_balance.currency_id,
+            category_id=default_category.id,
+            amount=amount,
+            status="completed",
+            is_recurring=False,
+            created_date=date.today(),
+            description=description,
+            sender_card_id=sending_card.id,
+            receiver_card_id=receiving_card.id,
+            transaction_type=TransactionType.USER_TO_USER,
+            is_internal_transfer= is_internal_transfer
+        )
 
-    if sender_balance.amount < amount:
-        raise HTTPException(status_code=400, detail="Insufficient funds")
-    sender_balance.amount -= amount
-    receiver_balance.amount += amount
+        db.add(transaction)
+        await record_spending(db, [transaction])
+        if idempotency:
+            await db.flush()
+            response = CardToCardTransactionOut.model_validate(transaction, from_attributes=True).model_copy(update={
+                "sender_card_number": sending_card_number,
+                "receiver_card_number": receiving_card_number,
+            })
+            await complete_idempotency_key(db, idempotency, status.HTTP_201_CREATED, response)
+        await db.commit()
+        return transaction
 
-    db.add(sender_balance)
-    db.add(receiver_balance)
+    return await run_with_retries(db, _transfer)
 
-    default_category = await get_category_by_name(db, "User Transfer")
-    if not default_category:
-        raise HTTPException(status_code=500, detail="Default category for user transfers not found")
-    is_internal_transfer = sending_card.balance.user_id == receiving_card.balance.user_id
 
-    transaction = Transaction(
-        sender_id=sender_balance.user_id,
-        receiver_id=receiver_balance.user_id,
-        currency_id=sender_balance.currency_id,
-        category_id=default_category.id,
-        amount=amount,
-        status="completed",
-        is_recurring=False,
-        created_date=date.today(),
-        description=description,
-        sender_card_id=sending_card.id,
-        receiver_card_id=receiving_card.id,
-        transaction_type=TransactionType.USER_TO_USER,
-        is_internal_transfer= is_internal_transfer
-    )
+async def transfer_batch_between_cards(
+    db: AsyncSession,
+    sender_id: UUID,
+    transfers: list[CardToCardTransactionIn],
+    all_or_nothing: bool = True,
+) -> BatchTransferResponse:
+    card_numbers = {t.sender_card_number for t in transfers} | {t.receiver_card_number for t in transfers}
+
+    async def _batch():
+        result = await db.execute(
+            select(Card.id, Card.card_number, Card.balance_id, Balance.user_id, Balance.currency_id)
+            .join(Balance, Card.balance_id == Balance.id)
+            .where(Card.card_number.in_(card_numbers), Card.is_deleted.is_(False))
+        )
+        cards = {row.card_number: row for row in result}
+
+        default_category = await get_default_category(db, "User Transfer")
+        if not default_category:
+            raise HTTPException(status_code=500, detail="Default category for user transfers not found")
+
+        results: list[BatchTransferItemResult] = []
+        planned = []
+        for index, item in enumerate(transfers):
+            sending_card = cards.get(item.sender_card_number)
+            receiving_card = cards.get(item.receiver_card_number)
+            if item.amount <= 0:
+                detail = "Amount must be positive"
+            elif not sending_card:
+                detail = f"Sending card {item.sender_card_number} not found"
+            elif not receiving_card:
+                detail = f"Receiving card {item.receiver_card_number} not found"
+            elif sending_card.user_id != sender_id:
+                detail = "Card does not belong to sender"
+            elif sending_card.currency_id != receiving_card.currency_id:
+                detail = "Cards operate in different currencies"
+            else:
+                detail = None
+                planned.append((index, item, sending_card, receiving_card))
+            results.append(BatchTransferItemResult(index=index, status="failed" if detail else "completed", detail=detail))
+
+        locked_amounts = await lock_balances(
+            db, {s.balance_id for _, _, s, _ in planned} | {r.balance_id for _, _, _, r in planned}
+        )
+        amounts = dict(locked_amounts)
+        transaction_rows = []
+        ledger_rows = []
+        for index, item, sending_card, receiving_card in planned:
+            if amounts[sending_card.balance_id] < item.amount:
+                results[index].status = "failed"
+                results[index].detail = "Insufficient funds"
+                continue
+            amounts[sending_card.balance_id] -= item.amount
+            amounts[receiving_card.balance_id] += item.amount
+            transaction_id = uuid.uuid4()
+            results[index].transaction_id = transaction_id
+            ledger_rows += [
+                ledger_entry(sending_card.balance_id, -item.amount, amounts[sending_card.balance_id], transaction_id, transaction_id),
+                ledger_entry(receiving_card.balance_id, item.amount, amounts[receiving_card.balance_id], transaction_id, transaction_id),
+            ]
+            transaction_rows.append(dict(
+                id=transaction_id,
+                sender_id=sending_card.user_id,
+                receiver_id=receiving_card.user_id,
+                currency_id=sending_card.currency_id,
+                category_id=default_category.id,
+                amount=item.amount,
+                status="completed",
+                is_recurring=False,
+                created_date=date.today(),
+                description=item.description,
+                sender_card_id=sending_card.id,
+                receiver_card_id=receiving_card.id,
+                transaction_type=TransactionType.USER_TO_USER,
+                is_internal_transfer=sending_card.user_id == receiving_card.user_id,
+            ))
+
+        failed = sum(r.status == "failed" for r in results)
+        if failed and all_or_nothing:
+            await db.rollback()
+            for r in results:
+                if r.status == "completed":
+                    r.status = "not_executed"
+                    r.transaction_id = None
+            return BatchTransferResponse(committed=False, completed=0, failed=failed, results=results)
+
+        await apply_balance_deltas(
+            db, {balance_id: amounts[balance_id] - locked_amounts[balance_id] for balance_id in locked_amounts}
+        )
+        if transaction_rows:
+            await db.execute(insert(Transaction), transaction_rows)
+            await record_spending(db, [Transaction(**row) for row in transaction_rows])
+        await post_ledger_entries(db, ledger_rows)
+        await db.commit()
+        return BatchTransferResponse(
+            committed=True,
+            completed=len(transaction_rows),
+            failed=failed,
+            results=results,
+        )
 
-    db.add(transaction)
-    await db.commit()
-    return transaction
+    return await run_with_retries(db, _batch)
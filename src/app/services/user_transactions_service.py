@@ -0,0 +1,128 @@
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import Select, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.persistence.transactions.transaction import Transaction
+from app.schemas.transaction import UserTransactionResponse
+from app.services.utils.pagination import decode_cursor, encode_cursor, keyset_paginate
+
+DIRECTIONS = ("all", "incoming", "outgoing")
+
+
+def _branch(
+    user_column,
+    user_id: UUID,
+    currency_id: UUID | None,
+    category_id: UUID | None,
+    start_date: date | None,
+    end_date: date | None,
+    after: list | None,
+    limit: int,
+) -> Select:
+    """
+    One side of the feed, shaped to be answered by a range scan on
+    (sender_id | receiver_id, created_at, id).
+    """
+    stmt = select(Transaction).where(user_column == user_id)
+    if currency_id:
+        stmt = stmt.where(Transaction.currency_id == currency_id)
+    if category_id:
+        stmt = stmt.where(Transaction.category_id == category_id)
+    if start_date:
+        stmt = stmt.where(Transaction.created_at >= datetime.combine(start_date, time.min, tzinfo=timezone.utc))
+    if end_date:
+        stmt = stmt.where(Transaction.created_at < datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=timezone.utc))
+    return keyset_paginate(stmt, (Transaction.created_at, Transaction.id), after, descending=True, limit=limit)
+
+
+def build_user_transactions_query(
+    user_id: UUID,
+    direction: str = "all",
+    currency_id: UUID | None = None,
+    category_id: UUID | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    after: list | None = None,
+    limit: int = 20,
+) -> Select:
+    """
+    Builds the newest-first feed of a user's transactions.
+
+    "all" is not written as sender_id = :id OR receiver_id = :id, which the
+    planner can only serve with a bitmap OR over both indexes followed by a
+    sort. Each side is instead read from its own composite index, already in
+    order and limited, and the two short lists are merged.
+    """
+    filters = (user_id, currency_id, category_id, start_date, end_date, after, limit)
+    if direction == "outgoing":
+        return _branch(Transaction.sender_id, *filters)
+    if direction == "incoming":
+        return _branch(Transaction.receiver_id, *filters)
+
+    outgoing = _branch(Transaction.sender_id, *filters)
+    # Transfers between the user's own cards are already in the outgoing side.
+    incoming = _branch(Transaction.receiver_id, *filters).where(Transaction.sender_id != user_id)
+    feed = aliased(Transaction, union_all(outgoing, incoming).subquery("feed"))
+    return (
+        select(feed)
+        .order_by(feed.created_at.desc(), feed.id.desc())
+        .limit(limit + 1)
+    )
+
+
+async def read_user_transactions(
+    db: AsyncSession,
+    user_id: UUID,
+    direction: str = "all",
+    currency_id: UUID | None = None,
+    category_id: UUID | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    cursor: str | None = None,
+    limit: int = 20,
+) -> dict:
+    """
+    Returns one page of the user's transaction history, newest first.
+
+    Args:
+        db: Database session.
+        user_id: ID of the current user.
+        direction: "incoming", "outgoing" or "all".
+        currency_id: Only transactions in this currency.
+        category_id: Only transactions in this category.
+        start_date: First day to include.
+        end_date: Last day to include.
+        cursor: next_cursor of the previous page.
+        limit: Page size.
+
+    Returns:
+        The page of transactions, the cursor of the next page and whether it exists.
+    """
+    scope = f"me:{direction}"
+    after = decode_cursor(cursor, scope, (datetime.fromisoformat, UUID)) if cursor else None
+    stmt = build_user_transactions_query(user_id, direction, currency_id, category_id,
+                                         start_date, end_date, after, limit)
+    result = await db.execute(stmt)
+    transactions = result.scalars().all()
+
+    has_next = len(transactions) > limit
+    transactions = transactions[:limit]
+    next_cursor = None
+    if has_next:
+        last = transactions[-1]
+        next_cursor = encode_cursor(scope, (last.created_at, last.id))
+
+    return {
+        "transactions": [
+            UserTransactionResponse.model_validate(transaction, from_attributes=True).model_copy(update={
+                "direction": "outgoing" if transaction.sender_id == user_id else "incoming",
+            })
+            for transaction in transactions
+        ],
+        "next_cursor": next_cursor,
+        "has_next": has_next,
+        "per_page": limit,
+    }
@@ -5,29 +5,30 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from uuid import UUID
 from sqlalchemy import update,select
-from app.services.utils.security import get_password_hash,verify_password
+from app.services.utils.security import password_hasher
 from app.services.utils.processors import process_db_transaction
-from app.services.utils.mail.sendmail import send_activation_mail
+from app.services.utils.principal_cache import notify_principal_changed, principal_cache
+from app.services.mail_outbox_service import enqueue_activation_mail
 from app.services.errors import ServiceError
-import requests
-from os import getenv
-import cloudinary
-import cloudinary.uploader
-from app.schemas.service_result import ServiceResult
+from app.schemas.service_result import AvatarUpdateResult, ServiceResult
+from app.services.avatar_service import avatar_pipeline
 
 async def create_user(session:AsyncSession ,user: UserCreate) -> UserResponse|ServiceError:
     async def _create():
-        user.password = get_password_hash(user.password)
+        user.password = await password_hasher.hash(user.password)
         db_obj = User(**user.model_dump())
         session.add(db_obj)
         try:
+            await session.flush()
+            enqueue_activation_mail(session,
+                                    to_email=str(user.email),
+                                    to_username=user.username,
+                                    to_user_id=str(db_obj.id))
             await session.commit()
         except IntegrityError:
+            await session.rollback()
             return ServiceError.ERROR_USER_EXISTS
         await session.refresh(db_obj)
-        await send_activation_mail(to_email=str(user.email),
-                                   to_username=user.username,
-                                   to_user_id=str(db_obj.id))
         return UserResponse.create(db_obj)
 
     return await process_db_transaction(
@@ -40,7 +41,9 @@ async def activate_user(current_user:UserResponse,
     async def _activate():
         statement = update(User).where(User.id == current_user.id).values(is_activated=True)
         result = await session.execute(statement)
+        await notify_principal_changed(session, current_user.id)
         await session.commit()
+        principal_cache.invalidate(current_user.id)
         if result.rowcount:
             return True
         return ServiceError.ERROR_USER_NOT_FOUND
@@ -52,58 +55,41 @@ async def activate_user(current_user:UserResponse,
         result=service_result
     )
 
-async def verify_user(current_user:UserResponse,
-                 id_document:bytes,
-                 selfie:bytes,
-                 session:AsyncSession)->ServiceResult|ServiceError:
-    files = {"id_document":id_document,
-             "selfie":selfie}
-    verification_result = bool(requests.post(
-        url=getenv("VERIFICATION_API_URL"),
-        files=files
-    ))
-    if verification_result:
-        statement = update(User).where(User.id == current_user.id).values(is_verified=True)
-        result = await session.execute(statement)
-        await session.commit()
-        if not result.rowcount:
-            return ServiceError.ERROR_USER_NOT_FOUND
-
-    return ServiceResult(
-        result=verification_result
-    )
-
 async def update_user_settings_avatar(current_user:UserResponse,
                                session:AsyncSession,
-                               avatar:bytes|None)->ServiceResult|ServiceError:
-    async def _update_avatar():
-        if avatar:
-            cloudinary.config(
-                cloud_name=getenv("CLOUDINARY_CLOUD_NAME"),
-                api_key=getenv("CLOUDINARY_API_KEY"),
-                api_secret=getenv("CLOUDINARY_SECRET_KEY"),
-                secure=True
-            )
-            upload_result = cloudinary.uploader.upload(avatar)
-            avatar_full_location = upload_result["secure_url"]
-        else:
-            avatar_full_location = None
-
+                               avatar:bytes|None)->AvatarUpdateResult|ServiceError:
+    """
+    An uploaded avatar is processed in the background and the user's avatar
+    changes once the renditions are stored, so the result is "pending".
+    Without an upload the avatar is removed right away, together with any
+    upload still being processed.
+    """
+    if avatar:
+        content_hash = avatar_pipeline.submit(current_user.id, avatar)
+        return AvatarUpdateResult(result=True, status="pending", content_hash=content_hash)
+
+    async def _remove_avatar():
+        avatar_pipeline.cancel(current_user.id)
         statement = update(User).where(User.id == current_user.id).values(
-            avatar=avatar_full_location
+            avatar=None
         )
         result = await session.execute(statement)
+        await notify_principal_changed(session, current_user.id)
         await session.commit()
+        principal_cache.invalidate(current_user.id)
         if result.rowcount:
             return True
         return ServiceError.ERROR_USER_NOT_FOUND
 
     service_result = await process_db_transaction(
         session=session,
-        transaction_func=_update_avatar,
+        transaction_func=_remove_avatar,
     )
-    return ServiceResult(
-        result=service_result
+    if service_result is not True:
+        return service_result
+    return AvatarUpdateResult(
+        result=service_result,
+        status="removed"
     )
 
 
@@ -132,7 +118,14 @@ async def update_user_settings_contacts(current_user:UserResponse,
                 is_activated=False
                 )
         result = await session.execute(statement)
+        if emails_differ and result.rowcount:
+            enqueue_activation_mail(session,
+                                    to_user_id=str(old_user_info.id),
+                                    to_email=str(settings.email),
+                                    to_username=str(old_user_info.username))
+        await notify_principal_changed(session, current_user.id)
         await session.commit()
+        principal_cache.invalidate(current_user.id)
         if result.rowcount:
             return True
         return ServiceError.ERROR_USER_NOT_FOUND
@@ -141,12 +134,6 @@ async def update_user_settings_contacts(current_user:UserResponse,
         session=session,
         transaction_func=_update_settings,
     )
-    if emails_differ and service_result:
-        await send_activation_mail(
-            to_user_id=str(old_user_info.id),
-            to_email=str(settings.email),
-            to_username=str(old_user_info.username)
-        )
     return ServiceResult(
         result=service_result
     )
@@ -161,9 +148,9 @@ async def update_user_settings_password(current_user:UserResponse,
         user_object = result.scalar_one_or_none()
         if not user_object:
             return False
-        if not verify_password(old_password,user_object.password):
+        if not await password_hasher.verify(old_password,user_object.password):
             return False
-        new_password_hash = get_password_hash(new_password)
+        new_password_hash = await password_hasher.hash(new_password)
         statement = update(User).where(User.id == current_user.id).values(
             password = new_password_hash
             )
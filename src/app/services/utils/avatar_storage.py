@@ -0,0 +1,82 @@
+import asyncio
+from abc import ABC, abstractmethod
+from os import getenv
+from pathlib import Path
+
+import cloudinary
+import cloudinary.uploader
+
+from app.core.config import settings
+
+
+class AvatarStorage(ABC):
+    """
+    Where rendered avatars are kept. Keys are derived from the content hash
+    of the upload, so saving the same key twice must be harmless.
+    """
+
+    @abstractmethod
+    async def save(self, key: str, content: bytes) -> str:
+        """
+        Stores a WebP image under key.
+
+        Returns:
+            The public URL of the image.
+        """
+
+
+class LocalAvatarStorage(AvatarStorage):
+    """
+    Writes avatars below AVATAR_LOCAL_DIR; the application serves that
+    directory under AVATAR_LOCAL_BASE_URL.
+    """
+
+    def __init__(self, root: str | None = None, base_url: str | None = None):
+        self.root = Path(root or settings.AVATAR_LOCAL_DIR)
+        self.base_url = (base_url or settings.AVATAR_LOCAL_BASE_URL).rstrip("/")
+
+    def _write(self, path: Path, content: bytes) -> None:
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".part")
+        partial.write_bytes(content)
+        partial.replace(path)
+
+    async def save(self, key: str, content: bytes) -> str:
+        await asyncio.to_thread(self._write, self.root / f"{key}.webp", content)
+        return f"{self.base_url}/{key}.webp"
+
+
+class CloudinaryAvatarStorage(AvatarStorage):
+    """
+    Uploads avatars to Cloudinary under a public_id equal to the key, without
+    overwriting, so a repeated upload of the same content is a no-op there.
+    """
+
+    def __init__(self):
+        cloudinary.config(
+            cloud_name=getenv("CLOUDINARY_CLOUD_NAME"),
+            api_key=getenv("CLOUDINARY_API_KEY"),
+            api_secret=getenv("CLOUDINARY_SECRET_KEY"),
+            secure=True
+        )
+
+    async def save(self, key: str, content: bytes) -> str:
+        upload_result = await asyncio.to_thread(
+            cloudinary.uploader.upload,
+            content,
+            public_id=key,
+            overwrite=False,
+            resource_type="image",
+        )
+        return upload_result["secure_url"]
+
+
+def create_avatar_storage(backend: str | None = None) -> AvatarStorage:
+    backend = backend or settings.AVATAR_STORAGE_BACKEND
+    if backend == "local":
+        return LocalAvatarStorage()
+    if backend == "cloudinary":
+        return CloudinaryAvatarStorage()
+    raise ValueError(f"Unknown avatar storage backend: {backend}")
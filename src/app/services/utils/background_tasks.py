@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(
+    name: str,
+    job: Callable[[], Awaitable[Any]],
+    interval_seconds: float,
+    stop_event: asyncio.Event,
+) -> None:
+    """
+    Runs `job` every `interval_seconds` until `stop_event` is set.
+    A failing run is logged and does not stop the loop.
+    """
+    while not stop_event.is_set():
+        try:
+            await job()
+        except Exception:
+            logger.exception(f"Background job {name} failed")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+class BackgroundJobs:
+    """
+    Owns the periodic jobs started from the application lifespan.
+    """
+
+    def __init__(self):
+        self._stop_event = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self, name: str, job: Callable[[], Awaitable[Any]], interval_seconds: float) -> None:
+        self._tasks.append(
+            asyncio.create_task(run_periodically(name, job, interval_seconds, self._stop_event), name=name)
+        )
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
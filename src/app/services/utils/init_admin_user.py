@@ -1,23 +1,30 @@
-from sqlalchemy import select
+from sqlalchemy import exists, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.persistence.users.users import User
-from app.services.utils.security import get_password_hash
+from app.services.utils.security import password_hasher
 
 
-async def create_admin_user(session: AsyncSession):
-    result = await session.execute(select(User).where(User.is_admin == True))
-    admin_user = result.scalars().first()
+async def create_admin_user(session: AsyncSession) -> list[str]:
+    """
+    Adds the initial admin unless an admin exists. The password is only
+    hashed when the admin is actually created. Runs in the caller's
+    transaction, under the bootstrap lock.
+
+    Returns:
+        The username of the created admin, or an empty list.
+    """
+    if await session.scalar(select(exists().where(User.is_admin.is_(True)))):
+        return []
 
-    if admin_user:
-        return
-    
     admin_data = {"username": "admin",
                   "email": "admin@admin.com",
-                  "password": get_password_hash("StrongestPass123@"),
+                  "password": await password_hasher.hash("StrongestPass123@"),
                   "is_admin": True,
                   "phone": "012345678"}
-    
-    admin = User(**admin_data)
-    session.add(admin)
-    await session.commit()
\ No newline at end of file
+
+    result = await session.execute(
+        insert(User).values(**admin_data).on_conflict_do_nothing().returning(User.username)
+    )
+    return list(result.scalars().all())
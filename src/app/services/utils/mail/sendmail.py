@@ -1,22 +1,67 @@
-from app.services.utils.mail.mail_model import ActivationMessagesList,ActivationMailMessage
-from mailjet_rest import Client
 from os import getenv
 
-async def send_activation_mail(to_email:str,
-                               to_username:str,
-                               to_user_id:str)->bool:
-    mailjet = Client(
-        auth=(getenv("MAILJET_API_KEY"),getenv("MAILJET_SECRET_KEY")),
-        version="v3.1"
-    )
-    mail_obj = ActivationMailMessage.fill_data(
-        to_email=to_email,
-        to_username=to_username,
-        to_user_id=to_user_id
-    )
-
-    mail_data = ActivationMessagesList(Messages=[mail_obj]).model_dump()
-    result = mailjet.send.create(data=mail_data)
-    if not result.status_code == 200:
-        return False
-    return True
\ No newline at end of file
+import httpx
+
+from app.core.config import settings
+from app.services.utils.mail.mail_model import ActivationMessagesList
+
+
+class MailDeliveryError(Exception):
+    """Raised when Mailjet could not be reached or rejected the whole batch."""
+
+
+class MailjetSender:
+    """
+    Sends batches of messages through Mailjet's v3.1 Send API with one
+    shared AsyncClient, so connections are reused between batches.
+    """
+
+    def __init__(self, base_url: str | None = None, timeout: float | None = None):
+        self.base_url = base_url or settings.MAILJET_API_URL
+        self.timeout = timeout or settings.MAIL_SEND_TIMEOUT_SECONDS
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=(getenv("MAILJET_API_KEY") or "", getenv("MAILJET_SECRET_KEY") or ""),
+                timeout=self.timeout,
+            )
+        return self._client
+
+    async def send(self, messages: ActivationMessagesList) -> list[str | None]:
+        """
+        Returns:
+            One entry per message, in order: None if Mailjet accepted it,
+            otherwise the error it reported.
+
+        Raises:
+            MailDeliveryError: On transport errors, throttling, server errors
+            or an unexpected response, i.e. whenever the whole batch should
+            be retried.
+        """
+        try:
+            response = await self._get_client().post("/v3.1/send", json=messages.model_dump(mode="json"))
+        except httpx.HTTPError as e:
+            raise MailDeliveryError(repr(e))
+        if response.status_code not in (200, 400):
+            raise MailDeliveryError(f"Mailjet responded {response.status_code}: {response.text[:500]}")
+        try:
+            results = response.json()["Messages"]
+        except (ValueError, KeyError, TypeError):
+            raise MailDeliveryError(f"Unexpected Mailjet response {response.status_code}: {response.text[:500]}")
+        if len(results) != len(messages.Messages):
+            raise MailDeliveryError(f"Mailjet returned {len(results)} results for {len(messages.Messages)} messages")
+        return [
+            None if result.get("Status") == "success" else str(result.get("Errors") or result)
+            for result in results
+        ]
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+mail_sender = MailjetSender()
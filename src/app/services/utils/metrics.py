@@ -0,0 +1,15 @@
+from typing import Any, Callable
+
+_providers: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict[str, Any]]) -> None:
+    """
+    Registers a callable returning a snapshot of a component's counters.
+    The snapshots are served by GET /admin/metrics.
+    """
+    _providers[name] = provider
+
+
+def collect_metrics() -> dict[str, dict[str, Any]]:
+    return {name: provider() for name, provider in _providers.items()}
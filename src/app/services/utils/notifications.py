@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[str], Awaitable[None] | None]
+
+
+async def notify(db: AsyncSession, channel: str, payload: str = "") -> None:
+    """
+    Queues a Postgres NOTIFY in the caller's transaction. Listeners in every
+    worker receive it only once the transaction commits, and never if it
+    rolls back.
+    """
+    await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+def _asyncpg_dsn(url: str) -> str:
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+class NotificationListener:
+    """
+    Keeps one dedicated connection per worker LISTENing on the registered
+    channels and dispatches notifications to callbacks.
+
+    Notifications sent while the connection is down are lost, so after every
+    (re)connect each callback is called with the payload "*" and is expected
+    to drop whatever it caches.
+    """
+
+    def __init__(self, dsn: str | None = None, reconnect_seconds: float = 5.0):
+        self._dsn = dsn or _asyncpg_dsn(settings.SQLALCHEMY_DATABASE_URI)
+        self._reconnect_seconds = reconnect_seconds
+        self._callbacks: dict[str, list[Callback]] = {}
+        self._task: asyncio.Task | None = None
+        self._stop = asyncio.Event()
+
+    def subscribe(self, channel: str, callback: Callback) -> None:
+        self._callbacks.setdefault(channel, []).append(callback)
+
+    def start(self) -> None:
+        if self._callbacks and self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._run(), name="pg-notification-listener")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def dispatch(self, channel: str, payload: str) -> None:
+        for callback in self._callbacks.get(channel, []):
+            try:
+                result = callback(payload)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                logger.exception(f"Notification callback for {channel} failed")
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        asyncio.create_task(self.dispatch(channel, payload))
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = await asyncpg.connect(self._dsn)
+                for channel in self._callbacks:
+                    await connection.add_listener(channel, self._on_notification)
+                for channel in self._callbacks:
+                    await self.dispatch(channel, "*")
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await closed.wait()
+                logger.warning("Notification listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Notification listener failed: {e!r}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self._reconnect_seconds)
+
+
+notification_listener = NotificationListener()
@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from typing import Any, Callable, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    """
+    Builds an opaque cursor token from the sort key of the last row of a page.
+
+    Args:
+        scope: Identifies the ordering the cursor belongs to (e.g. "date:asc"),
+               so a cursor cannot be replayed against a different ordering.
+        values: Sort key values of the last row, id last.
+    """
+    payload = json.dumps({"s": scope, "v": [str(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str, parsers: Sequence[Callable[[str], Any]]) -> list[Any]:
+    """
+    Decodes a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or belongs to another ordering.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != scope or len(payload["v"]) != len(parsers):
+            raise ValueError(scope)
+        return [parse(value) for parse, value in zip(parsers, payload["v"])]
+    except (binascii.Error, json.JSONDecodeError, KeyError, TypeError, ValueError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_paginate(
+    stmt: Select,
+    columns: Sequence[Any],
+    after: Sequence[Any] | None,
+    descending: bool,
+    limit: int,
+) -> Select:
+    """
+    Applies keyset pagination to `stmt`: WHERE (col1, col2) > (:v1, :v2)
+    ORDER BY col1, col2 LIMIT limit + 1. The extra row only tells whether a
+    next page exists. The row comparison lets Postgres answer any page with
+    one range scan on a matching composite index, regardless of depth.
+    """
+    if after is not None:
+        key = tuple_(*columns)
+        stmt = stmt.where(key < tuple(after) if descending else key > tuple(after))
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    return stmt.order_by(*order_by).limit(limit + 1)
+
+
+async def estimate_row_count(db: AsyncSession, table_name: str) -> int:
+    """
+    Returns the planner's row estimate for a table (pg_class.reltuples),
+    which costs a catalog lookup instead of a full COUNT(*).
+    """
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    )
+    return max(result.scalar_one_or_none() or 0, 0)
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import math
+import time
+from decimal import Decimal
+
+import httpx
+
+from app.api.exceptions import PaymentProcessorUnavailable
+from app.core.config import settings
+from app.services.utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects calls for
+    reset_seconds. Then a single trial call is let through ("half open"): its
+    success closes the breaker, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.reset_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and self.retry_after() == 0:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Frees the half-open trial slot of a call that ended without an outcome."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Payment processor circuit opened after {self.failures} failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class PaymentProcessorClient:
+    """
+    Long-lived client of the card payment processor.
+
+    One AsyncClient keeps PAYMENT_PROCESSOR_MAX_CONNECTIONS keep-alive
+    connections; callers beyond that wait for a free connection up to the
+    pool timeout. Connection errors, timeouts and 5xx answers are retried
+    with exponential backoff, always with the same Idempotency-Key, so the
+    processor charges a card at most once per top-up. A circuit breaker
+    fails fast with PaymentProcessorUnavailable while the processor is down.
+    """
+
+    def __init__(self, base_url: str | None = None, transport: httpx.AsyncBaseTransport | None = None):
+        self.base_url = base_url or settings.PAYMENT_PROCESSOR_URL
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self.breaker = CircuitBreaker(
+            settings.PAYMENT_PROCESSOR_BREAKER_FAILURES,
+            settings.PAYMENT_PROCESSOR_BREAKER_RESET_SECONDS,
+        )
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "short_circuited": 0}
+
+    def start(self) -> None:
+        if self._client is None:
+            timeout = settings.PAYMENT_PROCESSOR_TIMEOUT_SECONDS
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                transport=self._transport,
+                timeout=httpx.Timeout(timeout, connect=settings.PAYMENT_PROCESSOR_CONNECT_TIMEOUT_SECONDS, pool=timeout),
+                limits=httpx.Limits(
+                    max_connections=settings.PAYMENT_PROCESSOR_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.PAYMENT_PROCESSOR_MAX_CONNECTIONS,
+                ),
+            )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _post_once(self, payload: dict, idempotency_key: str) -> httpx.Response | None:
+        try:
+            response = await self._client.post("/payments/", json=payload, headers={"Idempotency-Key": idempotency_key})
+        except httpx.TransportError as e:
+            logger.warning(f"Payment processor call failed: {e!r}")
+            return None
+        if response.status_code >= 500:
+            logger.warning(f"Payment processor responded {response.status_code}")
+            return None
+        return response
+
+    async def charge(self, card_number: str, amount: Decimal | str, currency: str, idempotency_key: str) -> bool:
+        """
+        Asks the processor to move amount from the card.
+
+        Returns:
+            True if the processor approved the payment, False if it declined.
+
+        Raises:
+            PaymentProcessorUnavailable: When the breaker is open or every
+            attempt failed.
+        """
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            raise PaymentProcessorUnavailable(retry_after=max(1, math.ceil(self.breaker.retry_after())))
+        self.start()
+        payload = {
+            "sender": card_number,
+            "number": card_number,
+            "incoming_amount": str(amount),
+            "currency": currency
+        }
+        self.stats["calls"] += 1
+        try:
+            for attempt in range(1, settings.PAYMENT_PROCESSOR_MAX_ATTEMPTS + 1):
+                response = await self._post_once(payload, idempotency_key)
+                if response is not None:
+                    approved = response.status_code == 200 and response.json() is True
+                    self.breaker.record_success()
+                    return approved
+                if attempt < settings.PAYMENT_PROCESSOR_MAX_ATTEMPTS:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(settings.PAYMENT_PROCESSOR_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        except asyncio.CancelledError:
+            # Otherwise a cancelled half-open trial keeps the breaker shut for good.
+            self.breaker.release_trial()
+            raise
+        except Exception:
+            self.stats["failures"] += 1
+            self.breaker.record_failure()
+            raise
+        self.stats["failures"] += 1
+        self.breaker.record_failure()
+        raise PaymentProcessorUnavailable(retry_after=max(1, math.ceil(self.breaker.retry_after())))
+
+    def metrics_snapshot(self) -> dict:
+        return {"breaker": self.breaker.state, **self.stats}
+
+
+payment_processor = PaymentProcessorClient()
+register_metrics("payment_processor", payment_processor.metrics_snapshot)
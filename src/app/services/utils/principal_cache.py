@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.schemas.user import UserResponse
+from app.services.utils.metrics import register_metrics
+from app.services.utils.notifications import notify
+
+PRINCIPAL_CHANNEL = "principal_changed"
+
+
+class PrincipalCache:
+    """
+    Bounded LRU of the UserResponse built for authenticated requests, keyed
+    by user id.
+
+    Entries expire after PRINCIPAL_CACHE_TTL_SECONDS as a safety net; the
+    normal path is explicit invalidation. Services that change a field of
+    UserResponse call notify_principal_changed() in their transaction and
+    principal_cache.invalidate() after the commit, so the change applies
+    immediately in this worker and on the others once the notification
+    arrives.
+    """
+
+    def __init__(self, max_size: int | None = None, ttl_seconds: float | None = None):
+        self.max_size = settings.PRINCIPAL_CACHE_MAX_SIZE if max_size is None else max_size
+        self.ttl_seconds = settings.PRINCIPAL_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._entries: OrderedDict[UUID, tuple[float, UserResponse]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: UUID) -> UserResponse | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, principal = entry
+        if time.monotonic() - stored_at >= self.ttl_seconds:
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return principal
+
+    def put(self, principal: UserResponse) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[principal.id] = (time.monotonic(), principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID) -> None:
+        self.invalidations += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def on_notification(self, payload: str) -> None:
+        if payload == "*":
+            self.clear()
+            return
+        try:
+            self.invalidate(UUID(payload))
+        except ValueError:
+            self.clear()
+
+    def metrics_snapshot(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+async def notify_principal_changed(db: AsyncSession, user_id: UUID) -> None:
+    """
+    Call in the transaction that changes a user's block, activation,
+    verification or profile fields. Other workers evict the user on commit.
+    """
+    await notify(db, PRINCIPAL_CHANNEL, str(user_id))
+
+
+principal_cache = PrincipalCache()
+register_metrics("principal_cache", principal_cache.metrics_snapshot)
@@ -0,0 +1,113 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+
+from app.api.exceptions import TooManyLoginAttempts
+from app.core.config import settings
+from app.services.utils.metrics import register_metrics
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for sliding-window hit logs. The in-memory backend limits each
+    worker on its own; a shared backend (e.g. sorted sets in a cache
+    server) makes the limits hold across workers and hosts and can be
+    swapped in with LoginThrottle.set_backend().
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window_seconds: float) -> float | None:
+        """
+        Records a hit for key unless it already has limit hits in the last
+        window_seconds.
+
+        Returns:
+            None if the hit was recorded, otherwise the seconds until the
+            oldest hit leaves the window.
+        """
+
+    @abstractmethod
+    async def reset(self, key: str) -> None:
+        """Forgets every hit of key."""
+
+
+class InMemorySlidingWindowBackend(RateLimitBackend):
+    """
+    Keeps the timestamps of the hits per key, for at most max_keys keys;
+    the least recently hit keys are dropped first.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._hits: OrderedDict[str, deque[float]] = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window_seconds: float) -> float | None:
+        now = time.monotonic()
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque()
+        self._hits.move_to_end(key)
+        while hits and hits[0] <= now - window_seconds:
+            hits.popleft()
+        if len(hits) >= limit:
+            return hits[0] + window_seconds - now
+        hits.append(now)
+        while len(self._hits) > self.max_keys:
+            self._hits.popitem(last=False)
+        return None
+
+    async def reset(self, key: str) -> None:
+        self._hits.pop(key, None)
+
+
+class LoginThrottle:
+    """
+    Sliding-window limits on login attempts per username and per client IP,
+    checked before the user is loaded or a password hash is verified.
+    """
+
+    def __init__(self, backend: RateLimitBackend | None = None):
+        self.backend = backend or InMemorySlidingWindowBackend()
+        self.window_seconds = settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+        self.username_limit = settings.LOGIN_RATE_LIMIT_PER_USERNAME
+        self.ip_limit = settings.LOGIN_RATE_LIMIT_PER_IP
+        self.allowed = 0
+        self.rejected_username = 0
+        self.rejected_ip = 0
+
+    def set_backend(self, backend: RateLimitBackend) -> None:
+        self.backend = backend
+
+    async def check(self, username: str, client_ip: str | None) -> None:
+        """
+        Raises:
+            TooManyLoginAttempts: With a Retry-After header when either
+            limit is exhausted.
+        """
+        if client_ip:
+            retry_after = await self.backend.hit(f"login:ip:{client_ip}", self.ip_limit, self.window_seconds)
+            if retry_after is not None:
+                self.rejected_ip += 1
+                raise TooManyLoginAttempts(retry_after=max(1, math.ceil(retry_after)))
+        retry_after = await self.backend.hit(
+            f"login:user:{username.lower()}", self.username_limit, self.window_seconds
+        )
+        if retry_after is not None:
+            self.rejected_username += 1
+            raise TooManyLoginAttempts(retry_after=max(1, math.ceil(retry_after)))
+        self.allowed += 1
+
+    async def reset_username(self, username: str) -> None:
+        await self.backend.reset(f"login:user:{username.lower()}")
+
+    def metrics_snapshot(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "rejected_username": self.rejected_username,
+            "rejected_ip": self.rejected_ip,
+        }
+
+
+login_throttle = LoginThrottle()
+register_metrics("login_throttle", login_throttle.metrics_snapshot)
@@ -0,0 +1,28 @@
+"""
+Recomputes the spending rollups from the transactions table:
+
+    cd src
+    python -m app.services.utils.rebuild_spending_rollups --chunk-size 500
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from app.persistence.db import AsyncSessionLocal
+from app.services.spending_rollups_service import rebuild_spending_rollups
+
+logger = logging.getLogger(__name__)
+
+
+async def main(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        processed = await rebuild_spending_rollups(session, chunk_size=args.chunk_size)
+    logger.info(f"Rebuilt spending rollups for {processed} users in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=None, help="Users per transaction")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time as dt_time, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.persistence.db import AsyncSessionLocal
+from app.services.recurring_transactions_service import RecurringBatchResult, execute_due_recurring_transactions
+from app.services.utils.background_tasks import run_periodically
+from app.services.utils.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RecurringExecutorMetrics:
+    batches: int = 0
+    executed: int = 0
+    failed: int = 0
+    lag_seconds: float = 0.0
+    last_batch_seconds: float = 0.0
+    throughput_per_second: float = 0.0
+    last_run_at: datetime | None = None
+
+
+class RecurringTransactionExecutor:
+    """
+    Executes due RecurringTransaction templates in batches.
+
+    It runs inside the application lifespan (RECURRING_EXECUTOR_IN_APP) or as a
+    standalone process:
+
+        cd src
+        python -m app.services.utils.recurring_executor
+
+    Every replica can run it, claiming is done with FOR UPDATE SKIP LOCKED.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        batch_size: int | None = None,
+        catch_up: bool | None = None,
+        max_catch_up_runs: int | None = None,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = batch_size or settings.RECURRING_EXECUTOR_BATCH_SIZE
+        self.catch_up = settings.RECURRING_EXECUTOR_CATCH_UP if catch_up is None else catch_up
+        self.max_catch_up_runs = max_catch_up_runs or settings.RECURRING_EXECUTOR_MAX_CATCH_UP_RUNS
+        self.metrics = RecurringExecutorMetrics()
+
+    def metrics_snapshot(self) -> dict:
+        return asdict(self.metrics)
+
+    async def run_once(self, as_of: date | None = None) -> int:
+        """
+        Drains every template due on `as_of` (today by default).
+
+        Returns:
+            Number of occurrences executed successfully.
+        """
+        as_of = as_of or date.today()
+        executed = 0
+        while True:
+            started = time.perf_counter()
+            async with self._session_factory() as session:
+                batch = await execute_due_recurring_transactions(
+                    session,
+                    as_of=as_of,
+                    batch_size=self.batch_size,
+                    catch_up=self.catch_up,
+                    max_catch_up_runs=self.max_catch_up_runs,
+                )
+            elapsed = time.perf_counter() - started
+            self._record(batch, elapsed)
+            executed += batch.executed
+            if batch.claimed < self.batch_size:
+                return executed
+
+    def _record(self, batch: RecurringBatchResult, elapsed: float) -> None:
+        now = datetime.now(timezone.utc)
+        self.metrics.last_run_at = now
+        if not batch.claimed:
+            self.metrics.lag_seconds = 0.0
+            return
+        self.metrics.batches += 1
+        self.metrics.executed += batch.executed
+        self.metrics.failed += batch.failed
+        self.metrics.last_batch_seconds = elapsed
+        self.metrics.throughput_per_second = (batch.executed + batch.failed) / elapsed if elapsed else 0.0
+        due_since = datetime.combine(batch.oldest_due_date, dt_time.min, tzinfo=timezone.utc)
+        self.metrics.lag_seconds = max((now - due_since).total_seconds(), 0.0)
+        logger.info(
+            f"Recurring batch: claimed={batch.claimed} executed={batch.executed} "
+            f"failed={batch.failed} in {elapsed:.3f}s, lag={self.metrics.lag_seconds:.0f}s"
+        )
+
+
+recurring_executor = RecurringTransactionExecutor()
+register_metrics("recurring_executor", recurring_executor.metrics_snapshot)
+
+
+async def main():
+    await run_periodically(
+        "recurring-transactions",
+        recurring_executor.run_once,
+        settings.RECURRING_EXECUTOR_INTERVAL_SECONDS,
+        asyncio.Event(),
+    )
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
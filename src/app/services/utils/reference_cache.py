@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.persistence.categories.categories import Category
+from app.persistence.currencies.currency import Currency
+from app.persistence.db import AsyncSessionLocal
+from app.services.utils.metrics import register_metrics
+from app.services.utils.notifications import notify
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_DATA_CHANNEL = "reference_data_changed"
+
+
+@dataclass(frozen=True)
+class DefaultCategory:
+    id: UUID
+    name: str
+
+
+class ReferenceDataCache:
+    """
+    In-process copy of the currencies and the default categories.
+
+    Lookups are answered from memory while the snapshot is younger than
+    REFERENCE_CACHE_TTL_SECONDS and return None otherwise, in which case the
+    callers query the database as before. The snapshot is loaded in lifespan,
+    refreshed by a background job and dropped on every worker when a
+    reference_data_changed notification arrives.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal, ttl_seconds: float | None = None):
+        self._session_factory = session_factory
+        self.ttl_seconds = settings.REFERENCE_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._currency_ids: dict[str, UUID] = {}
+        self._currency_codes: dict[UUID, str] = {}
+        self._default_categories: dict[str, DefaultCategory] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    async def load(self, db: AsyncSession) -> None:
+        currencies = (await db.execute(select(Currency.id, Currency.code))).all()
+        categories = (await db.execute(
+            select(Category.id, Category.name).where(
+                Category.is_default.is_(True),
+                Category.user_id.is_(None),
+                Category.is_deleted.is_(False),
+            )
+        )).all()
+        self._currency_ids = {row.code: row.id for row in currencies}
+        self._currency_codes = {row.id: row.code for row in currencies}
+        self._default_categories = {row.name: DefaultCategory(id=row.id, name=row.name) for row in categories}
+        self._loaded_at = time.monotonic()
+        self.reloads += 1
+
+    async def reload(self) -> None:
+        async with self._lock:
+            async with self._session_factory() as session:
+                await self.load(session)
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    async def on_notification(self, payload: str) -> None:
+        self.invalidate()
+        try:
+            await self.reload()
+        except Exception:
+            logger.exception("Reloading reference data failed; falling back to the database until the next refresh")
+
+    def _lookup(self, mapping: dict, key):
+        if not self.is_fresh():
+            self.misses += 1
+            return None
+        value = mapping.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def currency_id(self, code: str) -> UUID | None:
+        return self._lookup(self._currency_ids, code)
+
+    def currency_code(self, currency_id: UUID) -> str | None:
+        return self._lookup(self._currency_codes, currency_id)
+
+    def default_category(self, name: str) -> DefaultCategory | None:
+        return self._lookup(self._default_categories, name)
+
+    def metrics_snapshot(self) -> dict:
+        return {
+            "fresh": self.is_fresh(),
+            "currencies": len(self._currency_ids),
+            "default_categories": len(self._default_categories),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+        }
+
+
+async def notify_reference_data_changed(db: AsyncSession) -> None:
+    """
+    Call in the transaction that changes currencies or default categories.
+    Every worker, including this one, reloads after the commit.
+    """
+    await notify(db, REFERENCE_DATA_CHANNEL)
+
+
+reference_cache = ReferenceDataCache()
+register_metrics("reference_cache", reference_cache.metrics_snapshot)
@@ -1,5 +1,12 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+
 import bcrypt
 
+from app.core.config import settings
+from app.services.utils.metrics import register_metrics
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         password=plain_password.encode('utf-8'),
@@ -7,9 +14,92 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     )
 
 
-def get_password_hash(password: str) -> str:
-    password_salt = bcrypt.gensalt(14)
+def get_password_hash(password: str, rounds: int | None = None) -> str:
+    password_salt = bcrypt.gensalt(rounds or settings.PASSWORD_HASH_ROUNDS)
     return bcrypt.hashpw(
         password.encode('utf-8'),
         password_salt
     ).decode('utf-8')
+
+
+def get_hash_rounds(hashed_password: str) -> int | None:
+    """
+    Reads the cost from a modular crypt bcrypt hash ("$2b$14$...").
+    """
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification off the event loop.
+
+    Work goes to a ProcessPoolExecutor of PASSWORD_HASH_WORKERS processes
+    (the default thread pool when it is 0). At most
+    PASSWORD_HASH_MAX_CONCURRENCY calls are submitted at once; the rest wait
+    on a semaphore and are reported as queued by metrics_snapshot().
+    """
+
+    def __init__(self, workers: int | None = None, max_concurrency: int | None = None, rounds: int | None = None):
+        self.workers = settings.PASSWORD_HASH_WORKERS if workers is None else workers
+        self.max_concurrency = settings.PASSWORD_HASH_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+        self.rounds = rounds or settings.PASSWORD_HASH_ROUNDS
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rehashed = 0
+
+    def _get_executor(self) -> Executor | None:
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return get_hash_rounds(hashed_password) != self.rounds
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def metrics_snapshot(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "rounds": self.rounds,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rehashed": self.rehashed,
+        }
+
+
+password_hasher = PasswordHasher()
+register_metrics("password_hasher", password_hasher.metrics_snapshot)
@@ -0,0 +1,14 @@
+LIKE_ESCAPE = "\\"
+
+
+def escape_like(term: str) -> str:
+    """Escapes the LIKE wildcards in user input, so they match literally."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def contains_pattern(term: str) -> str:
+    return f"%{escape_like(term)}%"
+
+
+def prefix_pattern(term: str) -> str:
+    return f"{escape_like(term)}%"
@@ -0,0 +1,52 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.services.utils.metrics import register_metrics
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of access tokens whose signature has already been verified,
+    keyed by the SHA-256 of the encoded token and kept until the token's
+    own "exp". A hit skips signature verification and claim decoding.
+    """
+
+    def __init__(self, max_size: int | None = None):
+        self.max_size = settings.TOKEN_CACHE_MAX_SIZE if max_size is None else max_size
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> dict | None:
+        digest = self._digest(token)
+        payload = self._entries.get(digest)
+        if payload is None or payload["exp"] <= time.time():
+            if payload is not None:
+                del self._entries[digest]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        if self.max_size <= 0 or not isinstance(payload.get("exp"), int | float):
+            return
+        digest = self._digest(token)
+        self._entries[digest] = payload
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def metrics_snapshot(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+verified_token_cache = VerifiedTokenCache()
+register_metrics("verified_token_cache", verified_token_cache.metrics_snapshot)
@@ -7,12 +7,15 @@ from app.core.config import settings
 from app.schemas.token import TokenResponse,TokenCollection
 from sqlalchemy import select
 from app.persistence.users.users import User
+from app.persistence.refresh_tokens.refresh_token import RefreshToken
 from app.persistence.db import get_session
 from app.services.utils.processors import process_db_transaction
+from app.services.utils.principal_cache import principal_cache
+from app.services.utils.token_cache import verified_token_cache
 from app.schemas.user import UserResponse
-from fastapi import Cookie,Depends
-from typing import Annotated
-from app.api.exceptions import UserUnauthorized
+from fastapi import Cookie,Depends,Request
+from typing import Annotated,Callable
+from app.api.exceptions import UserForbidden,UserUnauthorized
 
 import uuid
 
@@ -43,15 +46,17 @@ async def create_access_token(user_id:uuid.UUID,is_admin:bool)->TokenResponse:
                          token_type="access",
                          expiry=expiry)
 
-async def create_refresh_token(user_id:uuid.UUID,is_admin:bool)->TokenResponse:
+async def create_refresh_token(user_id:uuid.UUID,is_admin:bool,jti:uuid.UUID,family_id:uuid.UUID)->TokenResponse:
     """
     Args:
         user_id: ID of the user for whom the Token is created
         is_admin: Boolean value True or False indicating whether the user is
                   a regular user or an admin
+        jti: Unique ID of this refresh token, recorded in refresh_tokens
+        family_id: ID shared by all refresh tokens rotated from one login
 
-    The expiry,algorithm and encryption key of the Token are
-    configured in the src.app.core.config.py file.
+    Refresh tokens are signed with REFRESH_TOKEN_SECRET_KEY, so they are
+    never accepted as access tokens.
 
     Returns: An object indicating the type of Token, in this case "refresh"
              and the encoded payload of the token
@@ -61,12 +66,15 @@ async def create_refresh_token(user_id:uuid.UUID,is_admin:bool)->TokenResponse:
     data_to_encode = {
         "sub":str(user_id),
         "exp":expiry,
-        "admin":is_admin
+        "admin":is_admin,
+        "type":"refresh",
+        "jti":str(jti),
+        "fam":str(family_id)
     }
-    encoded_access_token_data = jwt.encode( claims=data_to_encode,
-                                            key=settings.ACCESS_TOKEN_SECRET_KEY,
-                                            algorithm=settings.TOKEN_ALGORITHM )
-    return TokenResponse(access_token=encoded_access_token_data,
+    encoded_refresh_token_data = jwt.encode( claims=data_to_encode,
+                                             key=settings.REFRESH_TOKEN_SECRET_KEY,
+                                             algorithm=settings.TOKEN_ALGORITHM )
+    return TokenResponse(access_token=encoded_refresh_token_data,
                         token_type="refresh",
                         expiry=expiry)
 
@@ -82,7 +90,12 @@ async def decode_access_token(encoded_token_data:str)->bool|dict:
             sub : ID of the user
             exp : Expiry of the Token
             admin : True or False , indicating whether the user is an admin or not
+        Tokens verified before are answered from the verified token cache
+        until they expire.
     """
+    token_payload = verified_token_cache.get(encoded_token_data)
+    if token_payload is not None:
+        return token_payload
     try:
         token_payload = jwt.decode(token=encoded_token_data,
                                    key=settings.ACCESS_TOKEN_SECRET_KEY,
@@ -91,160 +104,183 @@ async def decode_access_token(encoded_token_data:str)->bool|dict:
         return False
     if not token_payload:
         return False
+    verified_token_cache.put(encoded_token_data, token_payload)
     return token_payload
 
-async def decode_refresh_token(encoded_token_data:str)->bool|TokenResponse:
+async def decode_refresh_token(encoded_token_data:str)->bool|dict:
     """
     Args:
-        encoded_token_data: The encoded token data received from the cookie which has been set
-        during login.
+        encoded_token_data: The encoded token data received from the
+        "refresh_token" cookie.
     Returns:
-        Boolean ( False ) if there is an error while encoding, the Token has expired or data is
-        corrupted in some way.
-        Token which is a renewed access Token.
+        Boolean ( False ) if the signature is invalid, the Token has expired,
+        it is not a refresh token or a claim is missing.
+        Dictionary with the sub, admin, jti and fam claims otherwise.
     """
     try:
         token_payload = jwt.decode(token=encoded_token_data,
-                                   key=settings.ACCESS_TOKEN_SECRET_KEY,
+                                   key=settings.REFRESH_TOKEN_SECRET_KEY,
                                    algorithms=[settings.TOKEN_ALGORITHM])
     except JWTError:
         return False
-    if not token_payload:
+    if not token_payload or token_payload.get("type") != "refresh":
         return False
-    decoded_user_id:uuid.UUID|None = token_payload.get("sub",None)
-    decoded_is_admin:bool|None = token_payload.get("admin",None)
-    if decoded_user_id is None or decoded_is_admin is None:
+    try:
+        for claim in ("sub","jti","fam"):
+            token_payload[claim] = uuid.UUID(str(token_payload.get(claim)))
+    except ValueError:
         return False
-    return await create_access_token(decoded_user_id,decoded_is_admin)
+    return token_payload
 
-async def create_tokens(user_id:uuid.UUID,is_admin:bool)->TokenCollection:
+async def create_tokens(user_id:uuid.UUID,is_admin:bool,session:AsyncSession,family_id:uuid.UUID|None=None)->TokenCollection:
     """
     Args:
         user_id: ID of the user for whom the Token is created
         is_admin: Boolean value True or False indicating whether the user is
                   a regular user or an admin
+        session: The refresh token is recorded in this session; the caller
+                 commits it
+        family_id: Family of the refresh token being rotated, None on login
 
     Returns:
         A collection containing both access and refresh tokens
 
     """
+    jti = uuid.uuid4()
+    family_id = family_id or uuid.uuid4()
+    refresh = await create_refresh_token(user_id=user_id,is_admin=is_admin,jti=jti,family_id=family_id)
+    session.add(RefreshToken(jti=jti,family_id=family_id,user_id=user_id,expires_at=refresh.expiry))
     return TokenCollection(
         access=await create_access_token(user_id=user_id,is_admin=is_admin),
-        refresh=await create_refresh_token(user_id=user_id,is_admin=is_admin)
+        refresh=refresh
     )
 
-async def get_current_user(session:Annotated[AsyncSession,Depends(get_session)],access_token:Annotated[str|None,Cookie()]=None)->UserResponse|bool|dict:
+async def resolve_principal(session:AsyncSession,access_token:str|None)->UserResponse:
     """
-
     Args:
-        session:
-        access_token:
+        session: Session used only when the principal is not cached
+        access_token: Encoded access token from the "access_token" cookie
 
     Returns:
-
-
+        The UserResponse of the token's subject, from the principal cache when
+        possible and from the users table otherwise.
     """
     if not access_token:
         raise UserUnauthorized()
     token_data = await decode_access_token(access_token)
     if not token_data:
         raise UserUnauthorized()
+    try:
+        user_id = uuid.UUID(str(token_data.get("sub")))
+    except ValueError:
+        raise UserUnauthorized()
+    cached_user = principal_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+
     async def _get_current_user_from_db():
-        statement = select(User).where(User.id==token_data.get("sub"))
+        statement = select(User).where(User.id==user_id)
         result = await session.execute(statement)
-        user_object = result.scalar_one_or_none()
-        if not user_object:
-            raise UserUnauthorized()
-        return UserResponse(
-            id = user_object.id,
-            username=user_object.username,
-            is_blocked=user_object.is_blocked,
-            is_verified=user_object.is_verified,
-            is_activated=user_object.is_activated,
-            is_admin=user_object.is_admin,
-            avatar=user_object.avatar
-        )
-
-    return await process_db_transaction(
+        return result.scalar_one_or_none()
+
+    user_object = await process_db_transaction(
         transaction_func=_get_current_user_from_db,
         session=session,
     )
+    if not user_object:
+        raise UserUnauthorized()
+    current_user = UserResponse(
+        id = user_object.id,
+        username=user_object.username,
+        is_blocked=user_object.is_blocked,
+        is_verified=user_object.is_verified,
+        is_activated=user_object.is_activated,
+        is_admin=user_object.is_admin,
+        avatar=user_object.avatar
+    )
+    principal_cache.put(current_user)
+    return current_user
 
-async def user_can_interact(session:Annotated[AsyncSession,Depends(get_session)],access_token:Annotated[str|None,Cookie()]=None)->bool:
+async def get_current_user(request:Request,
+                           session:Annotated[AsyncSession,Depends(get_session)],
+                           access_token:Annotated[str|None,Cookie()]=None)->UserResponse:
     """
+    The single authorization dependency. The principal is resolved once per
+    request and kept on request.state, so every other dependency and route
+    reads it from there instead of opening its own session.
+
     Args:
-        session:
+        request: The incoming request
+        session: The request's session, used only on a principal cache miss
         access_token: Gets the __HTTP-Only__ "access_token" cookie set
         during login
 
     Returns:
-        A boolean representation indicating whether the user can "interact" with
-        the functionality
+        The authenticated user
     """
-    if not access_token:
-        raise UserUnauthorized()
-    session_generator = get_session()
-    session = await anext(session_generator)
-    token_data = await decode_access_token(access_token)
-    if not token_data:
-        raise UserUnauthorized()
+    current_user = getattr(request.state, "principal", None)
+    if current_user is None:
+        current_user = await resolve_principal(session, access_token)
+        request.state.principal = current_user
+    return current_user
 
-    async def _get_current_user_from_db():
-        statement = select(User).where(User.id == token_data.get("sub"))
-        result = await session.execute(statement)
-        user_object = result.scalar_one_or_none()
-        if not user_object:
-            raise UserUnauthorized()
-        if user_object.is_activated and user_object.is_verified:
-            return True
-        return False
+CurrentPrincipal = Annotated[UserResponse, Depends(get_current_user)]
 
-    return await process_db_transaction(
-        session=session,
-        transaction_func=_get_current_user_from_db
-    )
+CAPABILITIES: dict[str, Callable[[UserResponse], bool]] = {
+    "activated": lambda user: user.is_activated,
+    "verified": lambda user: user.is_verified,
+    "not_blocked": lambda user: not user.is_blocked,
+    "admin": lambda user: user.is_admin,
+}
 
-async def user_can_make_transactions(session:Annotated[AsyncSession,Depends(get_session)],access_token:Annotated[str|None,Cookie()]=None)->bool:
+def has_capabilities(user:UserResponse,*capabilities:str)->bool:
     """
     Args:
-        session:
-        access_token: Gets the __HTTP-Only__ "access_token" cookie set
-        during login
+        user: The authenticated user
+        capabilities: Names from CAPABILITIES
 
     Returns:
-        A boolean representation indicating whether the user can perform money
-        transactions
+        True if the user has every one of the capabilities
     """
-    if not access_token:
-        raise UserUnauthorized()
-    session_generator = get_session()
-    session = await anext(session_generator)
-    token_data = await decode_access_token(access_token)
-    if not token_data:
-        raise UserUnauthorized()
+    return all(CAPABILITIES[capability](user) for capability in capabilities)
 
-    async def _get_current_user_from_db():
-        statement = select(User).where(User.id == token_data.get("sub"))
-        result = await session.execute(statement)
-        user_object = result.scalar_one_or_none()
-        if not user_object:
-            raise UserUnauthorized()
-        if (user_object.is_activated and
-                user_object.is_verified and
-                not user_object.is_blocked):
-            return True
-        return False
+def require_capabilities(*capabilities:str)->Callable:
+    """
+    Builds a dependency that lets the request through only if the principal
+    has every one of the capabilities, e.g.
+    Depends(require_capabilities("activated", "verified")).
 
-    return await process_db_transaction(
-        session=session,
-        transaction_func=_get_current_user_from_db
-    )
+    Returns:
+        The dependency, which returns the principal
+    """
+    unknown = set(capabilities) - CAPABILITIES.keys()
+    if unknown:
+        raise ValueError(f"Unknown capabilities: {sorted(unknown)}")
+
+    async def _require(current_user:CurrentPrincipal)->UserResponse:
+        if not has_capabilities(current_user, *capabilities):
+            raise UserForbidden()
+        return current_user
+
+    return _require
+
+async def user_can_interact(current_user:CurrentPrincipal)->bool:
+    """
+    Returns:
+        A boolean representation indicating whether the user can "interact" with
+        the functionality
+    """
+    return has_capabilities(current_user, "activated", "verified")
+
+async def user_can_make_transactions(current_user:CurrentPrincipal)->bool:
+    """
+    Returns:
+        A boolean representation indicating whether the user can perform money
+        transactions
+    """
+    return has_capabilities(current_user, "activated", "verified", "not_blocked")
 
-async def admin_status(
-    session: Annotated[AsyncSession, Depends(get_session)],
-    access_token: Annotated[str|None, Cookie()] = None,
-) -> bool:
-    user = await get_current_user(session, access_token)
-    if user.is_admin == False:
+async def admin_status(current_user:CurrentPrincipal) -> bool:
+    if not has_capabilities(current_user, "admin"):
         raise UserUnauthorized()
-    return user.is_admin
\ No newline at end of file
+    return True
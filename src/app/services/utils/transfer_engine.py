@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import random
+from decimal import Decimal
+from typing import Awaitable, Callable, Iterable, TypeVar
+from uuid import UUID
+
+from sqlalchemy import Numeric, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.exceptions import InsufficientFunds
+from app.core.config import settings
+from app.persistence.balances.balance import Balance
+from app.services.ledger_service import post_transfer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# serialization_failure and deadlock_detected
+RETRYABLE_SQLSTATES = frozenset({"40001", "40P01"})
+
+
+async def _debit(db: AsyncSession, balance_id: UUID, amount: Decimal) -> Decimal:
+    result = await db.execute(
+        update(Balance)
+        .where(Balance.id == balance_id, Balance.amount >= amount)
+        .values(amount=Balance.amount - amount)
+        .returning(Balance.amount)
+        .execution_options(synchronize_session="fetch")
+    )
+    new_amount = result.scalar_one_or_none()
+    if new_amount is None:
+        raise InsufficientFunds()
+    return new_amount
+
+
+async def _credit(db: AsyncSession, balance_id: UUID, amount: Decimal) -> Decimal:
+    result = await db.execute(
+        update(Balance)
+        .where(Balance.id == balance_id)
+        .values(amount=Balance.amount + amount)
+        .returning(Balance.amount)
+        .execution_options(synchronize_session="fetch")
+    )
+    return result.scalar_one()
+
+
+async def move_funds(
+    db: AsyncSession,
+    sender_balance_id: UUID,
+    receiver_balance_id: UUID,
+    amount: Decimal,
+    transaction_id: UUID | None = None,
+) -> tuple[Decimal, Decimal]:
+    """
+    Moves funds between two balances inside the caller's transaction and
+    records the debit and the credit in the ledger.
+
+    The debit is a single guarded statement
+    (UPDATE ... WHERE amount >= :amount RETURNING amount), so the funds check
+    and the write cannot be interleaved with a concurrent transfer. Both rows
+    are always written in ascending balance id order, which gives every
+    transfer the same lock order and rules out deadlocks between A->B and B->A.
+
+    Args:
+        db: Session holding the open transaction. The caller commits.
+        sender_balance_id: ID of the balance that is debited.
+        receiver_balance_id: ID of the balance that is credited.
+        amount: Positive amount to move.
+        transaction_id: Transaction the movement belongs to, stored on the
+                        ledger entries.
+
+    Returns:
+        The new sender and receiver amounts.
+
+    Raises:
+        InsufficientFunds: If the sender balance does not cover the amount.
+    """
+    if sender_balance_id <= receiver_balance_id:
+        sender_amount = await _debit(db, sender_balance_id, amount)
+        receiver_amount = await _credit(db, receiver_balance_id, amount)
+    else:
+        receiver_amount = await _credit(db, receiver_balance_id, amount)
+        sender_amount = await _debit(db, sender_balance_id, amount)
+    await post_transfer(db, sender_balance_id, receiver_balance_id, amount,
+                        sender_amount, receiver_amount, transaction_id)
+    return sender_amount, receiver_amount
+
+
+async def credit_balance(db: AsyncSession, balance_id: UUID, amount: Decimal) -> Decimal:
+    """
+    Adds amount to a balance inside the caller's transaction with a single
+    UPDATE ... SET amount = amount + :amount RETURNING amount, and returns
+    the new amount. The caller records the ledger entry and commits.
+    """
+    return await _credit(db, balance_id, amount)
+
+
+async def lock_balances(db: AsyncSession, balance_ids: Iterable[UUID]) -> dict[UUID, Decimal]:
+    """
+    Locks the given balances with SELECT ... FOR UPDATE, in the same ascending
+    id order move_funds writes in, and returns their current amounts.
+    """
+    result = await db.execute(
+        select(Balance.id, Balance.amount)
+        .where(Balance.id.in_(list(balance_ids)))
+        .order_by(Balance.id)
+        .with_for_update()
+    )
+    return {row.id: row.amount for row in result}
+
+
+async def apply_balance_deltas(db: AsyncSession, deltas: dict[UUID, Decimal]) -> None:
+    """
+    Applies many balance changes with one set-based statement:
+    UPDATE balances SET amount = amount + d.delta FROM (VALUES ...) AS d(id, delta).
+
+    The balances are expected to be locked with lock_balances and the deltas
+    checked against the locked amounts by the caller.
+    """
+    deltas = {balance_id: delta for balance_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    delta_rows = values(
+        column("id", PG_UUID(as_uuid=True)),
+        column("delta", Numeric),
+        name="deltas",
+    ).data(list(deltas.items()))
+    await db.execute(
+        update(Balance)
+        .where(Balance.id == delta_rows.c.id)
+        .values(amount=Balance.amount + delta_rows.c.delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def ensure_balance(db: AsyncSession, user_id: UUID, currency_id: UUID) -> UUID:
+    """
+    Returns the id of the user's balance in the given currency, creating an
+    empty one if needed. Concurrent creators are resolved by the
+    uix_user_currency constraint instead of failing with an IntegrityError.
+    """
+    await db.execute(
+        insert(Balance)
+        .values(user_id=user_id, currency_id=currency_id, amount=Decimal("0.0"))
+        .on_conflict_do_nothing(constraint="uix_user_currency")
+    )
+    result = await db.execute(
+        select(Balance.id).where(
+            Balance.user_id == user_id,
+            Balance.currency_id == currency_id,
+        )
+    )
+    return result.scalar_one()
+
+
+def is_retryable_error(error: DBAPIError) -> bool:
+    sqlstate = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    return sqlstate in RETRYABLE_SQLSTATES
+
+
+async def run_with_retries(
+    db: AsyncSession,
+    operation: Callable[[], Awaitable[T]],
+    attempts: int | None = None,
+) -> T:
+    """
+    Runs a money-moving unit of work, retrying it from the start when the
+    database aborts it with a serialization failure or a deadlock.
+
+    Args:
+        db: Session used by the operation. It is rolled back before each retry.
+        operation: Coroutine function that performs the whole transaction,
+                   including the commit.
+        attempts: Maximum number of attempts, defaults to TRANSFER_MAX_ATTEMPTS.
+
+    Returns:
+        Whatever the operation returns.
+    """
+    attempts = attempts or settings.TRANSFER_MAX_ATTEMPTS
+    for attempt in range(1, attempts + 1):
+        try:
+            return await operation()
+        except DBAPIError as e:
+            await db.rollback()
+            if attempt == attempts or not is_retryable_error(e):
+                raise
+            logger.warning(f"Retrying transfer after {e.orig!r} (attempt {attempt}/{attempts})")
+            backoff = settings.TRANSFER_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.5))
+        except Exception:
+            await db.rollback()
+            raise
@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import shutil
+from datetime import timedelta
+from pathlib import Path
+from uuid import UUID
+
+import httpx
+from fastapi import UploadFile
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.exceptions import VerificationDocumentTooLarge, VerificationJobNotFound
+from app.core.config import settings
+from app.persistence.db import AsyncSessionLocal
+from app.persistence.users.users import User
+from app.persistence.verification_jobs.verification_job import VerificationJob
+from app.schemas.user import UserResponse
+from app.schemas.verification import VerificationJobResponse
+from app.services.utils.metrics import register_metrics
+from app.services.utils.principal_cache import notify_principal_changed, principal_cache
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+VERIFIED = "verified"
+REJECTED = "rejected"
+FAILED = "failed"
+
+DOCUMENTS = ("id_document", "selfie")
+
+_SPOOL_CHUNK_BYTES = 64 * 1024
+
+
+class VerificationProviderError(Exception):
+    """Raised when the provider could not give an answer; the job is retried."""
+
+
+class VerificationClient:
+    """
+    Posts documents to VERIFICATION_API_URL through one pooled AsyncClient
+    with VERIFICATION_TIMEOUT_SECONDS and VERIFICATION_MAX_CONNECTIONS.
+    """
+
+    def __init__(self, url: str | None = None):
+        self.url = url or settings.VERIFICATION_API_URL
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.VERIFICATION_TIMEOUT_SECONDS, connect=5),
+                limits=httpx.Limits(
+                    max_connections=settings.VERIFICATION_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.VERIFICATION_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def verify(self, documents: dict[str, Path]) -> bool:
+        """
+        Returns:
+            True if the provider accepted the documents, False if it
+            rejected them.
+
+        Raises:
+            VerificationProviderError: On transport errors and 5xx responses.
+        """
+        handles = {name: path.open("rb") for name, path in documents.items()}
+        try:
+            response = await self._get_client().post(
+                self.url, files={name: (name, handle) for name, handle in handles.items()}
+            )
+        except httpx.HTTPError as e:
+            raise VerificationProviderError(repr(e))
+        finally:
+            for handle in handles.values():
+                handle.close()
+        if response.status_code >= 500:
+            raise VerificationProviderError(f"Verification provider responded {response.status_code}")
+        return response.status_code < 400
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _job_dir(job_id: UUID) -> Path:
+    return Path(settings.VERIFICATION_SPOOL_DIR) / str(job_id)
+
+
+def _copy_upload(source, target: Path, max_bytes: int) -> None:
+    written = 0
+    with target.open("wb") as out:
+        while chunk := source.read(_SPOOL_CHUNK_BYTES):
+            written += len(chunk)
+            if written > max_bytes:
+                raise VerificationDocumentTooLarge()
+            out.write(chunk)
+
+
+async def spool_documents(job_id: UUID, uploads: dict[str, UploadFile]) -> None:
+    """
+    Copies the uploads to VERIFICATION_SPOOL_DIR in a worker thread, chunk by
+    chunk, so the documents outlive the request without being held in memory.
+    The spool directory must be shared by every instance that runs jobs.
+    """
+    job_dir = _job_dir(job_id)
+
+    def _spool():
+        job_dir.mkdir(parents=True, exist_ok=True)
+        for name, upload in uploads.items():
+            upload.file.seek(0)
+            _copy_upload(upload.file, job_dir / name, settings.VERIFICATION_MAX_DOCUMENT_BYTES)
+
+    try:
+        await asyncio.to_thread(_spool)
+    except BaseException:
+        await asyncio.to_thread(shutil.rmtree, job_dir, True)
+        raise
+
+
+async def submit_verification(
+    session: AsyncSession,
+    current_user: UserResponse,
+    id_document: UploadFile,
+    selfie: UploadFile,
+) -> VerificationJobResponse:
+    """
+    Records a verification job, spools the documents and schedules the call
+    to the provider. The client polls the returned job for the outcome.
+    """
+    job = VerificationJob(user_id=current_user.id, status=PENDING)
+    session.add(job)
+    await session.flush()
+    try:
+        await spool_documents(job.id, {"id_document": id_document, "selfie": selfie})
+    except BaseException:
+        await session.rollback()
+        raise
+    await session.commit()
+    await session.refresh(job)
+    verification_runner.schedule(job.id)
+    return VerificationJobResponse.model_validate(job, from_attributes=True)
+
+
+async def get_verification_job(session: AsyncSession, current_user: UserResponse, job_id: UUID) -> VerificationJobResponse:
+    result = await session.execute(
+        select(VerificationJob).where(VerificationJob.id == job_id, VerificationJob.user_id == current_user.id)
+    )
+    job = result.scalar_one_or_none()
+    if job is None:
+        raise VerificationJobNotFound()
+    return VerificationJobResponse.model_validate(job, from_attributes=True)
+
+
+async def claim_verification_jobs(db: AsyncSession, limit: int, job_id: UUID | None = None) -> list[UUID]:
+    """
+    Moves due jobs to "processing" and returns their ids. Jobs left in
+    "processing" longer than VERIFICATION_STALE_SECONDS (e.g. by a worker that
+    died) are due again.
+    """
+    stale_before = func.now() - timedelta(seconds=settings.VERIFICATION_STALE_SECONDS)
+    due = (
+        select(VerificationJob.id)
+        .where(or_(
+            and_(VerificationJob.status == PENDING, VerificationJob.next_attempt_at <= func.now()),
+            and_(VerificationJob.status == PROCESSING, VerificationJob.updated_at < stale_before),
+        ))
+        .order_by(VerificationJob.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if job_id is not None:
+        due = due.where(VerificationJob.id == job_id)
+    result = await db.execute(
+        update(VerificationJob)
+        .where(VerificationJob.id.in_(due.scalar_subquery()))
+        .values(status=PROCESSING, attempts=VerificationJob.attempts + 1, updated_at=func.now())
+        .returning(VerificationJob.id)
+    )
+    job_ids = list(result.scalars().all())
+    await db.commit()
+    return job_ids
+
+
+class VerificationRunner:
+    """
+    Sends claimed jobs to the provider, at most VERIFICATION_MAX_CONNECTIONS
+    at a time. New jobs are started right after submission; the periodic
+    run_due() picks up retries and jobs left behind by a restart.
+    """
+
+    def __init__(self, client: VerificationClient | None = None, session_factory: async_sessionmaker = AsyncSessionLocal):
+        self.client = client or VerificationClient()
+        self._session_factory = session_factory
+        self._semaphore: asyncio.Semaphore | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = {"verified": 0, "rejected": 0, "retried": 0, "failed": 0}
+
+    def schedule(self, job_id: UUID) -> None:
+        task = asyncio.create_task(self._claim_and_process(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _claim_and_process(self, job_id: UUID) -> None:
+        async with self._session_factory() as session:
+            claimed = await claim_verification_jobs(session, 1, job_id=job_id)
+        if claimed:
+            await self.process(job_id)
+
+    async def run_due(self) -> None:
+        async with self._session_factory() as session:
+            job_ids = await claim_verification_jobs(session, settings.VERIFICATION_BATCH_SIZE)
+        await asyncio.gather(*(self.process(job_id) for job_id in job_ids))
+
+    async def process(self, job_id: UUID) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.VERIFICATION_MAX_CONNECTIONS)
+        documents = {name: _job_dir(job_id) / name for name in DOCUMENTS}
+        error = None
+        async with self._semaphore:
+            try:
+                accepted = await self.client.verify(documents)
+            except (VerificationProviderError, OSError) as e:
+                accepted, error = None, str(e)
+        try:
+            await self._record_outcome(job_id, accepted, error)
+        except Exception:
+            logger.exception(f"Recording outcome of verification job {job_id} failed")
+
+    async def _record_outcome(self, job_id: UUID, accepted: bool | None, error: str | None) -> None:
+        async with self._session_factory() as session:
+            job = await session.get(VerificationJob, job_id)
+            if accepted is None and job.attempts < settings.VERIFICATION_MAX_ATTEMPTS:
+                delay = settings.VERIFICATION_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+                job.status = PENDING
+                job.last_error = error
+                job.next_attempt_at = func.now() + timedelta(seconds=delay)
+                job.updated_at = func.now()
+                await session.commit()
+                self.stats["retried"] += 1
+                return
+
+            job.status = FAILED if accepted is None else VERIFIED if accepted else REJECTED
+            job.last_error = error
+            job.updated_at = func.now()
+            job.completed_at = func.now()
+            if accepted:
+                await session.execute(update(User).where(User.id == job.user_id).values(is_verified=True))
+                await notify_principal_changed(session, job.user_id)
+            await session.commit()
+            if accepted:
+                principal_cache.invalidate(job.user_id)
+            self.stats[job.status] += 1
+        await asyncio.to_thread(shutil.rmtree, _job_dir(job_id), True)
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.client.close()
+
+    def metrics_snapshot(self) -> dict:
+        return {"in_flight": len(self._tasks), **self.stats}
+
+
+verification_runner = VerificationRunner()
+register_metrics("verification_jobs", verification_runner.metrics_snapshot)
@@ -0,0 +1,46 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def session_factory():
+    """
+    Builds stand-ins for an async_sessionmaker. Calling the returned factory
+    opens an async context manager that yields the session mock; without a
+    session, one with awaitable execute, commit and rollback is created.
+    """
+    def _build(session: MagicMock | None = None) -> tuple[MagicMock, MagicMock]:
+        if session is None:
+            session = MagicMock()
+            session.execute = AsyncMock()
+            session.commit = AsyncMock()
+            session.rollback = AsyncMock()
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=session)
+        context.__aexit__ = AsyncMock(return_value=False)
+        return MagicMock(return_value=context), session
+
+    return _build
+
+
+@pytest.fixture
+def stand_in_server():
+    """
+    Serves a request handler class on a free local port from a background
+    thread and returns the base URL. The servers stop after the test.
+    """
+    servers = []
+
+    def _serve(handler: type[BaseHTTPRequestHandler]) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield _serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
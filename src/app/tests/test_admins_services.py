@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.exceptions import UserNotFound
+from app.services.admins_service import build_users_query, read_users
+from app.services.utils.pagination import decode_cursor
+
+
+def _row(username):
+    values = dict(id=uuid4(), username=username, email=f"{username}@wallet.com", phone="0888123456",
+                  is_blocked=False, is_activated=True, is_verified=True, is_admin=False, avatar=None)
+    return SimpleNamespace(_mapping=values, **values)
+
+
+def _session(rows):
+    result = MagicMock()
+    result.all = MagicMock(return_value=rows)
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_users_query_selects_columns_only():
+    sql = _sql(build_users_query())
+
+    assert "users.password" not in sql
+    assert "users.username" in sql and "users.avatar" in sql
+
+
+def test_users_query_filters_and_searches():
+    stmt = build_users_query(is_blocked=True, is_admin=False, search="50%_off")
+    sql = _sql(stmt)
+    params = stmt.compile(dialect=postgresql.dialect()).params
+
+    assert "users.is_blocked = " in sql and "users.is_admin = " in sql
+    assert "users.is_verified" not in sql.split("WHERE")[1]
+    assert sql.count("ILIKE") == 3
+    assert "%50\\%\\_off%" in params.values()
+
+
+@pytest.mark.asyncio
+async def test_read_users_returns_page_and_cursor():
+    rows = [_row("alice"), _row("bob"), _row("carol")]
+    session = _session(rows)
+
+    page = await read_users(session, limit=2)
+
+    assert [user.username for user in page["users"]] == ["alice", "bob"]
+    assert page["has_next"] is True
+    username, user_id = decode_cursor(page["next_cursor"], "username:asc", (str, lambda v: v))
+    assert username == "bob" and user_id == str(rows[1].id)
+    sql = _sql(session.execute.await_args.args[0])
+    assert "ORDER BY users.username ASC, users.id ASC" in sql
+    assert "LIMIT" in sql
+
+
+@pytest.mark.asyncio
+async def test_read_users_after_cursor_uses_row_comparison():
+    first = await read_users(_session([_row("alice"), _row("bob")]), limit=1)
+    session = _session([_row("bob")])
+
+    page = await read_users(session, cursor=first["next_cursor"], limit=1)
+
+    assert page["has_next"] is False and page["next_cursor"] is None
+    assert "(users.username, users.id) >" in _sql(session.execute.await_args.args[0])
+
+
+@pytest.mark.asyncio
+async def test_read_users_without_matches_raises():
+    with pytest.raises(UserNotFound):
+        await read_users(_session([]), search="nobody")
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+from typing import Annotated
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.persistence.db import get_session
+from app.schemas.user import UserResponse
+from app.services.utils.principal_cache import PrincipalCache
+from app.services.utils.token_functions import (
+    admin_status,
+    get_current_user,
+    require_capabilities,
+    user_can_interact,
+    user_can_make_transactions,
+)
+
+
+def _user_row(**overrides):
+    fields = dict(
+        id=uuid4(), username="alice", is_blocked=False, is_verified=True,
+        is_activated=True, is_admin=False, avatar=None,
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def _client(user_row):
+    """
+    App whose only session source counts checkouts, the way each
+    AsyncSessionLocal() holds one pool connection for the request.
+    """
+    checkouts = {"sessions": 0, "queries": 0}
+
+    async def _counting_session():
+        checkouts["sessions"] += 1
+        session = MagicMock()
+
+        async def _execute(*args, **kwargs):
+            checkouts["queries"] += 1
+            result = MagicMock()
+            result.scalar_one_or_none = MagicMock(return_value=user_row)
+            return result
+
+        session.execute = AsyncMock(side_effect=_execute)
+        session.rollback = AsyncMock()
+        yield session
+
+    app = FastAPI()
+
+    @app.get("/rights")
+    async def _rights(
+        current_user: Annotated[UserResponse, Depends(get_current_user)],
+        interaction_rights: Annotated[bool, Depends(user_can_interact)],
+        transaction_rights: Annotated[bool, Depends(user_can_make_transactions)],
+    ):
+        return {"user": str(current_user.id), "interact": interaction_rights, "transact": transaction_rights}
+
+    @app.get("/verified-only", dependencies=[Depends(require_capabilities("activated", "verified"))])
+    async def _verified_only():
+        return {"ok": True}
+
+    @app.get("/admin-only")
+    async def _admin_only(is_admin: Annotated[bool, Depends(admin_status)]):
+        return {"admin": is_admin}
+
+    app.dependency_overrides[get_session] = _counting_session
+    return TestClient(app, cookies={"access_token": "token"}), checkouts
+
+
+def _patched(user_row):
+    decoded = {"sub": str(user_row.id), "admin": user_row.is_admin}
+    return (
+        patch("app.services.utils.token_functions.decode_access_token", AsyncMock(return_value=decoded)),
+        patch("app.services.utils.token_functions.principal_cache", PrincipalCache(max_size=0, ttl_seconds=0)),
+        patch("app.services.utils.token_functions.get_session", side_effect=AssertionError("second session opened")),
+    )
+
+
+def test_one_checkout_and_one_query_per_request():
+    row = _user_row(is_blocked=True)
+    client, checkouts = _client(row)
+    decode, cache, get_session_guard = _patched(row)
+
+    with decode, cache, get_session_guard:
+        response = client.get("/rights")
+
+    assert response.status_code == 200
+    assert response.json() == {"user": str(row.id), "interact": True, "transact": False}
+    assert checkouts == {"sessions": 1, "queries": 1}
+
+
+def test_capability_checks_reject_without_further_queries():
+    row = _user_row(is_verified=False)
+    client, checkouts = _client(row)
+    decode, cache, get_session_guard = _patched(row)
+
+    with decode, cache, get_session_guard:
+        assert client.get("/verified-only").status_code == 403
+        assert client.get("/admin-only").status_code == 401
+
+    assert checkouts == {"sessions": 2, "queries": 2}
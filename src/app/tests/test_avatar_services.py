@@ -0,0 +1,121 @@
+import io
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from PIL import Image
+
+from app.api.exceptions import AvatarInvalid
+from app.schemas.service_result import AvatarUpdateResult
+from app.services import users_service
+from app.services.avatar_service import AvatarPipeline, render_avatar
+from app.services.utils.avatar_storage import LocalAvatarStorage
+
+
+def _png(width=300, height=200, color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_render_avatar_produces_square_webp_renditions():
+    rendered = render_avatar(_png(), (256, 64), max_pixels=1_000_000)
+
+    for size, content in rendered.items():
+        with Image.open(io.BytesIO(content)) as image:
+            assert image.format == "WEBP"
+            assert image.size == (size, size)
+
+
+@pytest.mark.asyncio
+async def test_upload_is_stored_once_and_applied_after_request(tmp_path, session_factory):
+    factory, session = session_factory()
+    pipeline = AvatarPipeline(
+        storage=LocalAvatarStorage(root=str(tmp_path), base_url="/media/avatars"),
+        session_factory=factory,
+        workers=1,
+    )
+    user_id, content = uuid4(), _png()
+    try:
+        content_hash = pipeline.submit(user_id, content)
+        session.execute.assert_not_awaited()
+        await pipeline.drain()
+        pipeline.submit(uuid4(), content)
+        await pipeline.drain()
+    finally:
+        await pipeline.shutdown()
+
+    assert sorted(p.name for p in (tmp_path / "avatars").iterdir()) == [
+        f"{content_hash}_256.webp", f"{content_hash}_64.webp",
+    ]
+    update_stmt = session.execute.await_args_list[0].args[0]
+    assert update_stmt.compile().params["avatar"] == f"/media/avatars/avatars/{content_hash}_256.webp"
+    assert pipeline.metrics_snapshot() == {"pending": 0, "completed": 2, "deduplicated": 1, "failed": 0}
+
+
+@pytest.mark.asyncio
+async def test_only_latest_upload_of_user_is_applied(tmp_path, session_factory):
+    factory, session = session_factory()
+    pipeline = AvatarPipeline(storage=LocalAvatarStorage(root=str(tmp_path)), session_factory=factory, workers=0)
+    user_id = uuid4()
+
+    pipeline.submit(user_id, _png(color=(0, 0, 0)))
+    latest = pipeline.submit(user_id, _png(color=(255, 255, 255)))
+    await pipeline.drain()
+
+    applied = [call.args[0].compile().params.get("avatar") for call in session.execute.await_args_list
+               if "avatar" in call.args[0].compile().params]
+    assert applied == [f"/media/avatars/avatars/{latest}_256.webp"]
+
+
+@pytest.mark.asyncio
+async def test_upload_removed_while_rendering_is_not_applied(tmp_path, session_factory):
+    factory, session = session_factory()
+    pipeline = AvatarPipeline(storage=LocalAvatarStorage(root=str(tmp_path)), session_factory=factory, workers=0)
+    user_id = uuid4()
+
+    pipeline.submit(user_id, _png())
+    pipeline.cancel(user_id)
+    await pipeline.drain()
+
+    session.execute.assert_not_awaited()
+    assert pipeline.metrics_snapshot()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_removal_after_the_rendering_rolls_back_the_update(tmp_path, session_factory):
+    factory, session = session_factory()
+    pipeline = AvatarPipeline(storage=LocalAvatarStorage(root=str(tmp_path)), session_factory=factory, workers=0)
+    user_id = uuid4()
+    # The removal lands while the avatar update is on its way to the database.
+    session.execute.side_effect = lambda *args: pipeline._latest.pop(user_id, None)
+
+    pipeline.submit(user_id, _png())
+    await pipeline.drain()
+
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
+    assert pipeline.completed == 0
+
+
+@pytest.mark.asyncio
+async def test_removing_the_avatar_cancels_a_pending_upload(monkeypatch):
+    pipeline = MagicMock()
+    monkeypatch.setattr(users_service, "avatar_pipeline", pipeline)
+    monkeypatch.setattr(users_service, "notify_principal_changed", AsyncMock())
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=MagicMock(rowcount=1))
+    session.commit = AsyncMock()
+    current_user = MagicMock(id=uuid4())
+
+    result = await users_service.update_user_settings_avatar(current_user, session, None)
+
+    assert result == AvatarUpdateResult(result=True, status="removed")
+    pipeline.cancel.assert_called_once_with(current_user.id)
+
+
+def test_non_image_upload_is_rejected_immediately():
+    pipeline = AvatarPipeline(storage=MagicMock(), workers=0)
+
+    with pytest.raises(AvatarInvalid):
+        pipeline.submit(uuid4(), b"not an image")
@@ -47,6 +47,8 @@ def patch_balance_and_currency(monkeypatch):
             self.amount = amount
             self.currency_code = currency_code
     monkeypatch.setattr(bs, "BalanceResponse", DummyResp)
+    # Ledger writes are covered by the ledger tests
+    monkeypatch.setattr(bs, "post_ledger_entries", AsyncMock())
 
     return dummy_currency_id
 
@@ -158,10 +160,14 @@ async def test_update_user_balance_existing(monkeypatch, patch_balance_and_curre
     user_id = uuid4()
     existing = FakeBalance(user_id, patch_balance_and_currency, Decimal("10"))
     monkeypatch.setattr(bs, "get_balance_by_user_and_currency", AsyncMock(return_value=existing))
+    monkeypatch.setattr(bs, "credit_balance", AsyncMock(return_value=Decimal("15")))
     db = SimpleNamespace(add=Mock(), commit=AsyncMock())
 
     got = await bs.update_user_balance(db, user_id, Decimal("5"), "USD")
     assert got.amount == Decimal("15")
+    bs.credit_balance.assert_awaited_once_with(db, existing.id, Decimal("5"))
+    [entry] = bs.post_ledger_entries.await_args.args[1]
+    assert (entry["amount"], entry["balance_after"], entry["entry_type"]) == (Decimal("5"), Decimal("15"), "deposit")
     db.commit.assert_awaited_once()
     db.add.assert_not_called()
 
@@ -169,7 +175,7 @@ async def test_update_user_balance_existing(monkeypatch, patch_balance_and_curre
 async def test_update_user_balance_new(monkeypatch, patch_balance_and_currency):
     user_id = uuid4()
     monkeypatch.setattr(bs, "get_balance_by_user_and_currency", AsyncMock(return_value=None))
-    db = SimpleNamespace(add=Mock(), commit=AsyncMock())
+    db = SimpleNamespace(add=Mock(), flush=AsyncMock(), commit=AsyncMock())
 
     got = await bs.update_user_balance(db, user_id, Decimal("7"), "JPY")
     assert isinstance(got, FakeBalance)
@@ -0,0 +1,63 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.persistence.initial_data import BOOTSTRAP_LOCK_KEY, bootstrap_database
+from app.services.utils.init_admin_user import create_admin_user
+
+
+def _result(values=()):
+    result = MagicMock()
+    result.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=list(values))))
+    return result
+
+
+def _sql(call):
+    return str(call.args[0].compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_runs_in_one_locked_transaction():
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[_result(), _result(["BGN"]), _result([]), _result(), _result()])
+    session.scalar = AsyncMock(return_value=True)
+    session.commit = AsyncMock()
+
+    inserted = await bootstrap_database(session)
+
+    assert inserted == {"currencies": ["BGN"], "categories": [], "admin": []}
+    lock, currencies, categories, notify = (_sql(call) for call in session.execute.await_args_list[:4])
+    assert "pg_advisory_xact_lock" in lock
+    assert BOOTSTRAP_LOCK_KEY in session.execute.await_args_list[0].args[0].compile().params.values()
+    assert "ON CONFLICT (code) DO NOTHING" in currencies
+    assert "NOT (EXISTS" in categories and "ON CONFLICT DO NOTHING" in categories
+    assert "pg_notify" in notify
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_existing_admin_is_not_rehashed():
+    session = MagicMock()
+    session.scalar = AsyncMock(return_value=True)
+    session.execute = AsyncMock()
+    hasher = MagicMock(hash=AsyncMock())
+
+    with patch("app.services.utils.init_admin_user.password_hasher", hasher):
+        assert await create_admin_user(session) == []
+
+    hasher.hash.assert_not_awaited()
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_missing_admin_is_inserted_on_conflict_do_nothing():
+    session = MagicMock()
+    session.scalar = AsyncMock(return_value=False)
+    session.execute = AsyncMock(return_value=_result(["admin"]))
+    hasher = MagicMock(hash=AsyncMock(return_value="hash"))
+
+    with patch("app.services.utils.init_admin_user.password_hasher", hasher):
+        assert await create_admin_user(session) == ["admin"]
+
+    assert "ON CONFLICT DO NOTHING" in _sql(session.execute.await_args)
@@ -4,10 +4,16 @@ from datetime import datetime
 from decimal import Decimal
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock
+import httpx
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
 
 import app.services.cards_service as cs
+from app.api.exceptions import IdempotentReplay, PaymentProcessorUnavailable
+from app.schemas.balance import BalanceResponse
+from app.services.idempotency_service import idempotent_request
+from app.services.utils.payment_processor import PaymentProcessorClient
+from benchmarks.fake_payment_processor import FakeProcessorState, create_fake_processor
 
 # A simple Query stub to swallow .where() and .options()
 class QueryStub:
@@ -48,13 +54,6 @@ class FakeCard:
         self.cvv = cvv
         self.is_deleted = False
 
-# Fake AsyncClient for httpx
-class FakeAsyncClient:
-    def __init__(self):
-        self.post = AsyncMock()
-    async def __aenter__(self): return self
-    async def __aexit__(self, exc_type, exc, tb): pass
-
 @pytest.fixture(autouse=True)
 def patch_card_module(monkeypatch):
     # Patch Card model and select/selectinload
@@ -69,8 +68,6 @@ def patch_card_module(monkeypatch):
     monkeypatch.setattr(cs, 'update_user_balance', AsyncMock())
     # Patch CardResponse.create
     monkeypatch.setattr(cs, 'CardResponse', SimpleNamespace(create=Mock()))
-    # Patch httpx AsyncClient
-    monkeypatch.setattr(cs.httpx, 'AsyncClient', FakeAsyncClient)
 
 @pytest.mark.asyncio
 async def test_create_card_existing_balance():
@@ -181,18 +178,85 @@ async def test_card_belongs_and_is_not():
 
 @pytest.mark.asyncio
 async def test_load_balance_from_card(monkeypatch):
-    db = SimpleNamespace()
+    db = SimpleNamespace(commit=AsyncMock(), rollback=AsyncMock())
     user_id = uuid4()
-    fake_resp = SimpleNamespace(status_code=200, json=Mock(return_value=True))
-    client = FakeAsyncClient()
-    client.post.return_value = fake_resp
-    monkeypatch.setattr(cs.httpx, 'AsyncClient', lambda: client)
-    cs.update_user_balance.return_value = AsyncMock()
+    charge = AsyncMock(return_value=True)
+    monkeypatch.setattr(cs.payment_processor, 'charge', charge)
     ok = await cs.load_balance_from_card(db, user_id, 'cardn', '12.34', 'usd')
     assert ok is True
-    fake_resp.status_code = 500
-    assert await cs.load_balance_from_card(db, user_id, 'cardn', '1', 'usd') is False
-    fake_resp.status_code = 200
-    fake_resp.json.return_value = False
+    assert charge.await_args.kwargs['idempotency_key']
+    cs.update_user_balance.assert_awaited_once_with(db, user_id, Decimal('12.34'), 'usd')
+    charge.return_value = False
     assert await cs.load_balance_from_card(db, user_id, 'cardn', '1', 'usd') is False
+    assert cs.update_user_balance.await_count == 1
+
+
+class FakeIdempotencyStore:
+    """Keeps claimed keys the way claim/complete/release do, without a database."""
+
+    def __init__(self):
+        self.keys = {}
+
+    async def claim(self, db, request):
+        stored = self.keys.setdefault((request.scope, request.key), {"response": None})
+        if stored["response"] is not None:
+            raise IdempotentReplay(*stored["response"])
+
+    async def complete(self, db, request, status_code, response):
+        self.keys[(request.scope, request.key)]["response"] = (status_code, response.model_dump())
+
+    async def release(self, db, request):
+        self.keys.pop((request.scope, request.key), None)
+
+
+@pytest.mark.asyncio
+async def test_repeated_top_up_credits_once(monkeypatch):
+    monkeypatch.setattr("app.services.utils.payment_processor.settings.PAYMENT_PROCESSOR_RETRY_BACKOFF_SECONDS", 0)
+    store = FakeIdempotencyStore()
+    monkeypatch.setattr(cs, 'claim_idempotency_key', store.claim)
+    monkeypatch.setattr(cs, 'complete_idempotency_key', store.complete)
+    monkeypatch.setattr(cs, 'release_idempotency_key', store.release)
+    state = FakeProcessorState(fail_next=1)
+    processor = PaymentProcessorClient(
+        base_url="http://processor",
+        transport=httpx.ASGITransport(app=create_fake_processor(state)),
+    )
+    monkeypatch.setattr(cs, 'payment_processor', processor)
+    db = SimpleNamespace(commit=AsyncMock(), rollback=AsyncMock())
+    user_a, user_b = uuid4(), uuid4()
+    body = BalanceResponse(card_number='4000000000000000', amount=Decimal('5'), currency_code='usd')
+
+    try:
+        request = idempotent_request(f"top_up:{user_a}", "k", body)
+        assert await cs.load_balance_from_card(db, user_a, body.card_number, '5', 'usd', request) is True
+        with pytest.raises(IdempotentReplay) as replay:
+            await cs.load_balance_from_card(db, user_a, body.card_number, '5', 'usd', request)
+
+        # Another user's top-up with the same key is its own charge.
+        request_b = idempotent_request(f"top_up:{user_b}", "k", body)
+        assert await cs.load_balance_from_card(db, user_b, body.card_number, '5', 'usd', request_b) is True
+    finally:
+        await processor.close()
+
+    assert replay.value.status_code == 200
+    assert replay.value.body == {"detail": "Balance loaded successfully."}
+    assert list(state.charges) == [f"top_up:{user_a}:k", f"top_up:{user_b}:k"]
+    assert [call.args[1] for call in cs.update_user_balance.await_args_list] == [user_a, user_b]
+
+
+@pytest.mark.asyncio
+async def test_failed_top_up_releases_the_key(monkeypatch):
+    store = FakeIdempotencyStore()
+    monkeypatch.setattr(cs, 'claim_idempotency_key', store.claim)
+    monkeypatch.setattr(cs, 'release_idempotency_key', store.release)
+    monkeypatch.setattr(cs.payment_processor, 'charge', AsyncMock(side_effect=PaymentProcessorUnavailable(retry_after=1)))
+    db = SimpleNamespace(commit=AsyncMock(), rollback=AsyncMock())
+    body = BalanceResponse(card_number='4000000000000000', amount=Decimal('5'), currency_code='usd')
+    request = idempotent_request("top_up:user", "k", body)
+
+    with pytest.raises(PaymentProcessorUnavailable):
+        await cs.load_balance_from_card(db, uuid4(), body.card_number, '5', 'usd', request)
 
+    assert store.keys == {}
+    db.rollback.assert_awaited_once()
+    cs.update_user_balance.assert_not_awaited()
@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.schemas.contact import normalize_phone
+from app.services.contacts_service import (
+    autocomplete_contacts,
+    build_contact_search_query,
+    import_contacts,
+    search_contact,
+)
+
+
+def _compiled(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+def _session(rows=(), scalars=()):
+    result = MagicMock()
+    result.all = MagicMock(return_value=list(rows))
+    result.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=list(scalars))))
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+def test_search_ranks_exact_then_prefix_then_similarity():
+    compiled = _compiled(build_contact_search_query(uuid4(), " Ali_ ", limit=5))
+    sql = str(compiled)
+
+    assert "CASE WHEN (lower(users.username) = " in sql
+    assert "ORDER BY CASE" in sql and "greatest(similarity(users.username" in sql
+    assert "users.username %% " in sql
+    assert "contacts.is_deleted IS false" in sql
+    assert "LIMIT" in sql
+    assert "users.password" not in sql
+    params = set(map(str, compiled.params.values()))
+    assert {"ali_", "Ali\\_%", "%Ali\\_%"} <= params
+
+
+@pytest.mark.asyncio
+async def test_search_returns_usernames_in_query_order():
+    session = _session(rows=[SimpleNamespace(username="alice"), SimpleNamespace(username="alicia")])
+
+    contacts = await search_contact(session, uuid4(), "ali")
+
+    assert [contact.username for contact in contacts] == ["alice", "alicia"]
+
+
+@pytest.mark.asyncio
+async def test_search_without_matches_is_not_found():
+    with pytest.raises(HTTPException) as exc:
+        await search_contact(_session(), uuid4(), "zed")
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_uses_lowercase_prefix_and_limit():
+    session = _session(scalars=["alice"])
+
+    usernames = await autocomplete_contacts(session, uuid4(), "AL%", limit=3)
+
+    assert usernames == ["alice"]
+    compiled = _compiled(session.execute.await_args.args[0])
+    assert "lower(users.username) LIKE" in str(compiled)
+    assert "al\\%%" in compiled.params.values()
+    assert 3 in compiled.params.values()
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_without_matches_is_empty():
+    assert await autocomplete_contacts(_session(), uuid4(), "zz") == []
+
+
+def test_normalize_phone_matches_stored_form():
+    assert normalize_phone("+359 (888) 123-456") == "359888123456"
+    assert normalize_phone("0888 123 456") == "0888123456"
+    assert normalize_phone("12345") is None
+
+
+@pytest.mark.asyncio
+async def test_import_matches_each_field_once_and_inserts_in_one_statement():
+    user_id, alice, bob = uuid4(), uuid4(), uuid4()
+    phone_rows = MagicMock(all=MagicMock(return_value=[SimpleNamespace(id=alice, username="alice", value="0888123456")]))
+    email_rows = MagicMock(all=MagicMock(return_value=[
+        SimpleNamespace(id=alice, username="alice", value="alice@wallet.com"),
+        SimpleNamespace(id=bob, username="bob", value="bob@wallet.com"),
+    ]))
+    inserted = MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[bob]))))
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=[phone_rows, email_rows, inserted])
+    session.commit = AsyncMock()
+
+    response = await import_contacts(
+        session, user_id,
+        phones=["+0888 123 456", "0888123456", "bad"],
+        emails=["alice@wallet.com", "bob@wallet.com", "nobody@wallet.com"],
+    )
+
+    assert [contact.username for contact in response.added] == ["bob"]
+    assert response.matched == 3 and response.unmatched == 1
+    phone_query, email_query, insert_stmt = (_compiled(call.args[0]) for call in session.execute.await_args_list)
+    assert "users.phone = ANY" in str(phone_query)
+    assert phone_query.params["phone"] == ["0888123456"]
+    assert "users.email = ANY" in str(email_query)
+    assert "unnest" in str(insert_stmt) and "ON CONFLICT (user_id, contact_id) DO NOTHING" in str(insert_stmt)
+    assert set(insert_stmt.params["contact_ids"]) == {alice, bob}
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_import_without_matches_writes_nothing():
+    session = _session()
+    session.commit = AsyncMock()
+
+    response = await import_contacts(session, uuid4(), phones=["0888123456"], emails=[])
+
+    assert response.added == [] and response.unmatched == 1
+    assert session.execute.await_count == 1
+    session.commit.assert_not_awaited()
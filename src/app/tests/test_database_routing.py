@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.persistence import db
+from app.persistence.db import (
+    RoutingSession,
+    _pin_on_write,
+    create_engine_from_settings,
+    database_routing_scope,
+)
+from app.persistence.users.users import User
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    replica_engine = create_async_engine("postgresql+asyncpg://wallet@replica/virtual_wallet")
+    monkeypatch.setattr(db, "replica_engine", replica_engine)
+    return replica_engine.sync_engine
+
+
+def _session(read_only: bool) -> RoutingSession:
+    return RoutingSession(info={"read_only": True} if read_only else {})
+
+
+def test_engine_uses_pool_settings():
+    engine = create_engine_from_settings(settings.SQLALCHEMY_DATABASE_URI)
+
+    assert engine.echo is False
+    assert engine.pool.size() == settings.DATABASE_POOL_SIZE
+    assert engine.pool._pre_ping is settings.DATABASE_POOL_PRE_PING
+    assert engine.pool._recycle == settings.DATABASE_POOL_RECYCLE_SECONDS
+
+
+def test_read_only_selects_go_to_replica(replica):
+    session = _session(read_only=True)
+
+    assert session.get_bind(clause=select(User.id)) is replica
+    assert session.get_bind(clause=select(User.id).with_for_update()) is db.engine.sync_engine
+    assert session.get_bind(clause=update(User).values(is_blocked=True)) is db.engine.sync_engine
+    assert session.get_bind(mapper=User.__mapper__) is db.engine.sync_engine
+
+
+def test_default_sessions_stay_on_primary(replica):
+    assert _session(read_only=False).get_bind(clause=select(User.id)) is db.engine.sync_engine
+
+
+def test_without_replica_everything_goes_to_primary():
+    assert db.replica_engine is None
+    assert _session(read_only=True).get_bind(clause=select(User.id)) is db.engine.sync_engine
+
+
+def test_write_pins_session_to_primary(replica):
+    session = _session(read_only=True)
+
+    _pin_on_write(SimpleNamespace(is_select=False, session=session, statement=update(User)))
+
+    assert session.get_bind(clause=select(User.id)) is db.engine.sync_engine
+
+
+def test_write_pins_the_rest_of_the_request(replica):
+    with database_routing_scope():
+        writer, reader = _session(read_only=False), _session(read_only=True)
+        assert reader.get_bind(clause=select(User.id)) is replica
+
+        _pin_on_write(SimpleNamespace(is_select=False, session=writer, statement=update(User)))
+
+        assert reader.get_bind(clause=select(User.id)) is db.engine.sync_engine
+
+    assert _session(read_only=True).get_bind(clause=select(User.id)) is replica
@@ -0,0 +1,77 @@
+import json
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.services.exports_service import build_export_query, stream_transactions_export
+
+
+def _fake_row(amount: str):
+    return SimpleNamespace(_mapping={
+        "id": uuid4(),
+        "sender_username": "sender",
+        "currency_code": "BGN",
+        "receiver_username": "receiver",
+        "category_name": "User Transfer",
+        "amount": Decimal(amount),
+        "status": "completed",
+        "is_recurring": False,
+        "created_date": date(2024, 1, 1),
+    })
+
+
+def _streaming_session(partitions):
+    async def _partitions():
+        for rows in partitions:
+            yield rows
+
+    stream_result = MagicMock()
+    stream_result.partitions = _partitions
+    session = MagicMock()
+    session.stream = AsyncMock(return_value=stream_result)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_stream_transactions_export_csv_yields_partitions(session_factory):
+    partitions = [[_fake_row("1.50"), _fake_row("2.00")], [_fake_row("3.25")]]
+    factory, session = session_factory(_streaming_session(partitions))
+    stmt = build_export_query(SimpleNamespace(id=uuid4(), is_admin=True))
+
+    chunks = [chunk async for chunk in stream_transactions_export(stmt, "csv", factory, yield_per=2)]
+
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines[0].startswith("id,sender_username,currency_code")
+    assert [line.split(",")[5] for line in lines[1:]] == ["1.50", "2.00", "3.25"]
+    streamed_stmt = session.stream.await_args.args[0]
+    assert streamed_stmt.get_execution_options()["yield_per"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_transactions_export_ndjson(session_factory):
+    factory, _ = session_factory(_streaming_session([[_fake_row("4.00")]]))
+    stmt = build_export_query(SimpleNamespace(id=uuid4(), is_admin=True))
+
+    chunks = [chunk async for chunk in stream_transactions_export(stmt, "ndjson", factory)]
+
+    record = json.loads(chunks[0])
+    assert record["amount"] == "4.00"
+    assert record["created_date"] == "2024-01-01"
+
+
+def test_build_export_query_limits_regular_users_to_own_transactions():
+    user = SimpleNamespace(id=uuid4(), is_admin=False)
+
+    stmt = build_export_query(user, direction="outgoing", user_id=uuid4())
+
+    sql = str(stmt)
+    assert "transactions.sender_id = :sender_id_1" in sql
+    assert "(transactions.sender_id = :sender_id_2 OR transactions.receiver_id = :receiver_id_1)" in sql
+    assert "ORDER BY transactions.created_at, transactions.id" in sql
+    params = stmt.compile().params
+    assert all(value == user.id for key, value in params.items() if key.startswith(("sender_id", "receiver_id")))
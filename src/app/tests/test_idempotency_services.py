@@ -0,0 +1,137 @@
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.exceptions import IdempotencyKeyMismatch, IdempotencyRequestInProgress, IdempotentReplay
+from app.schemas.transaction import CardToCardTransactionIn
+from app.services.idempotency_service import (
+    claim_idempotency_key,
+    idempotent_request,
+    purge_expired_idempotency_keys,
+)
+from app.services.transactions_service import transfer_between_cards
+
+
+def _request():
+    payload = CardToCardTransactionIn(sender_card_number="1" * 16, receiver_card_number="2" * 16,
+                                      amount=Decimal("10"), description="rent")
+    return idempotent_request("between_cards:1111", "key-1", payload)
+
+
+def _claim_results(stored):
+    inserted = MagicMock()
+    inserted.scalar_one_or_none = MagicMock(return_value=None)
+    existing = MagicMock()
+    existing.one = MagicMock(return_value=stored)
+    return [inserted, existing]
+
+
+def test_idempotent_request_without_header_is_none():
+    payload = CardToCardTransactionIn(sender_card_number="1" * 16, receiver_card_number="2" * 16,
+                                      amount=Decimal("10"))
+
+    assert idempotent_request("between_cards:1111", None, payload) is None
+
+
+@pytest.mark.asyncio
+async def test_claim_new_key_returns_after_insert():
+    inserted = MagicMock()
+    inserted.scalar_one_or_none = MagicMock(return_value=uuid4())
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=inserted)
+
+    await claim_idempotency_key(db, _request())
+
+    db.execute.assert_awaited_once()
+    sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uix_idempotency_scope_key DO UPDATE" in sql
+
+
+@pytest.mark.asyncio
+async def test_claim_completed_key_replays_stored_response():
+    request = _request()
+    body = {"id": str(uuid4()), "amount": "10"}
+    stored = SimpleNamespace(request_hash=request.request_hash, status="completed",
+                             response_code=201, response_body=body)
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=_claim_results(stored))
+
+    with pytest.raises(IdempotentReplay) as exc:
+        await claim_idempotency_key(db, request)
+
+    assert exc.value.status_code == 201
+    assert exc.value.body == body
+
+
+@pytest.mark.asyncio
+async def test_claim_key_with_different_payload_is_rejected():
+    stored = SimpleNamespace(request_hash="other", status="completed", response_code=201, response_body={})
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=_claim_results(stored))
+
+    with pytest.raises(IdempotencyKeyMismatch):
+        await claim_idempotency_key(db, _request())
+
+
+@pytest.mark.asyncio
+async def test_claim_in_progress_key_gives_up_after_wait():
+    request = _request()
+    stored = SimpleNamespace(request_hash=request.request_hash, status="in_progress",
+                             response_code=None, response_body=None)
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=_claim_results(stored))
+
+    with patch("app.services.idempotency_service.settings.IDEMPOTENCY_WAIT_SECONDS", 0):
+        with pytest.raises(IdempotencyRequestInProgress):
+            await claim_idempotency_key(db, request)
+
+
+@pytest.mark.asyncio
+async def test_transfer_between_cards_stores_response_before_commit():
+    request = _request()
+    sender_balance = SimpleNamespace(id=uuid4(), user_id=uuid4(), currency_id=uuid4())
+    receiver_balance = SimpleNamespace(id=uuid4(), user_id=uuid4(), currency_id=sender_balance.currency_id)
+    cards = [SimpleNamespace(id=uuid4(), balance=sender_balance), SimpleNamespace(id=uuid4(), balance=receiver_balance)]
+    calls = []
+
+    db = MagicMock()
+    db.add = MagicMock()
+
+    async def _flush():
+        transaction = db.add.call_args.args[0]
+        transaction.id = uuid4()
+        transaction.created_date = date.today()
+
+    db.flush = AsyncMock(side_effect=_flush)
+    db.commit = AsyncMock(side_effect=lambda: calls.append("commit"))
+
+    async def _complete(db_, idempotency, status_code, response):
+        calls.append(("complete", status_code, response.sender_card_number))
+
+    with patch("app.services.transactions_service.claim_idempotency_key", AsyncMock()) as claim, \
+         patch("app.services.transactions_service.complete_idempotency_key", side_effect=_complete), \
+         patch("app.services.transactions_service.get_card_by_number", AsyncMock(side_effect=cards)), \
+         patch("app.services.transactions_service.get_default_category", AsyncMock(return_value=SimpleNamespace(id=uuid4()))), \
+         patch("app.services.transactions_service.move_funds", AsyncMock()), \
+         patch("app.services.transactions_service.record_spending", AsyncMock()):
+        await transfer_between_cards(db, "1" * 16, "2" * 16, Decimal("10"), "rent", idempotency=request)
+
+    claim.assert_awaited_once_with(db, request)
+    assert calls == [("complete", 201, "1" * 16), "commit"]
+
+
+@pytest.mark.asyncio
+async def test_purge_expired_idempotency_keys_deletes_in_batches():
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[SimpleNamespace(rowcount=2), SimpleNamespace(rowcount=1)])
+    db.commit = AsyncMock()
+
+    purged = await purge_expired_idempotency_keys(db, batch_size=2)
+
+    assert purged == 3
+    assert db.commit.await_count == 2
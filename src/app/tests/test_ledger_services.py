@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.ledger_service import get_balance_as_of, post_transfer, take_balance_snapshots
+
+
+@pytest.mark.asyncio
+async def test_post_transfer_writes_balanced_entries():
+    sender, receiver, transaction_id = uuid4(), uuid4(), uuid4()
+    db = MagicMock()
+    db.execute = AsyncMock()
+
+    await post_transfer(db, sender, receiver, Decimal("25"), Decimal("75"), Decimal("125"), transaction_id)
+
+    entries = db.execute.await_args.args[1]
+    assert [(e["balance_id"], e["amount"], e["balance_after"]) for e in entries] == [
+        (sender, Decimal("-25"), Decimal("75")),
+        (receiver, Decimal("25"), Decimal("125")),
+    ]
+    assert sum(e["amount"] for e in entries) == 0
+    assert {e["entry_group_id"] for e in entries} == {transaction_id}
+
+
+def _result(one_or_none=None, scalar_one=None):
+    result = MagicMock()
+    result.one_or_none = MagicMock(return_value=one_or_none)
+    result.scalar_one = MagicMock(return_value=scalar_one)
+    return result
+
+
+@pytest.mark.asyncio
+async def test_balance_as_of_adds_tail_to_nearest_snapshot():
+    snapshot_at = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[
+        _result(one_or_none=SimpleNamespace(taken_at=snapshot_at, amount=Decimal("100"))),
+        _result(scalar_one=Decimal("-30")),
+    ])
+
+    amount = await get_balance_as_of(db, uuid4(), datetime(2024, 5, 3, tzinfo=timezone.utc))
+
+    assert amount == Decimal("70")
+    tail_sql = str(db.execute.await_args_list[1].args[0])
+    assert "ledger_entries.created_at > " in tail_sql
+
+
+@pytest.mark.asyncio
+async def test_balance_as_of_without_snapshot_sums_all_entries():
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[_result(one_or_none=None), _result(scalar_one=Decimal("40"))])
+
+    amount = await get_balance_as_of(db, uuid4(), datetime(2024, 5, 3, tzinfo=timezone.utc))
+
+    assert amount == Decimal("40")
+    assert "ledger_entries.created_at > " not in str(db.execute.await_args_list[1].args[0])
+
+
+@pytest.mark.asyncio
+async def test_take_balance_snapshots_only_reads_entries_since_last_run():
+    last_run = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    max_result = MagicMock()
+    max_result.scalar_one_or_none = MagicMock(return_value=last_run)
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[max_result, SimpleNamespace(rowcount=3)])
+    db.commit = AsyncMock()
+
+    written = await take_balance_snapshots(db, taken_at=datetime(2024, 5, 2, tzinfo=timezone.utc))
+
+    assert written == 3
+    sql = str(db.execute.await_args_list[1].args[0].compile(dialect=postgresql.dialect()))
+    assert "DISTINCT ON (ledger_entries.balance_id)" in sql
+    assert "ledger_entries.created_at > " in sql
+    db.commit.assert_awaited_once()
@@ -0,0 +1,148 @@
+import json
+from base64 import b64decode
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.persistence.mail_outbox.mail_outbox_message import MailOutboxMessage
+from app.schemas.user import UserCreate
+from app.services.mail_outbox_service import FAILED, PENDING, SENT, dispatch_mail_outbox
+from app.services.users_service import create_user
+from app.services.utils.mail.sendmail import MailjetSender
+
+
+class _MailjetStandIn(BaseHTTPRequestHandler):
+    """Answers like Mailjet's /v3.1/send: rejects recipients at bounce.com."""
+
+    requests: list = []
+    status_override: int | None = None
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests.append((self.path, self.headers["Authorization"], body))
+        if self.status_override:
+            self.send_response(self.status_override)
+            self.end_headers()
+            return
+        results = [
+            {"Status": "error", "Errors": [{"ErrorMessage": "invalid recipient"}]}
+            if message["To"][0]["Email"].endswith("@bounce.com")
+            else {"Status": "success"}
+            for message in body["Messages"]
+        ]
+        payload = json.dumps({"Messages": results}).encode()
+        self.send_response(400 if any(r["Status"] == "error" for r in results) else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mailjet(monkeypatch, stand_in_server):
+    monkeypatch.setenv("MAILJET_API_KEY", "key")
+    monkeypatch.setenv("MAILJET_SECRET_KEY", "secret")
+    _MailjetStandIn.requests = []
+    _MailjetStandIn.status_override = None
+    return _MailjetStandIn, stand_in_server(_MailjetStandIn)
+
+
+def _outbox_message(email):
+    return MailOutboxMessage(
+        kind="activation",
+        status=PENDING,
+        attempts=0,
+        payload={
+            "From": {"Email": "noreply@wallet.com", "Name": "Wallet"},
+            "To": [{"Email": email, "Name": "alice"}],
+            "Subject": "Activate",
+            "TextPart": "text",
+            "HTMLPart": "<p>html</p>",
+        },
+    )
+
+
+def _db_returning(batch):
+    result = MagicMock()
+    result.scalars = MagicMock(return_value=MagicMock(all=MagicMock(return_value=batch)))
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    db.commit = AsyncMock()
+    return db
+
+
+@pytest.mark.asyncio
+async def test_dispatch_sends_one_batch_and_records_each_outcome(mailjet):
+    stand_in, url = mailjet
+    batch = [_outbox_message("alice@wallet.com"), _outbox_message("bob@bounce.com")]
+    sender = MailjetSender(base_url=url, timeout=5)
+    try:
+        taken = await dispatch_mail_outbox(_db_returning(batch), sender)
+    finally:
+        await sender.close()
+
+    assert taken == 2
+    assert len(stand_in.requests) == 1
+    path, authorization, body = stand_in.requests[0]
+    assert path == "/v3.1/send"
+    assert b64decode(authorization.split()[1]) == b"key:secret"
+    assert [m["To"][0]["Email"] for m in body["Messages"]] == ["alice@wallet.com", "bob@bounce.com"]
+    assert batch[0].status == SENT and batch[0].sent_at is not None
+    assert batch[1].status == PENDING and batch[1].attempts == 1
+    assert "invalid recipient" in batch[1].last_error
+
+
+@pytest.mark.asyncio
+async def test_server_error_backs_off_whole_batch_and_gives_up_eventually(mailjet, monkeypatch):
+    stand_in, url = mailjet
+    stand_in.status_override = 503
+    monkeypatch.setattr("app.services.mail_outbox_service.settings.MAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    retried, exhausted = _outbox_message("alice@wallet.com"), _outbox_message("bob@wallet.com")
+    exhausted.attempts = 1
+    sender = MailjetSender(base_url=url, timeout=5)
+    try:
+        await dispatch_mail_outbox(_db_returning([retried, exhausted]), sender)
+    finally:
+        await sender.close()
+
+    assert retried.status == PENDING
+    assert retried.next_attempt_at > datetime.now(timezone.utc)
+    assert exhausted.status == FAILED
+    assert "503" in exhausted.last_error
+
+
+@pytest.mark.asyncio
+async def test_create_user_queues_activation_mail_in_same_transaction(monkeypatch):
+    monkeypatch.setenv("MAILJET_SENDER_EMAIL", "noreply@wallet.com")
+    monkeypatch.setenv("MAILJET_SENDER_NAME", "Wallet")
+    monkeypatch.setenv("ACCOUNT_VERIFICATION_SUBJECT", "Activate your account")
+    monkeypatch.setattr("app.services.users_service.password_hasher.hash", AsyncMock(return_value="hash"))
+    calls, added = [], []
+
+    def _add(obj):
+        calls.append(type(obj).__name__)
+        added.append(obj)
+
+    def _flush():
+        calls.append("flush")
+        user = added[0]
+        user.id, user.is_blocked, user.is_activated, user.is_verified, user.is_admin = uuid4(), False, False, False, False
+
+    session = MagicMock()
+    session.add = MagicMock(side_effect=_add)
+    session.flush = AsyncMock(side_effect=_flush)
+    session.commit = AsyncMock(side_effect=lambda: calls.append("commit"))
+    session.refresh = AsyncMock()
+
+    await create_user(session, UserCreate(
+        username="alice", password="Secret123@", email="alice@wallet.com", phone="0123456789",
+    ))
+
+    assert calls == ["User", "flush", "MailOutboxMessage", "commit"]
+    assert added[1].payload["To"] == [{"Email": "alice@wallet.com", "Name": "alice"}]
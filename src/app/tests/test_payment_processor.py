@@ -0,0 +1,147 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api.exceptions import PaymentProcessorUnavailable
+from app.services.utils.payment_processor import CircuitBreaker, PaymentProcessorClient
+from benchmarks.fake_payment_processor import FakeProcessorState, create_fake_processor
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr("app.services.utils.payment_processor.settings.PAYMENT_PROCESSOR_RETRY_BACKOFF_SECONDS", 0)
+
+
+def _client(state: FakeProcessorState) -> PaymentProcessorClient:
+    return PaymentProcessorClient(
+        base_url="http://processor",
+        transport=httpx.ASGITransport(app=create_fake_processor(state)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_charge_approves_and_declines():
+    state = FakeProcessorState(decline_cards={"4111"})
+    processor = _client(state)
+    try:
+        assert await processor.charge("4000", "10.00", "EUR", "key-1") is True
+        assert await processor.charge("4111", "10.00", "EUR", "key-2") is False
+    finally:
+        await processor.close()
+
+    assert state.charges["key-1"]["payload"]["incoming_amount"] == "10.00"
+    assert processor.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_retries_reuse_the_idempotency_key():
+    state = FakeProcessorState(fail_next=1)
+    processor = _client(state)
+    try:
+        assert await processor.charge("4000", "5", "EUR", "key-1") is True
+        assert await processor.charge("4000", "5", "EUR", "key-1") is True
+    finally:
+        await processor.close()
+
+    assert state.requests == 3
+    assert list(state.charges) == ["key-1"]
+    assert processor.stats["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_breaker_fails_fast_while_processor_is_down(monkeypatch):
+    monkeypatch.setattr("app.services.utils.payment_processor.settings.PAYMENT_PROCESSOR_MAX_ATTEMPTS", 2)
+    state = FakeProcessorState(failure_rate=1.0)
+    processor = _client(state)
+    processor.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    try:
+        for _ in range(2):
+            with pytest.raises(PaymentProcessorUnavailable):
+                await processor.charge("4000", "5", "EUR", "key")
+        requests_before = state.requests
+        with pytest.raises(PaymentProcessorUnavailable) as exc:
+            await processor.charge("4000", "5", "EUR", "key")
+    finally:
+        await processor.close()
+
+    assert state.requests == requests_before == 4
+    assert exc.value.status_code == 503
+    assert int(exc.value.headers["Retry-After"]) > 0
+    assert processor.metrics_snapshot()["short_circuited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_internal_server_errors_open_the_breaker(monkeypatch):
+    monkeypatch.setattr("app.services.utils.payment_processor.settings.PAYMENT_PROCESSOR_MAX_ATTEMPTS", 2)
+    state = FakeProcessorState(failure_rate=1.0, failure_status=500)
+    processor = _client(state)
+    processor.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    try:
+        for _ in range(2):
+            with pytest.raises(PaymentProcessorUnavailable) as exc:
+                await processor.charge("4000", "5", "EUR", "key")
+    finally:
+        await processor.close()
+
+    assert exc.value.status_code == 503
+    assert state.requests == 4
+    assert processor.breaker.state == CircuitBreaker.OPEN
+    assert processor.stats["retries"] == 2
+
+
+def test_half_open_breaker_lets_one_trial_through(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+class _StallingTransport(httpx.AsyncBaseTransport):
+    async def handle_async_request(self, request):
+        await asyncio.Event().wait()
+
+
+class _BrokenTransport(httpx.AsyncBaseTransport):
+    async def handle_async_request(self, request):
+        raise httpx.DecodingError("garbled response")
+
+
+def _half_open_client(transport: httpx.AsyncBaseTransport) -> PaymentProcessorClient:
+    processor = PaymentProcessorClient(base_url="http://processor", transport=transport)
+    processor.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    processor.breaker.record_failure()
+    return processor
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_frees_the_half_open_breaker():
+    processor = _half_open_client(_StallingTransport())
+    try:
+        trial = asyncio.create_task(processor.charge("4000", "5", "EUR", "key"))
+        await asyncio.sleep(0.01)
+        assert processor.breaker.state == CircuitBreaker.HALF_OPEN
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+    finally:
+        await processor.close()
+
+    assert processor.breaker.allow() is True
+
+
+@pytest.mark.asyncio
+async def test_erroring_trial_opens_the_breaker_again():
+    processor = _half_open_client(_BrokenTransport())
+    try:
+        with pytest.raises(httpx.DecodingError):
+            await processor.charge("4000", "5", "EUR", "key")
+    finally:
+        await processor.close()
+
+    assert processor.breaker.state == CircuitBreaker.OPEN
+    assert processor.stats["failures"] == 1
+    assert processor.breaker.allow() is True
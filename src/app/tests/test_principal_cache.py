@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.schemas.user import UserResponse
+from app.services.admins_service import block_user
+from app.services.utils.principal_cache import PrincipalCache
+from app.services.utils.token_functions import resolve_principal
+
+
+def _principal(user_id=None, is_blocked=False):
+    return UserResponse(
+        id=user_id or uuid4(),
+        username="alice",
+        is_blocked=is_blocked,
+        is_activated=True,
+        is_verified=True,
+        is_admin=False,
+    )
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PrincipalCache(max_size=2, ttl_seconds=60)
+    first, second, third = _principal(), _principal(), _principal()
+    cache.put(first)
+    cache.put(second)
+    assert cache.get(first.id) == first
+
+    cache.put(third)
+
+    assert cache.get(second.id) is None
+    assert cache.get(first.id) == first
+    assert cache.get(third.id) == third
+
+
+def test_notification_evicts_user_and_wildcard_clears():
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    first, second = _principal(), _principal()
+    cache.put(first)
+    cache.put(second)
+
+    cache.on_notification(str(first.id))
+    assert cache.get(first.id) is None
+    assert cache.get(second.id) == second
+
+    cache.on_notification("*")
+    assert cache.get(second.id) is None
+
+
+@pytest.mark.asyncio
+async def test_resolve_principal_hits_cache_without_query():
+    principal = _principal()
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    cache.put(principal)
+    session = MagicMock()
+    session.execute = AsyncMock()
+
+    with patch("app.services.utils.token_functions.principal_cache", cache), \
+         patch("app.services.utils.token_functions.decode_access_token",
+               AsyncMock(return_value={"sub": str(principal.id), "admin": False})):
+        user = await resolve_principal(session, "token")
+
+    assert user == principal
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_block_user_evicts_cached_principal():
+    user_id = uuid4()
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    cache.put(_principal(user_id))
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.commit = AsyncMock()
+
+    with patch("app.services.admins_service.principal_cache", cache), \
+         patch("app.services.admins_service._get_user_by_id",
+               AsyncMock(return_value=SimpleNamespace(is_blocked=False))):
+        await block_user(db, user_id)
+
+    assert cache.get(user_id) is None
+    notify_sql = str(db.execute.await_args.args[0])
+    assert "pg_notify" in notify_sql
+    assert db.execute.await_args.args[1]["payload"] == str(user_id)
@@ -0,0 +1,174 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.exc import DBAPIError
+
+from app.core.enums.enums import IntervalType
+from app.services.recurring_transactions_service import (
+    _lock_batch_balances,
+    advance_execution_date,
+    due_run_dates,
+    execute_due_recurring_transactions,
+)
+
+
+def _template(next_execution_date, interval_type):
+    return SimpleNamespace(
+        id=uuid4(),
+        sender_id=uuid4(),
+        receiver_id=uuid4(),
+        currency_id=uuid4(),
+        amount=Decimal("10"),
+        description="rent",
+        interval_type=interval_type,
+        next_execution_date=next_execution_date,
+        start_date=next_execution_date,
+        last_run_date=None,
+    )
+
+
+def test_advance_execution_date():
+    assert advance_execution_date(date(2025, 1, 31), IntervalType.DAILY) == date(2025, 2, 1)
+    assert advance_execution_date(date(2025, 1, 31), IntervalType.WEEKLY) == date(2025, 2, 7)
+    assert advance_execution_date(date(2025, 1, 31), IntervalType.MONTHLY) == date(2025, 2, 28)
+    assert advance_execution_date(date(2025, 12, 15), IntervalType.MONTHLY) == date(2026, 1, 15)
+    assert advance_execution_date(date(2024, 2, 29), IntervalType.YEARLY) == date(2025, 2, 28)
+
+
+def test_monthly_schedule_keeps_the_day_of_its_start_date():
+    template = _template(date(2025, 1, 31), IntervalType.MONTHLY)
+
+    run_dates, next_date = due_run_dates(template, date(2025, 6, 1), catch_up=True, max_runs=10)
+
+    assert run_dates == [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30), date(2025, 5, 31)]
+    assert next_date == date(2025, 6, 30)
+
+    # One step at a time, as the executor advances a template between batches.
+    template.next_execution_date = date(2025, 1, 31)
+    occurrences = []
+    for _ in range(4):
+        run_dates, template.next_execution_date = due_run_dates(template, template.next_execution_date,
+                                                                catch_up=True, max_runs=1)
+        occurrences += run_dates
+    assert occurrences == [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)]
+
+
+def test_yearly_schedule_returns_to_february_29():
+    template = _template(date(2024, 2, 29), IntervalType.YEARLY)
+
+    run_dates, next_date = due_run_dates(template, date(2028, 3, 1), catch_up=True, max_runs=10)
+
+    assert run_dates == [date(2024, 2, 29), date(2025, 2, 28), date(2026, 2, 28), date(2027, 2, 28), date(2028, 2, 29)]
+    assert next_date == date(2029, 2, 28)
+
+
+def test_due_run_dates_catch_up_and_skip():
+    template = _template(date(2025, 1, 1), IntervalType.WEEKLY)
+
+    run_dates, next_date = due_run_dates(template, date(2025, 1, 20), catch_up=True, max_runs=10)
+    assert run_dates == [date(2025, 1, 1), date(2025, 1, 8), date(2025, 1, 15)]
+    assert next_date == date(2025, 1, 22)
+
+    run_dates, next_date = due_run_dates(template, date(2025, 1, 20), catch_up=True, max_runs=2)
+    assert run_dates == [date(2025, 1, 1), date(2025, 1, 8)]
+    assert next_date == date(2025, 1, 15)
+
+    run_dates, next_date = due_run_dates(template, date(2025, 1, 20), catch_up=False, max_runs=10)
+    assert run_dates == [date(2025, 1, 15)]
+    assert next_date == date(2025, 1, 22)
+
+
+@pytest.mark.asyncio
+async def test_execute_due_recurring_transactions_advances_templates():
+    due = _template(date(2025, 3, 1), IntervalType.MONTHLY)
+    starved = _template(date(2025, 3, 1), IntervalType.MONTHLY)
+    execute_run = AsyncMock(side_effect=[True, False])
+
+    mock_db = MagicMock()
+    mock_db.commit = AsyncMock()
+
+    with patch("app.services.recurring_transactions_service.claim_due_recurring_transactions", AsyncMock(return_value=[due, starved])), \
+         patch("app.services.recurring_transactions_service.get_default_category", AsyncMock(return_value=SimpleNamespace(id=uuid4()))), \
+         patch("app.services.recurring_transactions_service._lock_batch_balances", AsyncMock(return_value={})), \
+         patch("app.services.recurring_transactions_service._execute_run", execute_run):
+        batch = await execute_due_recurring_transactions(
+            mock_db, as_of=date(2025, 3, 10), batch_size=10, catch_up=True, max_catch_up_runs=5
+        )
+
+    assert (batch.claimed, batch.executed, batch.failed) == (2, 1, 1)
+    assert batch.oldest_due_date == date(2025, 3, 1)
+    for template in (due, starved):
+        assert template.last_run_date == date(2025, 3, 1)
+        assert template.next_execution_date == date(2025, 4, 1)
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_execute_due_recurring_transactions_nothing_due():
+    mock_db = MagicMock()
+    mock_db.commit = AsyncMock()
+
+    with patch("app.services.recurring_transactions_service.claim_due_recurring_transactions", AsyncMock(return_value=[])):
+        batch = await execute_due_recurring_transactions(
+            mock_db, as_of=date(2025, 3, 10), batch_size=10, catch_up=True, max_catch_up_runs=5
+        )
+
+    assert batch.claimed == 0
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_execute_due_recurring_transactions_retries_the_batch_after_a_deadlock():
+    template = _template(date(2025, 3, 1), IntervalType.MONTHLY)
+    claim = AsyncMock(side_effect=lambda *args: [_template(date(2025, 3, 1), IntervalType.MONTHLY)])
+    deadlock = DBAPIError("UPDATE balances", {}, SimpleNamespace(sqlstate="40P01"))
+    execute_run = AsyncMock(side_effect=[deadlock, True])
+
+    mock_db = MagicMock()
+    mock_db.commit = AsyncMock()
+    mock_db.rollback = AsyncMock()
+
+    with patch("app.services.recurring_transactions_service.claim_due_recurring_transactions", claim), \
+         patch("app.services.recurring_transactions_service.get_default_category", AsyncMock(return_value=SimpleNamespace(id=uuid4()))), \
+         patch("app.services.recurring_transactions_service._lock_batch_balances", AsyncMock(return_value={})), \
+         patch("app.services.recurring_transactions_service._execute_run", execute_run), \
+         patch("app.services.utils.transfer_engine.asyncio.sleep", AsyncMock()):
+        batch = await execute_due_recurring_transactions(
+            mock_db, as_of=template.next_execution_date, batch_size=10, catch_up=True, max_catch_up_runs=5
+        )
+
+    assert (batch.claimed, batch.executed, batch.failed) == (1, 1, 0)
+    assert claim.await_count == 2
+    mock_db.rollback.assert_awaited_once()
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lock_batch_balances_locks_every_balance_of_the_batch():
+    first = _template(date(2025, 3, 1), IntervalType.MONTHLY)
+    second = _template(date(2025, 3, 1), IntervalType.MONTHLY)
+    second.sender_id = first.receiver_id
+    second.currency_id = first.currency_id
+    sender_balance = uuid4()
+    receiver_balances = {second.receiver_id: uuid4(), first.receiver_id: uuid4()}
+    sender_rows = [SimpleNamespace(id=sender_balance, user_id=first.sender_id, currency_id=first.currency_id)]
+
+    mock_db = MagicMock()
+    mock_db.execute = AsyncMock(return_value=sender_rows)
+    lock_balances = AsyncMock()
+    ensure_balance = AsyncMock(side_effect=lambda db, user_id, currency_id: receiver_balances[user_id])
+
+    with patch("app.services.recurring_transactions_service.ensure_balance", ensure_balance), \
+         patch("app.services.recurring_transactions_service.lock_balances", lock_balances):
+        balance_ids = await _lock_batch_balances(mock_db, [first, second])
+
+    assert balance_ids[(first.sender_id, first.currency_id)] == sender_balance
+    assert balance_ids[(second.sender_id, second.currency_id)] == receiver_balances[first.receiver_id]
+    assert balance_ids[(second.receiver_id, second.currency_id)] == receiver_balances[second.receiver_id]
+    assert ensure_balance.await_count == 2
+    lock_balances.assert_awaited_once()
+    assert set(lock_balances.await_args.args[1]) == {sender_balance, *receiver_balances.values()}
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.services.categories_service import get_default_category
+from app.services.currencies_service import _get_currency_id_by_currency_code
+from app.services.utils.reference_cache import DefaultCategory, ReferenceDataCache
+
+
+def _rows(*rows):
+    result = MagicMock()
+    result.all = MagicMock(return_value=list(rows))
+    return result
+
+
+def _loaded_cache(currency_id, category_id, ttl_seconds=60):
+    cache = ReferenceDataCache(ttl_seconds=ttl_seconds)
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[
+        _rows(SimpleNamespace(id=currency_id, code="EUR")),
+        _rows(SimpleNamespace(id=category_id, name="User Transfer")),
+    ])
+    return cache, db
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_answers_without_database(monkeypatch):
+    currency_id, category_id = uuid4(), uuid4()
+    cache, loader = _loaded_cache(currency_id, category_id)
+    await cache.load(loader)
+    monkeypatch.setattr("app.services.currencies_service.reference_cache", cache)
+    monkeypatch.setattr("app.services.categories_service.reference_cache", cache)
+    db = MagicMock()
+    db.execute = AsyncMock()
+
+    assert await _get_currency_id_by_currency_code(db, " eur ") == currency_id
+    assert await get_default_category(db, "User Transfer") == DefaultCategory(id=category_id, name="User Transfer")
+    db.execute.assert_not_awaited()
+    assert cache.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_cache_falls_back_to_database(monkeypatch):
+    cache, loader = _loaded_cache(uuid4(), uuid4(), ttl_seconds=0)
+    await cache.load(loader)
+    monkeypatch.setattr("app.services.currencies_service.reference_cache", cache)
+    fresh_id = uuid4()
+    result = MagicMock()
+    result.scalars = MagicMock(return_value=MagicMock(first=MagicMock(return_value=fresh_id)))
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+
+    assert await _get_currency_id_by_currency_code(db, "EUR") == fresh_id
+    db.execute.assert_awaited_once()
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_notification_reloads_snapshot():
+    cache = ReferenceDataCache(ttl_seconds=60)
+    cache.reload = AsyncMock()
+
+    await cache.on_notification("*")
+
+    assert not cache.is_fresh()
+    cache.reload.assert_awaited_once()
@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.api.exceptions import TooManyLoginAttempts
+from app.schemas.user import UserLogin
+from app.services.tokens_service import login_user
+from app.services.utils.rate_limiter import InMemorySlidingWindowBackend, LoginThrottle
+from app.services.utils.security import PasswordHasher, get_hash_rounds, get_password_hash
+
+
+@pytest.mark.asyncio
+async def test_process_pool_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=1, max_concurrency=1, rounds=4)
+    try:
+        hashed = await hasher.hash("Secret123@")
+        assert get_hash_rounds(hashed) == 4
+        assert await hasher.verify("Secret123@", hashed)
+        assert not await hasher.verify("Wrong123@", hashed)
+    finally:
+        hasher.shutdown()
+    assert hasher.metrics_snapshot()["completed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_queues_excess_calls():
+    hasher = PasswordHasher(workers=0, max_concurrency=1, rounds=4)
+    calls = [asyncio.create_task(hasher.hash("Secret123@")) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    assert hasher.in_flight == 1
+    assert hasher.queued == 2
+
+    await asyncio.gather(*calls)
+    assert hasher.queued == 0 and hasher.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_when_cost_changed():
+    hasher = PasswordHasher(workers=0, max_concurrency=2, rounds=4)
+    user = SimpleNamespace(id=uuid4(), is_admin=False, password=get_password_hash("Secret123@", rounds=5))
+    result = MagicMock()
+    result.scalar_one_or_none = MagicMock(return_value=user)
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    session.commit = AsyncMock()
+
+    with patch("app.services.tokens_service.password_hasher", hasher), \
+         patch("app.services.tokens_service.create_tokens", AsyncMock(return_value="tokens")):
+        tokens = await login_user(session, UserLogin(username="alice", password="Secret123@"))
+
+    assert tokens == "tokens"
+    update_stmt = session.execute.await_args_list[1].args[0]
+    new_hash = update_stmt.compile().params["password"]
+    assert get_hash_rounds(new_hash) == 4
+    assert hasher.rehashed == 1
+    # Once for the rehash, once for the recorded refresh token.
+    assert session.commit.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_throttled_login_is_rejected_before_any_query():
+    throttle = LoginThrottle(InMemorySlidingWindowBackend())
+    throttle.username_limit = 2
+    session = MagicMock()
+    result = MagicMock()
+    result.scalar_one_or_none = MagicMock(return_value=None)
+    session.execute = AsyncMock(return_value=result)
+
+    with patch("app.services.tokens_service.login_throttle", throttle):
+        for _ in range(2):
+            assert await login_user(session, UserLogin(username="alice", password="x"), "10.0.0.1") is False
+        with pytest.raises(TooManyLoginAttempts) as exc:
+            await login_user(session, UserLogin(username="Alice", password="x"), "10.0.0.2")
+
+    assert session.execute.await_count == 2
+    assert exc.value.status_code == 429
+    assert 0 < int(exc.value.headers["Retry-After"]) <= throttle.window_seconds
+    assert throttle.metrics_snapshot() == {"allowed": 2, "rejected_username": 1, "rejected_ip": 0}
+
+
+@pytest.mark.asyncio
+async def test_ip_limit_applies_across_usernames():
+    throttle = LoginThrottle(InMemorySlidingWindowBackend())
+    throttle.ip_limit = 1
+
+    await throttle.check("alice", "10.0.0.1")
+    await throttle.check("bob", "10.0.0.2")
+    with pytest.raises(TooManyLoginAttempts):
+        await throttle.check("bob", "10.0.0.1")
+    assert throttle.rejected_ip == 1
@@ -0,0 +1,94 @@
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.persistence.transactions.transaction import Transaction
+from app.services.spending_rollups_service import rebuild_spending_rollups, record_spending
+
+CURRENCY_ID = uuid4()
+
+
+def _transaction(sender_id, category_id, amount, day=5, status="completed", internal=False):
+    return Transaction(
+        id=uuid4(),
+        sender_id=sender_id,
+        receiver_id=uuid4(),
+        currency_id=CURRENCY_ID,
+        category_id=category_id,
+        amount=Decimal(amount),
+        status=status,
+        created_date=date(2024, 3, day),
+        is_internal_transfer=internal,
+    )
+
+
+@pytest.mark.asyncio
+async def test_record_spending_aggregates_into_one_upsert():
+    user_id, category_id = uuid4(), uuid4()
+    db = MagicMock()
+    db.execute = AsyncMock()
+
+    await record_spending(db, [
+        _transaction(user_id, category_id, "10", day=1),
+        _transaction(user_id, category_id, "15", day=28),
+        _transaction(user_id, category_id, "99", status="failed"),
+        _transaction(user_id, category_id, "99", internal=True),
+    ])
+
+    db.execute.assert_awaited_once()
+    stmt = db.execute.await_args.args[0]
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT ON CONSTRAINT uix_spending_rollup_key DO UPDATE" in str(compiled)
+    assert "spending_rollups.amount + excluded.amount" in str(compiled)
+    values = compiled.params
+    assert values["amount_m0"] == Decimal("25")
+    assert values["transaction_count_m0"] == 2
+    assert values["month_m0"] == date(2024, 3, 1)
+
+
+@pytest.mark.asyncio
+async def test_record_spending_skips_when_nothing_counts():
+    db = MagicMock()
+    db.execute = AsyncMock()
+
+    await record_spending(db, [_transaction(uuid4(), uuid4(), "5", internal=True)])
+
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_spending_rollups_commits_per_chunk():
+    first_chunk, second_chunk = [uuid4(), uuid4()], [uuid4()]
+
+    def _users(ids):
+        result = MagicMock()
+        result.scalars = MagicMock(return_value=SimpleNamespace(all=lambda: ids))
+        return result
+
+    executed = []
+
+    async def _execute(stmt, *args, **kwargs):
+        executed.append(stmt)
+        if len(executed) == 1:
+            return _users(first_chunk)
+        if len(executed) == 5:
+            return _users(second_chunk)
+        if len(executed) == 9:
+            return _users([])
+        return MagicMock()
+
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=_execute)
+    db.commit = AsyncMock()
+
+    processed = await rebuild_spending_rollups(db, chunk_size=2)
+
+    assert processed == 3
+    assert db.commit.await_count == 2
+    assert "FOR SHARE" in str(executed[1].compile(dialect=postgresql.dialect()))
+    assert "users.id > " in str(executed[4])
@@ -0,0 +1,120 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from jose import jwt
+
+from app.api.exceptions import UserUnauthorized
+from app.persistence.refresh_tokens.refresh_token import RefreshToken
+from app.services.tokens_service import refresh_user_tokens
+from app.services.utils.token_cache import VerifiedTokenCache
+from app.services.utils.token_functions import (
+    create_access_token,
+    create_tokens,
+    decode_access_token,
+    decode_refresh_token,
+)
+
+
+def _session(*results):
+    session = MagicMock()
+    session.add = MagicMock()
+    session.execute = AsyncMock(side_effect=list(results))
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+def _result(one=None, scalar=None):
+    result = MagicMock()
+    result.one_or_none = MagicMock(return_value=one)
+    result.scalar_one_or_none = MagicMock(return_value=scalar)
+    return result
+
+
+@pytest.mark.asyncio
+async def test_verified_access_token_is_served_from_cache():
+    token = (await create_access_token(uuid4(), False)).access_token
+    cache = VerifiedTokenCache(max_size=10)
+
+    with patch("app.services.utils.token_functions.verified_token_cache", cache), \
+         patch("app.services.utils.token_functions.jwt.decode", wraps=jwt.decode) as decode:
+        first = await decode_access_token(token)
+        second = await decode_access_token(token)
+
+    assert first == second
+    assert decode.call_count == 1
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_access_token_is_not_cached():
+    cache = VerifiedTokenCache(max_size=10)
+
+    with patch("app.services.utils.token_functions.verified_token_cache", cache):
+        assert await decode_access_token("not-a-token") is False
+
+    assert cache.metrics_snapshot()["size"] == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = VerifiedTokenCache(max_size=2)
+    payload = {"sub": "x", "exp": 2**40}
+    cache.put("a", payload)
+    cache.put("b", payload)
+    cache.get("a")
+    cache.put("c", payload)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is payload
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_is_not_an_access_token():
+    session = _session()
+    tokens = await create_tokens(uuid4(), False, session)
+
+    assert await decode_access_token(tokens.refresh.access_token) is False
+    assert await decode_refresh_token(tokens.access.access_token) is False
+    recorded = session.add.call_args.args[0]
+    assert isinstance(recorded, RefreshToken)
+    assert (await decode_refresh_token(tokens.refresh.access_token))["jti"] == recorded.jti
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_within_the_family():
+    user_id, family_id = uuid4(), uuid4()
+    old = await create_tokens(user_id, False, _session(), family_id=family_id)
+    session = _session(_result(one=(user_id, family_id)), _result(scalar=True))
+
+    tokens = await refresh_user_tokens(session, old.refresh.access_token)
+
+    new_payload = await decode_refresh_token(tokens.refresh.access_token)
+    assert new_payload["fam"] == family_id
+    assert new_payload["admin"] is True
+    assert session.add.call_args.args[0].family_id == family_id
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_reused_refresh_token_revokes_family():
+    family_id = uuid4()
+    old = await create_tokens(uuid4(), False, _session(), family_id=family_id)
+    session = _session(_result(one=None), _result())
+
+    with pytest.raises(UserUnauthorized):
+        await refresh_user_tokens(session, old.refresh.access_token)
+
+    revoke = session.execute.await_args_list[1].args[0]
+    assert "refresh_tokens.family_id" in str(revoke)
+    assert family_id in revoke.compile().params.values()
+    session.commit.assert_awaited_once()
+    session.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_missing_refresh_cookie_is_unauthorized():
+    session = _session()
+    with pytest.raises(UserUnauthorized):
+        await refresh_user_tokens(session, None)
+    session.execute.assert_not_awaited()
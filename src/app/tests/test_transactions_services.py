@@ -1,14 +1,19 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 import pytest
-from uuid import uuid4
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+from app.api.exceptions import InsufficientFunds
 from app.persistence.balances.balance import Balance
 from app.persistence.transactions.transaction import Transaction
 from app.persistence.users.users import User
 from app.services.transactions_service import *
+from app.services.utils import transfer_engine
+from app.services.utils.pagination import decode_cursor, encode_cursor
 from fastapi import HTTPException
 from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import DBAPIError
 
 @pytest.mark.asyncio
 async def test_get_receiver_by_username_found():
@@ -35,17 +40,10 @@ async def test_view_all_transactions_basic():
             currency_id=uuid4(),
             amount=Decimal("10.0"),
             status="completed",
-            created_date=datetime(2023, 1, 1)
-        ),
-        Transaction(
-            id=uuid4(),
-            sender_id=uuid4(),
-            receiver_id=uuid4(),
-            currency_id=uuid4(),
-            amount=Decimal("20.0"),
-            status="completed",
-            created_date=datetime(2023, 1, 2)
-        ),
+            created_date=datetime(2023, 1, day),
+            created_at=datetime(2023, 1, day, tzinfo=timezone.utc)
+        )
+        for day in (1, 2, 3)
     ]
 
     total_query_mock = MagicMock()
@@ -58,17 +56,51 @@ async def test_view_all_transactions_basic():
     result_mock.scalars = MagicMock(return_value=scalars_mock)
 
     mock_db = MagicMock(spec=AsyncSession)
-    mock_db.execute = AsyncMock(side_effect=[total_query_mock, result_mock])
+    mock_db.execute = AsyncMock(side_effect=[result_mock, total_query_mock])
 
-    response = await view_all_transactions(mock_db, skip=0, limit=2, sort_by="date", sort_order="asc")
+    response = await view_all_transactions(mock_db, limit=2, sort_by="date", sort_order="asc", total="exact")
 
-    assert response["transactions"] == fake_transactions
+    assert mock_db.execute.await_count == 2
+    assert response["transactions"] == fake_transactions[:2]
     assert response["total"] == 10
     assert response["has_next"] is True
-    assert response["page"] == 1
     assert response["per_page"] == 2
+    assert decode_cursor(response["next_cursor"], "date:asc", (datetime.fromisoformat, UUID)) == [
+        fake_transactions[1].created_at, fake_transactions[1].id
+    ]
+
+
+@pytest.mark.asyncio
+async def test_view_all_transactions_uses_cursor_without_count():
+    last = Transaction(id=uuid4(), amount=Decimal("5.0"), created_at=datetime(2023, 1, 1, tzinfo=timezone.utc))
+    scalars_mock = MagicMock()
+    scalars_mock.all = MagicMock(return_value=[last])
+    result_mock = MagicMock()
+    result_mock.scalars = MagicMock(return_value=scalars_mock)
+    mock_db = MagicMock(spec=AsyncSession)
+    mock_db.execute = AsyncMock(return_value=result_mock)
+
+    cursor = encode_cursor("amount:desc", (Decimal("7.50"), uuid4()))
+    response = await view_all_transactions(mock_db, cursor=cursor, limit=2, sort_by="amount", sort_order="desc")
+
+    assert mock_db.execute.await_count == 1
+    sql = str(mock_db.execute.await_args.args[0])
+    assert "(transactions.amount, transactions.id) <" in sql
+    assert response["has_next"] is False
+    assert response["next_cursor"] is None
+    assert response["total"] is None
 
-    assert mock_db.execute.await_count == 2
+
+@pytest.mark.asyncio
+async def test_view_all_transactions_rejects_cursor_from_other_ordering():
+    mock_db = MagicMock(spec=AsyncSession)
+    cursor = encode_cursor("date:asc", ("2023-01-01T00:00:00+00:00", uuid4()))
+
+    with pytest.raises(HTTPException) as exc:
+        await view_all_transactions(mock_db, cursor=cursor, sort_by="amount", sort_order="asc")
+
+    assert exc.value.status_code == 400
+    mock_db.execute.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_reject_transaction_success():
@@ -248,4 +280,159 @@ async def test_get_or_create_receiver_balance_raises_other_error(mock_get_user_b
 
     with pytest.raises(HTTPException) as exc_info:
         await get_or_create_receiver_balance(mock_db, uuid4(), uuid4())
-    assert exc_info.value.status_code == 500
\ No newline at end of file
+    assert exc_info.value.status_code == 500
+@pytest.mark.asyncio
+async def test_move_funds_writes_rows_in_balance_id_order():
+    low_id, high_id = UUID(int=1), UUID(int=2)
+    calls = []
+
+    async def fake_debit(db, balance_id, amount):
+        calls.append(("debit", balance_id))
+        return Decimal("0")
+
+    async def fake_credit(db, balance_id, amount):
+        calls.append(("credit", balance_id))
+        return Decimal("0")
+
+    post_transfer = AsyncMock()
+    with patch.object(transfer_engine, "_debit", fake_debit), patch.object(transfer_engine, "_credit", fake_credit), \
+         patch.object(transfer_engine, "post_transfer", post_transfer):
+        await transfer_engine.move_funds(MagicMock(), high_id, low_id, Decimal("1"))
+        await transfer_engine.move_funds(MagicMock(), low_id, high_id, Decimal("1"))
+
+    assert calls == [
+        ("credit", low_id), ("debit", high_id),
+        ("debit", low_id), ("credit", high_id),
+    ]
+    assert post_transfer.await_count == 2
+
+@pytest.mark.asyncio
+async def test_move_funds_guarded_debit_insufficient():
+    result_mock = MagicMock()
+    result_mock.scalar_one_or_none = MagicMock(return_value=None)
+
+    mock_db = MagicMock()
+    mock_db.execute = AsyncMock(return_value=result_mock)
+
+    with pytest.raises(InsufficientFunds):
+        await transfer_engine.move_funds(mock_db, UUID(int=1), UUID(int=2), Decimal("50.00"))
+    mock_db.execute.assert_awaited_once()
+
+def _db_error(sqlstate):
+    return DBAPIError("UPDATE balances", {}, SimpleNamespace(sqlstate=sqlstate))
+
+@pytest.mark.asyncio
+async def test_run_with_retries_retries_serialization_failures():
+    operation = AsyncMock(side_effect=[_db_error("40001"), _db_error("40P01"), "done"])
+    mock_db = MagicMock()
+    mock_db.rollback = AsyncMock()
+
+    with patch.object(transfer_engine.asyncio, "sleep", AsyncMock()):
+        result = await transfer_engine.run_with_retries(mock_db, operation, attempts=3)
+
+    assert result == "done"
+    assert operation.await_count == 3
+    assert mock_db.rollback.await_count == 2
+
+@pytest.mark.asyncio
+async def test_run_with_retries_does_not_retry_other_errors():
+    operation = AsyncMock(side_effect=_db_error("23505"))
+    mock_db = MagicMock()
+    mock_db.rollback = AsyncMock()
+
+    with pytest.raises(DBAPIError):
+        await transfer_engine.run_with_retries(mock_db, operation, attempts=3)
+
+    operation.assert_awaited_once()
+    mock_db.rollback.assert_awaited_once()
+
+def _batch_card(number, user_id, balance_id, currency_id):
+    return SimpleNamespace(id=uuid4(), card_number=number, balance_id=balance_id, user_id=user_id, currency_id=currency_id)
+
+def _batch_fixture():
+    sender_id, currency_id = uuid4(), uuid4()
+    sender_balance, receiver_balance = uuid4(), uuid4()
+    cards = [
+        _batch_card("1" * 16, sender_id, sender_balance, currency_id),
+        _batch_card("2" * 16, uuid4(), receiver_balance, currency_id),
+    ]
+    transfers = [
+        CardToCardTransactionIn(sender_card_number="1" * 16, receiver_card_number="2" * 16, amount=Decimal("60")),
+        CardToCardTransactionIn(sender_card_number="1" * 16, receiver_card_number="2" * 16, amount=Decimal("60")),
+        CardToCardTransactionIn(sender_card_number="1" * 16, receiver_card_number="9" * 16, amount=Decimal("1")),
+    ]
+    mock_db = MagicMock()
+    mock_db.execute = AsyncMock(side_effect=[cards, MagicMock(), MagicMock()])
+    mock_db.commit = AsyncMock()
+    mock_db.rollback = AsyncMock()
+    locked = {sender_balance: Decimal("100"), receiver_balance: Decimal("0")}
+    return mock_db, sender_id, transfers, locked, sender_balance, receiver_balance
+
+@pytest.mark.asyncio
+async def test_transfer_batch_per_item_semantics():
+    mock_db, sender_id, transfers, locked, sender_balance, receiver_balance = _batch_fixture()
+    apply_deltas = AsyncMock()
+    record_spending = AsyncMock()
+
+    with patch("app.services.transactions_service.get_default_category", AsyncMock(return_value=SimpleNamespace(id=uuid4()))), \
+         patch("app.services.transactions_service.lock_balances", AsyncMock(return_value=locked)), \
+         patch("app.services.transactions_service.apply_balance_deltas", apply_deltas), \
+         patch("app.services.transactions_service.record_spending", record_spending):
+        response = await transfer_batch_between_cards(mock_db, sender_id, transfers, all_or_nothing=False)
+
+    assert response.committed is True
+    assert [r.status for r in response.results] == ["completed", "failed", "failed"]
+    assert response.results[1].detail == "Insufficient funds"
+    assert response.results[2].detail == f"Receiving card {'9' * 16} not found"
+    apply_deltas.assert_awaited_once_with(mock_db, {sender_balance: Decimal("-60"), receiver_balance: Decimal("60")})
+    assert mock_db.execute.await_count == 3
+    ledger_rows = mock_db.execute.await_args_list[-1].args[1]
+    assert [(row["balance_id"], row["amount"], row["balance_after"]) for row in ledger_rows] == [
+        (sender_balance, Decimal("-60"), locked[sender_balance] - Decimal("60")),
+        (receiver_balance, Decimal("60"), locked[receiver_balance] + Decimal("60")),
+    ]
+    [recorded] = record_spending.await_args.args[1]
+    assert recorded.amount == Decimal("60") and recorded.status == "completed"
+    mock_db.commit.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_transfer_batch_all_or_nothing_rolls_back():
+    mock_db, sender_id, transfers, locked, _, _ = _batch_fixture()
+    apply_deltas = AsyncMock()
+
+    with patch("app.services.transactions_service.get_default_category", AsyncMock(return_value=SimpleNamespace(id=uuid4()))), \
+         patch("app.services.transactions_service.lock_balances", AsyncMock(return_value=locked)), \
+         patch("app.services.transactions_service.apply_balance_deltas", apply_deltas):
+        response = await transfer_batch_between_cards(mock_db, sender_id, transfers, all_or_nothing=True)
+
+    assert response.committed is False
+    assert response.completed == 0
+    assert [r.status for r in response.results] == ["not_executed", "failed", "failed"]
+    apply_deltas.assert_not_awaited()
+    mock_db.commit.assert_not_awaited()
+    mock_db.rollback.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_user_to_user_with_existing_category_id():
+    sender_id, receiver = uuid4(), SimpleNamespace(id=uuid4())
+    category = SimpleNamespace(id=uuid4())
+    card = SimpleNamespace(id=uuid4(), balance=SimpleNamespace(user_id=sender_id, amount=Decimal("100")))
+    data = TransactionCreate(receiver_username="receiver", category_id=category.id, currency_id=uuid4(),
+                             card_number="4000000000000000", amount=Decimal("1"), description="rent")
+    category_result = MagicMock()
+    category_result.scalar_one_or_none = MagicMock(return_value=category)
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=category_result)
+    db.add = MagicMock()
+    db.commit = AsyncMock()
+    db.refresh = AsyncMock()
+
+    with patch("app.services.transactions_service._get_user_by_id",
+               AsyncMock(return_value=SimpleNamespace(is_activated=True, is_verified=True))), \
+         patch("app.services.transactions_service.get_card_by_number", AsyncMock(return_value=card)), \
+         patch("app.services.transactions_service.get_receiver_by_username", AsyncMock(return_value=receiver)), \
+         patch("app.services.transactions_service.get_or_create_receiver_balance", AsyncMock()):
+        transaction = await create_user_to_user_transaction(db, sender_id, data)
+
+    assert transaction.category_id == category.id
+    assert transaction.receiver_id == receiver.id
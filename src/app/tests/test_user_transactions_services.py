@@ -0,0 +1,73 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.persistence.transactions.transaction import Transaction
+from app.services.user_transactions_service import build_user_transactions_query, read_user_transactions
+from app.services.utils.pagination import decode_cursor
+
+
+def _transaction(sender_id, receiver_id, day):
+    return Transaction(
+        id=uuid4(),
+        sender_id=sender_id,
+        receiver_id=receiver_id,
+        currency_id=uuid4(),
+        category_id=uuid4(),
+        amount=Decimal("10.0"),
+        status="completed",
+        is_recurring=False,
+        is_internal_transfer=False,
+        created_date=date(2024, 1, day),
+        created_at=datetime(2024, 1, day, tzinfo=timezone.utc),
+    )
+
+
+def test_all_direction_merges_one_index_range_per_side():
+    user_id = uuid4()
+
+    sql = str(build_user_transactions_query(user_id, "all", limit=5).compile(dialect=postgresql.dialect()))
+
+    assert sql.count("ORDER BY transactions.created_at DESC, transactions.id DESC") == 2
+    assert "UNION ALL" in sql
+    assert " OR " not in sql
+    assert "transactions.sender_id != " in sql
+
+
+def test_outgoing_direction_applies_filters():
+    stmt = build_user_transactions_query(uuid4(), "outgoing", currency_id=uuid4(),
+                                         start_date=date(2024, 1, 1), end_date=date(2024, 1, 31), limit=5)
+
+    sql = str(stmt)
+    assert "transactions.sender_id = " in sql
+    assert "transactions.receiver_id" not in sql.split("WHERE")[1]
+    assert "transactions.currency_id = " in sql
+    assert "transactions.created_at >= " in sql and "transactions.created_at < " in sql
+
+
+@pytest.mark.asyncio
+async def test_read_user_transactions_pages_and_labels_direction():
+    user_id = uuid4()
+    rows = [
+        _transaction(user_id, uuid4(), 3),
+        _transaction(uuid4(), user_id, 2),
+        _transaction(user_id, uuid4(), 1),
+    ]
+    scalars_mock = MagicMock()
+    scalars_mock.all = MagicMock(return_value=rows)
+    result_mock = MagicMock()
+    result_mock.scalars = MagicMock(return_value=scalars_mock)
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result_mock)
+
+    page = await read_user_transactions(db, user_id, limit=2)
+
+    assert [t.direction for t in page["transactions"]] == ["outgoing", "incoming"]
+    assert page["has_next"] is True
+    assert decode_cursor(page["next_cursor"], "me:all", (datetime.fromisoformat, UUID)) == [
+        rows[1].created_at, rows[1].id
+    ]
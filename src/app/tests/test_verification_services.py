@@ -0,0 +1,107 @@
+import io
+from http.server import BaseHTTPRequestHandler
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi import UploadFile
+
+from app.api.exceptions import VerificationDocumentTooLarge
+from app.services.verification_service import (
+    FAILED,
+    PENDING,
+    VERIFIED,
+    VerificationClient,
+    VerificationRunner,
+    spool_documents,
+)
+
+
+class _ProviderStandIn(BaseHTTPRequestHandler):
+    status = 200
+    bodies: list = []
+
+    def do_POST(self):
+        type(self).bodies.append(self.rfile.read(int(self.headers["Content-Length"])))
+        self.send_response(type(self).status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def provider(stand_in_server):
+    _ProviderStandIn.status = 200
+    _ProviderStandIn.bodies = []
+    return _ProviderStandIn, f"{stand_in_server(_ProviderStandIn)}/verify"
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.verification_service.settings.VERIFICATION_SPOOL_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _upload(content: bytes, name: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=name)
+
+
+def _runner(url, job, session_factory):
+    factory, session = session_factory()
+    session.get = AsyncMock(return_value=job)
+    return VerificationRunner(client=VerificationClient(url), session_factory=factory), session
+
+
+@pytest.mark.asyncio
+async def test_documents_are_spooled_and_streamed_to_provider(provider, spool_dir, session_factory):
+    stand_in, url = provider
+    job = SimpleNamespace(id=uuid4(), user_id=uuid4(), attempts=1, status="processing")
+    await spool_documents(job.id, {"id_document": _upload(b"ID-BYTES", "id.png"), "selfie": _upload(b"FACE", "me.png")})
+    runner, session = _runner(url, job, session_factory)
+
+    with patch("app.services.verification_service.principal_cache") as cache:
+        await runner.process(job.id)
+    await runner.client.close()
+
+    assert job.status == VERIFIED
+    assert b"ID-BYTES" in stand_in.bodies[0] and b"FACE" in stand_in.bodies[0]
+    user_update = session.execute.await_args_list[0].args[0].compile().params
+    assert user_update == {"is_verified": True, "id_1": job.user_id}
+    cache.invalidate.assert_called_once_with(job.user_id)
+    assert not (spool_dir / str(job.id)).exists()
+
+
+@pytest.mark.asyncio
+async def test_provider_outage_is_retried_then_failed(provider, spool_dir, session_factory):
+    stand_in, url = provider
+    stand_in.status = 503
+    job = SimpleNamespace(id=uuid4(), user_id=uuid4(), attempts=1, status="processing")
+    await spool_documents(job.id, {"id_document": _upload(b"a", "a"), "selfie": _upload(b"b", "b")})
+    runner, session = _runner(url, job, session_factory)
+
+    await runner.process(job.id)
+    assert job.status == PENDING and "503" in job.last_error
+    assert (spool_dir / str(job.id)).exists()
+
+    job.attempts = 99
+    await runner.process(job.id)
+    await runner.client.close()
+
+    assert job.status == FAILED
+    session.execute.assert_not_awaited()
+    assert runner.metrics_snapshot()["retried"] == 1
+
+
+@pytest.mark.asyncio
+async def test_oversized_document_is_rejected_and_cleaned_up(spool_dir, monkeypatch):
+    monkeypatch.setattr("app.services.verification_service.settings.VERIFICATION_MAX_DOCUMENT_BYTES", 4)
+    job_id = uuid4()
+
+    with pytest.raises(VerificationDocumentTooLarge):
+        await spool_documents(job_id, {"id_document": _upload(b"too large", "a"), "selfie": _upload(b"b", "b")})
+
+    assert not (spool_dir / str(job_id)).exists()
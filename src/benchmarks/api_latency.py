@@ -0,0 +1,368 @@
+"""
+End-to-end latency benchmark for the hot API paths.
+
+Starts the application with uvicorn in a subprocess (or uses --url), seeds a
+synthetic dataset of activated, verified users with one funded card each and
+a few contacts, then drives every endpoint below with --concurrency
+logged-in clients, one endpoint after another:
+
+    login          POST /tokens/
+    user_to_user   POST /transactions/user-to-user
+    between_cards  POST /transactions/between_cards
+    list_cards     GET  /users/me/cards
+    search_contact GET  /users/me/contacts/search
+
+Reports p50/p95/p99, mean, max and throughput per endpoint and writes them,
+with the commit, dataset size and arguments, to a JSON file so runs of two
+commits can be compared (--compare).
+
+Requires a PostgreSQL database migrated to head (alembic upgrade head);
+SQLALCHEMY_DATABASE_URI is read like the application does. Use a scratch
+database: the seeded rows and the generated transactions are left in place.
+The same --seed always produces the same dataset shape and request mix.
+
+    cd src
+    python -m benchmarks.api_latency --users 1000 --requests 2000 --concurrency 32
+    python -m benchmarks.api_latency --compare benchmarks/results/api_latency_<commit>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.persistence import Balance, Card, Category, Contact, Currency, User
+from app.services.utils.security import get_password_hash
+from benchmarks.payment_processor_latency import _free_port
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+API_PREFIX = settings.API_V1_STR
+INITIAL_AMOUNT = Decimal("1000000000")
+SEED_CHUNK = 1000
+
+# The benchmark logs in far more often than a person would.
+SERVER_ENV = {
+    "DATABASE_ECHO": "false",
+    "RECURRING_EXECUTOR_IN_APP": "false",
+    "LOGIN_RATE_LIMIT_PER_USERNAME": "1000000000",
+    "LOGIN_RATE_LIMIT_PER_IP": "1000000000",
+}
+
+
+class Dataset:
+    """What was seeded, as far as the request builders need it."""
+
+    def __init__(self, tag: str, password: str, currency_id: uuid.UUID, category_id: uuid.UUID):
+        self.tag = tag
+        self.password = password
+        self.currency_id = currency_id
+        self.category_id = category_id
+        self.usernames: list[str] = []
+        self.cards: list[str] = []
+        self.contacts: list[list[int]] = []
+
+
+async def seed(args: argparse.Namespace, rng: random.Random) -> Dataset:
+    """
+    Inserts --users users with a balance and a card each, and --contacts
+    contacts per user, in chunks through executemany. All users share one
+    password hash, so seeding does not pay bcrypt per user.
+    """
+    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI)
+    Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+    # Six digits keep card numbers at 16 characters and apart between runs.
+    tag = f"{int(time.time()) % 1_000_000:06d}"
+    try:
+        async with Session() as session:
+            currency_id = (await session.execute(
+                select(Currency.id).where(Currency.code == args.currency)
+            )).scalar_one()
+            category_id = (await session.execute(
+                select(Category.id).where(Category.name == "User Transfer", Category.user_id.is_(None))
+            )).scalar_one()
+            dataset = Dataset(tag, args.password, currency_id, category_id)
+
+            password_hash = get_password_hash(args.password)
+            user_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(args.users)]
+            balance_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(args.users)]
+            dataset.usernames = [f"bench{tag}_{i:06d}" for i in range(args.users)]
+            dataset.cards = [f"9{tag}{i:09d}" for i in range(args.users)]
+            contact_count = min(args.contacts, args.users - 1)
+            dataset.contacts = [
+                rng.sample([j for j in range(args.users) if j != i], contact_count) if contact_count else []
+                for i in range(args.users)
+            ]
+
+            users = [
+                {"id": user_id, "username": username, "email": f"{username}@bench.local",
+                 "password": password_hash, "phone": f"08{rng.randrange(10 ** 8):08d}",
+                 "is_activated": True, "is_verified": True}
+                for user_id, username in zip(user_ids, dataset.usernames)
+            ]
+            balances = [
+                {"id": balance_id, "user_id": user_id, "currency_id": currency_id, "amount": INITIAL_AMOUNT}
+                for balance_id, user_id in zip(balance_ids, user_ids)
+            ]
+            expiration_date = date.today() + timedelta(days=3 * 365)
+            cards = [
+                {"balance_id": balance_id, "card_number": number, "expiration_date": expiration_date,
+                 "cardholder_name": "Bench User", "cvv": f"{rng.randrange(1000):03d}"}
+                for balance_id, number in zip(balance_ids, dataset.cards)
+            ]
+            contacts = [
+                {"user_id": user_ids[i], "contact_id": user_ids[j]}
+                for i, indices in enumerate(dataset.contacts) for j in indices
+            ]
+            for model, rows in ((User, users), (Balance, balances), (Card, cards), (Contact, contacts)):
+                for start in range(0, len(rows), SEED_CHUNK):
+                    await session.execute(insert(model), rows[start:start + SEED_CHUNK])
+            await session.commit()
+    finally:
+        await engine.dispose()
+    return dataset
+
+
+async def start_app(args: argparse.Namespace) -> tuple[asyncio.subprocess.Process, str]:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(args.app_workers), "--log-level", "warning", "--no-access-log",
+        cwd=SRC_DIR, env={**os.environ, **SERVER_ENV},
+    )
+    deadline = time.monotonic() + args.startup_timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.returncode is not None:
+                raise RuntimeError(f"The application exited with {process.returncode} during startup")
+            try:
+                if (await client.get("/docs")).status_code == 200:
+                    return process, base_url
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"The application did not start within {args.startup_timeout}s")
+
+
+async def login(client: httpx.AsyncClient, dataset: Dataset, user: int) -> httpx.Response:
+    return await client.post(
+        f"{API_PREFIX}/tokens/",
+        data={"username": dataset.usernames[user], "password": dataset.password},
+    )
+
+
+Request = Callable[[httpx.AsyncClient, int, random.Random], Awaitable[httpx.Response]]
+
+
+def build_scenarios(dataset: Dataset) -> dict[str, Request]:
+    """
+    One request per endpoint. Each gets the client, the index of the user
+    it is logged in as and the phase's random generator.
+    """
+    users = len(dataset.usernames)
+
+    def _other(user: int, rng: random.Random) -> int:
+        return (user + rng.randrange(1, users)) % users
+
+    async def _login(client, user, rng):
+        # Logging in as someone else would swap the client's cookies.
+        return await login(client, dataset, user)
+
+    async def _user_to_user(client, user, rng):
+        return await client.post(
+            f"{API_PREFIX}/transactions/user-to-user",
+            json={"receiver_username": dataset.usernames[_other(user, rng)],
+                  "currency_id": str(dataset.currency_id),
+                  "category_id": str(dataset.category_id),
+                  "card_number": dataset.cards[user],
+                  "amount": "0.01",
+                  "description": "benchmark"},
+            headers={"Idempotency-Key": str(uuid.UUID(int=rng.getrandbits(128), version=4))},
+        )
+
+    async def _between_cards(client, user, rng):
+        return await client.post(
+            f"{API_PREFIX}/transactions/between_cards",
+            json={"sender_card_number": dataset.cards[user],
+                  "receiver_card_number": dataset.cards[_other(user, rng)],
+                  "amount": "0.01",
+                  "description": "benchmark"},
+            headers={"Idempotency-Key": str(uuid.UUID(int=rng.getrandbits(128), version=4))},
+        )
+
+    async def _list_cards(client, user, rng):
+        return await client.get(f"{API_PREFIX}/users/me/cards")
+
+    async def _search_contact(client, user, rng):
+        contacts = dataset.contacts[user] or [_other(user, rng)]
+        # The tail of a username: a substring match, like typing part of a name.
+        search_by = dataset.usernames[rng.choice(contacts)][-4:]
+        return await client.get(f"{API_PREFIX}/users/me/contacts/search", params={"search_by": search_by})
+
+    return {
+        "login": _login,
+        "user_to_user": _user_to_user,
+        "between_cards": _between_cards,
+        "list_cards": _list_cards,
+        "search_contact": _search_contact,
+    }
+
+
+def summarize(latencies: list[float], elapsed: float, status_codes: Counter) -> dict:
+    """Latencies in seconds in, milliseconds out."""
+    result = {
+        "requests": len(latencies),
+        "errors": sum(count for code, count in status_codes.items() if not 200 <= code < 300),
+        "status_codes": {str(code): count for code, count in sorted(status_codes.items())},
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+    if len(latencies) >= 2:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        result.update({
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+            "p50_ms": round(quantiles[49] * 1000, 2),
+            "p95_ms": round(quantiles[94] * 1000, 2),
+            "p99_ms": round(quantiles[98] * 1000, 2),
+            "max_ms": round(max(latencies) * 1000, 2),
+        })
+    return result
+
+
+async def run_phase(clients: list[httpx.AsyncClient], request: Request, requests: int, rng: random.Random) -> dict:
+    """
+    Closed loop: every client sends its next request as soon as the previous
+    one is answered, until `requests` were sent in total.
+    """
+    latencies: list[float] = []
+    status_codes: Counter = Counter()
+    remaining = requests
+    # Drawn up front so the request mix does not depend on scheduling.
+    client_rngs = [random.Random(rng.getrandbits(64)) for _ in clients]
+
+    async def _client(user: int) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await request(clients[user], user, client_rngs[user])
+                status_codes[response.status_code] += 1
+            except httpx.HTTPError:
+                status_codes[0] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(user) for user in range(len(clients))))
+    return summarize(latencies, time.perf_counter() - started, status_codes)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: dict, baseline: dict | None = None) -> None:
+    print(f"{'endpoint':>15} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, result in results["endpoints"].items():
+        line = (f"{name:>15} {result['throughput_rps']:9.1f} {result.get('p50_ms', 0):8.2f} "
+                f"{result.get('p95_ms', 0):8.2f} {result.get('p99_ms', 0):8.2f} {result['errors']:7d}")
+        previous = (baseline or {}).get("endpoints", {}).get(name)
+        if previous and previous.get("p95_ms") and previous.get("throughput_rps"):
+            line += (f"   p95 {(result.get('p95_ms', 0) / previous['p95_ms'] - 1) * 100:+6.1f}%"
+                     f"  req/s {(result['throughput_rps'] / previous['throughput_rps'] - 1) * 100:+6.1f}%")
+        print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    process = None
+    base_url = args.url
+    if base_url is None:
+        process, base_url = await start_app(args)
+    try:
+        dataset = await seed(args, rng)
+        limits = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+        clients = [
+            httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout)
+            for _ in range(min(args.concurrency, args.users))
+        ]
+        try:
+            for user, client in enumerate(clients):
+                (await login(client, dataset, user)).raise_for_status()
+                if "access_token" not in client.cookies:
+                    raise RuntimeError(f"Could not log in as {dataset.usernames[user]}")
+
+            endpoints = {}
+            for name, request in build_scenarios(dataset).items():
+                if args.only and name not in args.only:
+                    continue
+                if args.warmup:
+                    await run_phase(clients, request, args.warmup, random.Random(rng.getrandbits(64)))
+                endpoints[name] = await run_phase(clients, request, args.requests, random.Random(rng.getrandbits(64)))
+        finally:
+            await asyncio.gather(*(client.aclose() for client in clients))
+    finally:
+        if process is not None:
+            process.terminate()
+            await process.wait()
+
+    results = {
+        "benchmark": "api_latency",
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "args": {key: value for key, value in vars(args).items() if key not in ("password", "compare")},
+        "dataset": {"users": len(dataset.usernames), "contacts": sum(map(len, dataset.contacts))},
+        "endpoints": endpoints,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"api_latency_{results['commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(results, baseline)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--contacts", type=int, default=20, help="Contacts per user")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent logged-in clients")
+    parser.add_argument("--only", nargs="+", help="Endpoints to run, by name")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--currency", default="EUR")
+    parser.add_argument("--password", default="Bench123@")
+    parser.add_argument("--app-workers", type=int, default=1, help="uvicorn workers of the started app")
+    parser.add_argument("--url", help="Benchmark an application that is already running instead")
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="Result file, defaults to benchmarks/results/api_latency_<commit>.json")
+    parser.add_argument("--compare", help="Earlier result file to compare p95 and throughput against")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,69 @@
+"""
+Local stand-in for the card payment processor.
+
+Implements POST /payments/ like the real processor (JSON true/false) and
+remembers Idempotency-Keys, so a retried payment is answered from memory
+instead of being charged again. Latency and failures are configurable,
+which makes it usable for tests (in process, through httpx.ASGITransport)
+and for latency benchmarks (over TCP):
+
+    cd src
+    python -m benchmarks.fake_payment_processor --port 8002 --latency-ms 20
+"""
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class FakeProcessorState:
+    latency_seconds: float = 0.0
+    failure_rate: float = 0.0
+    failure_status: int = 503
+    fail_next: int = 0
+    decline_cards: set[str] = field(default_factory=set)
+    charges: dict[str, dict] = field(default_factory=dict)
+    requests: int = 0
+
+
+def create_fake_processor(state: FakeProcessorState | None = None) -> FastAPI:
+    state = state or FakeProcessorState()
+    app = FastAPI()
+    app.state.processor = state
+
+    @app.post("/payments/")
+    async def _payments(request: Request, idempotency_key: str | None = Header(None, alias="Idempotency-Key")):
+        state.requests += 1
+        if state.latency_seconds:
+            await asyncio.sleep(state.latency_seconds)
+        if state.fail_next > 0 or (state.failure_rate and random.random() < state.failure_rate):
+            state.fail_next = max(0, state.fail_next - 1)
+            return JSONResponse(status_code=state.failure_status, content={"detail": "unavailable"})
+        payload = await request.json()
+        if idempotency_key in state.charges:
+            return state.charges[idempotency_key]["approved"]
+        approved = payload["number"] not in state.decline_cards
+        state.charges[idempotency_key or f"anonymous-{state.requests}"] = {"payload": payload, "approved": approved}
+        return approved
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0)
+    args = parser.parse_args()
+    state = FakeProcessorState(latency_seconds=args.latency_ms / 1000, failure_rate=args.failure_rate)
+    uvicorn.run(create_fake_processor(state), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Concurrency benchmark for the transfer engine on a single hot balance.
+
+Every worker moves money out of the same sender balance into one of a few
+receiver balances, which is the worst case for row contention. The run
+reports transfers/sec, retries and whether money was conserved.
+
+Requires a PostgreSQL database with the application schema and currencies
+(start the app once or run the migrations):
+
+    cd src
+    python -m benchmarks.hot_balance_transfers --workers 32 --transfers 5000
+
+`--mode naive` replays the old read-check-write pattern for comparison; it
+is expected to lose updates under contention.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.exceptions import InsufficientFunds
+from app.core.config import settings
+from app.persistence import Balance, Currency, LedgerEntry, User
+from app.services.utils.transfer_engine import move_funds, run_with_retries
+
+INITIAL_AMOUNT = Decimal("1000000000")
+TRANSFER_AMOUNT = Decimal("1")
+
+
+async def _seed(Session, receivers: int) -> tuple[list[uuid.UUID], uuid.UUID, list[uuid.UUID]]:
+    async with Session() as session:
+        currency_id = (await session.execute(select(Currency.id).limit(1))).scalar_one()
+        users = [
+            User(username=f"bench_{uuid.uuid4().hex[:12]}",
+                 email=f"{uuid.uuid4().hex}@bench.local",
+                 password="-",
+                 phone="0000000000")
+            for _ in range(receivers + 1)
+        ]
+        session.add_all(users)
+        await session.flush()
+        balances = [
+            Balance(user_id=u.id, currency_id=currency_id,
+                    amount=INITIAL_AMOUNT if i == 0 else Decimal("0"))
+            for i, u in enumerate(users)
+        ]
+        session.add_all(balances)
+        await session.commit()
+        return [u.id for u in users], balances[0].id, [b.id for b in balances[1:]]
+
+
+async def _cleanup(Session, user_ids: list[uuid.UUID]) -> None:
+    async with Session() as session:
+        balance_ids = select(Balance.id).where(Balance.user_id.in_(user_ids))
+        await session.execute(delete(LedgerEntry).where(LedgerEntry.balance_id.in_(balance_ids)))
+        await session.execute(delete(Balance).where(Balance.user_id.in_(user_ids)))
+        await session.execute(delete(User).where(User.id.in_(user_ids)))
+        await session.commit()
+
+
+async def _engine_transfer(session, sender_id, receiver_id, stats) -> None:
+    async def _transfer():
+        stats["attempts"] += 1
+        await move_funds(session, sender_id, receiver_id, TRANSFER_AMOUNT)
+        await session.commit()
+
+    await run_with_retries(session, _transfer)
+
+
+async def _naive_transfer(session, sender_id, receiver_id, stats) -> None:
+    stats["attempts"] += 1
+    sender = await session.get(Balance, sender_id, populate_existing=True)
+    receiver = await session.get(Balance, receiver_id, populate_existing=True)
+    if sender.amount < TRANSFER_AMOUNT:
+        raise InsufficientFunds()
+    sender.amount -= TRANSFER_AMOUNT
+    receiver.amount += TRANSFER_AMOUNT
+    await session.commit()
+
+
+async def _worker(Session, transfer, sender_id, receiver_ids, queue, stats) -> None:
+    async with Session() as session:
+        while True:
+            try:
+                n = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await transfer(session, sender_id, receiver_ids[n % len(receiver_ids)], stats)
+            stats["done"] += 1
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, pool_size=args.workers, max_overflow=0)
+    Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+    user_ids, sender_id, receiver_ids = await _seed(Session, args.receivers)
+    transfer = _engine_transfer if args.mode == "engine" else _naive_transfer
+
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for n in range(args.transfers):
+        queue.put_nowait(n)
+    stats = {"done": 0, "attempts": 0}
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(Session, transfer, sender_id, receiver_ids, queue, stats)
+            for _ in range(args.workers)
+        ))
+        elapsed = time.perf_counter() - started
+
+        async with Session() as session:
+            sender_amount = (await session.execute(
+                select(Balance.amount).where(Balance.id == sender_id))).scalar_one()
+            received = (await session.execute(
+                select(Balance.amount).where(Balance.id.in_(receiver_ids)))).scalars().all()
+        expected = INITIAL_AMOUNT - TRANSFER_AMOUNT * stats["done"]
+
+        print(f"mode:              {args.mode}")
+        print(f"workers:           {args.workers}")
+        print(f"transfers:         {stats['done']} in {elapsed:.2f}s")
+        print(f"throughput:        {stats['done'] / elapsed:.1f} transfers/sec")
+        print(f"retried attempts:  {stats['attempts'] - stats['done']}")
+        print(f"lost updates:      {sender_amount - expected}")
+        print(f"money conserved:   {sender_amount + sum(received) == INITIAL_AMOUNT}")
+    finally:
+        await _cleanup(Session, user_ids)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("engine", "naive"), default="engine")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--transfers", type=int, default=5000)
+    parser.add_argument("--receivers", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""
+Latency benchmark for card top-ups against the fake payment processor.
+
+Starts benchmarks.fake_payment_processor on a local port and sends the same
+number of payments twice: with a new AsyncClient per payment (how
+load_balance_from_card used to work) and through the shared, pooled
+PaymentProcessorClient. Reports p50/p95/p99 and throughput for each.
+
+    cd src
+    python -m benchmarks.payment_processor_latency --payments 2000 --concurrency 50 --latency-ms 5
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import time
+import uuid
+
+import httpx
+import uvicorn
+
+from app.services.utils.payment_processor import PaymentProcessorClient
+from benchmarks.fake_payment_processor import FakeProcessorState, create_fake_processor
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _per_request_client(base_url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f"{base_url}/payments/",
+            json={"sender": "4000", "number": "4000", "incoming_amount": "1", "currency": "EUR"},
+        )
+    response.json()
+
+
+async def _run(label: str, call, payments: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def _one():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one() for _ in range(payments)))
+    elapsed = time.perf_counter() - started
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:>18}: {payments / elapsed:8.1f} payments/s  "
+        f"p50 {quantiles[49] * 1000:6.2f} ms  p95 {quantiles[94] * 1000:6.2f} ms  p99 {quantiles[98] * 1000:6.2f} ms"
+    )
+
+
+async def main(payments: int, concurrency: int, latency_ms: float) -> None:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = uvicorn.Server(uvicorn.Config(
+        create_fake_processor(FakeProcessorState(latency_seconds=latency_ms / 1000)),
+        host="127.0.0.1", port=port, log_level="warning",
+    ))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    processor = PaymentProcessorClient(base_url=base_url)
+    processor.start()
+    try:
+        await _run("client per request", lambda: _per_request_client(base_url), payments, concurrency)
+        await _run("shared client", lambda: processor.charge("4000", "1", "EUR", str(uuid.uuid4())), payments, concurrency)
+    finally:
+        await processor.close()
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payments", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.payments, args.concurrency, args.latency_ms))